@@ -1,95 +1,159 @@
 import os
+import contextvars
+import functools
+import json
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
-import re
 
-from flask import Flask, render_template, request, jsonify, url_for, Response
+from flask import (Flask, render_template, request, jsonify, url_for, Response, stream_with_context, abort,
+                   redirect, send_from_directory)
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
-
-# PDF 생성을 위한 ReportLab 라이브러리 임포트
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4  # 페이지 사이즈 설정
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer  # 텍스트 단락 및 간격
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle  # 스타일 시트 및 ParagraphStyle 임포트
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 
 # 서비스 함수 임포트 (generate_script, generate_audio, add_background_music는 이미 구현되어 있다고 가정)
-from services.models import generate_script, generate_audio, add_background_music
+from services.models import (generate_script, generate_audio, generate_podcast_audio, add_background_music,
+                             stream_podcast_audio, SCRIPT_MODEL, SCRIPT_TEMPERATURE)
 from utils.text_processing import process_query
+from utils.config import (SEARCH_STREAMING, SCRIPT_STREAMING, JOB_WORKERS, JOB_RETENTION, FANOUT_WORKERS, WARMUP, LOG_LEVEL,
+                          SPEAKER_GAP_MS, ARTIFACT_DIR, ARTIFACT_MAX_BYTES, ARTIFACT_MAX_AGE, REQUEST_DEADLINE,
+                          REPORT_SECTIONED, REPORT_MAX_SECTIONS, REPORT_SECTION_CONTEXT_CHARS, SOURCE_ENRICH,
+                          AUDIO_PRESET, JOB_QUEUE_SIZE)
+from services.providers import get_search_provider, get_text_provider, warm_up_providers
+from services.jobs import JobManager, JobQueueFull
+from services.artifacts import ArtifactStore, file_fingerprint, make_artifact_key
+from services.report_writer import REPORT_MODEL, generate_report_sections
+from services.sources import enrich_sources, get_source_cache, prefetch_sources
+from utils.cache import create_search_cache, normalize_query
+from utils.singleflight import SingleFlight
+from services import tts
+from utils import metrics, outbound
+from utils.metrics import API_ERRORS, API_REQUEST_SECONDS, CACHE_REQUESTS, STAGE_SECONDS
 
 # Flask 앱 초기화
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'
 
-# 환경 변수 로드 및 Gemini API 설정
+# 환경 변수 로드 (Gemini/OpenAI 클라이언트는 utils.clients에서 처음 사용할 때 생성)
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=GEMINI_API_KEY)
 
-# 결과 파일 저장 디렉토리 (static/generated_podcasts)
-output_dir = Path("static/generated_podcasts")
-output_dir.mkdir(parents=True, exist_ok=True)
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
 
-# 보고서 파일 저장 디렉토리 (static/generated_reports)
-output_report_dir = Path("static/generated_reports")
-output_report_dir.mkdir(parents=True, exist_ok=True)
+# 결과물 저장소: (쿼리, 검색 텍스트, 생성 파라미터) 해시를 파일 이름으로 사용하여 같은 입력이면 기존 파일을 재사용
+podcast_store = ArtifactStore(os.path.join(ARTIFACT_DIR, "podcasts"), ARTIFACT_MAX_BYTES, ARTIFACT_MAX_AGE)
+report_store = ArtifactStore(os.path.join(ARTIFACT_DIR, "reports"), ARTIFACT_MAX_BYTES, ARTIFACT_MAX_AGE)
+ARTIFACT_STORES = {"podcasts": podcast_store, "reports": report_store}
+# 같은 결과물을 동시에 요청하면 한 번만 생성합니다.
+artifact_flight = SingleFlight()
+# 결과물 파일은 내용이 바뀌지 않으므로 브라우저/프록시가 오래 캐시하도록 함
+ARTIFACT_CACHE_SECONDS = 365 * 24 * 3600
 
-# 전역 캐시: query를 키로 하여 Gemini API의 응답 객체를 저장합니다.
-search_cache = {}
+# 검색 캐시: 정규화된 query를 키로 검색 텍스트와 출처만 저장합니다 (TTL, LRU 적용).
+search_cache = create_search_cache()
+# 같은 쿼리에 대한 동시 검색을 하나의 Gemini 호출로 합칩니다.
+search_flight = SingleFlight()
 
-# NanumGothic 폰트 등록 (코드 시작 시점에 한 번만 실행)
-font_path = os.path.join("static", "fonts", "NanumGothic.ttf")  # static 폴더 내 fonts 폴더에 폰트 파일 위치
-if os.path.exists(font_path):
-    try:
-        pdfmetrics.registerFont(TTFont('NanumGothic', font_path))
-        print("NanumGothic 폰트 등록 성공")
-    except Exception as e:
-        print(f"**경고: NanumGothic 폰트 등록 실패: {e}**")
-else:
-    print(f"**경고: 폰트 파일({font_path})을 찾을 수 없습니다. NanumGothic 폰트 등록 실패.**")
+# 배경음악: 한 번만 디코딩/감쇠하여 모든 요청이 PCM 버퍼를 공유합니다.
+BACKGROUND_MUSIC = os.path.join("static", "background.mp3")
 
+# 백그라운드 작업 풀 (팟캐스트/보고서 생성)
+job_manager = JobManager(max_workers=JOB_WORKERS, retention=JOB_RETENTION, max_pending=JOB_QUEUE_SIZE)
+# 한 검색 결과로 보고서와 팟캐스트를 동시에 만드는 팬아웃 풀 (작업 하나당 2개 파이프라인)
+fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
 
-def save_outputs(script: str, audio: bytes, query: str) -> tuple:
-    """스크립트와 오디오 파일을 저장"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_filename = f"podcast_{timestamp}"
 
-    script_filename = output_dir / f"{base_filename}.txt"
-    with open(script_filename, "w", encoding="utf-8") as f:
-        f.write(f"주제: {query}\n\n")
-        f.write(script)
+def warm_up():
+    """
+    첫 요청에서 발생할 초기화 비용(클라이언트 생성, ReportLab/폰트, 배경음악 디코딩)을 미리 처리합니다.
+    WARMUP 설정(sync/background/off)에 따라 시작 시 호출되며, 서버 훅에서 직접 호출할 수도 있습니다.
+    """
+    def report_fonts():
+        from services.report import report_styles
+        report_styles()
+
+    def background_music():
+        from services.audio import preload_background
+        from services.audio_output import get_preset
+        preset = get_preset(AUDIO_PRESET)
+        preload_background(BACKGROUND_MUSIC, preset.frame_rate, preset.channels)
+
+    start = datetime.now()
+    steps = [
+        ("검색/LLM/TTS 클라이언트", warm_up_providers),
+        ("보고서 폰트/스타일", report_fonts),
+        ("배경음악", background_music),
+    ]
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            logger.warning("warm-up 실패 (%s): %s", name, e)
+    logger.info("warm-up 완료 (%.2f초)", (datetime.now() - start).total_seconds())
+
+
+def save_outputs(script: str, query: str, key: str) -> str:
+    """스크립트 파일을 팟캐스트와 같은 키로 저장 (음성 트랙은 메모리에서 바로 믹싱 단계로 전달)"""
+    return podcast_store.put_bytes(f"{key}.txt", f"주제: {query}\n\n{script}".encode("utf-8"))
+
+def lookup_artifact(store: ArtifactStore, name: str):
+    """결과물 저장소를 조회하고 적중/미스를 집계합니다."""
+    path = store.get(name)
+    CACHE_REQUESTS.inc(cache="artifact", result="miss" if path is None else "hit")
+    return path
+
+def podcast_params() -> dict:
+    """팟캐스트 결과물 키에 포함할 생성 파라미터 (바뀌면 새로 생성)"""
+    from services.audio_output import get_preset  # NumPy는 첫 팟캐스트 생성 시 로드
+    return {
+        "script_model": SCRIPT_MODEL,
+        "temperature": SCRIPT_TEMPERATURE,
+        "duration_minutes": 3,
+        "tts_model": tts.TTS_MODEL,
+        "tts_speed": tts.TTS_SPEED,
+        "speaker_gap_ms": SPEAKER_GAP_MS,
+        "background": file_fingerprint(BACKGROUND_MUSIC),
+        "audio": get_preset(AUDIO_PRESET)._asdict(),
+    }
 
-    audio_filename = output_dir / f"{base_filename}.mp3"
-    with open(audio_filename, "wb") as f:
-        f.write(audio)
+def report_params() -> dict:
+    """보고서 내용에 영향을 주는 생성 파라미터 (결과물 키에 포함)"""
+    if not REPORT_SECTIONED:
+        return {"model": REPORT_MODEL}
+    return {"model": REPORT_MODEL, "sectioned": True, "max_sections": REPORT_MAX_SECTIONS,
+            "section_context_chars": REPORT_SECTION_CONTEXT_CHARS}
 
-    return script_filename, audio_filename
+def lookup_search_cache(query: str):
+    """검색 캐시를 조회하고 적중/미스를 집계합니다."""
+    search_result = search_cache.get(query)
+    CACHE_REQUESTS.inc(cache="search", result="miss" if search_result is None else "hit")
+    return search_result
 
-def extract_sources(response):
-    """검색 결과에서 소스 URL, 제목, 썸네일 추출
-    웹 데이터에 thumbnail 속성이 없으면 기본 placeholder 이미지를 사용합니다.
+def get_search_result(query: str) -> dict:
     """
-    sources = []
-    try:
-        if response and hasattr(response, 'candidates') and response.candidates:
-            metadata = getattr(response.candidates[0], 'grounding_metadata', None)
-            if metadata and hasattr(metadata, 'grounding_chunks'):
-                for chunk in metadata.grounding_chunks:
-                    web_data = getattr(chunk, 'web', None)
-                    if web_data and hasattr(web_data, 'uri'):
-                        sources.append({
-                            'url': web_data.uri,
-                            'title': getattr(web_data, 'title', '제목 없음'),
-                        })
-    except Exception as e:
-        # 오류 발생 시 pass (로깅 제거)
-        pass
-    return sources
+    캐시에 검색 결과가 있으면 재사용하고, 없으면 검색 후 캐시에 저장합니다.
+    같은 쿼리로 동시에 들어온 요청은 진행 중인 하나의 검색 결과를 함께 기다립니다.
+    """
+    search_result = lookup_search_cache(query)
+    if search_result is not None:
+        return search_result
+
+    def search_and_cache():
+        # 대기 중에 다른 요청이 검색을 끝냈을 수 있으므로 캐시를 한 번 더 확인
+        cached = search_cache.get(query)
+        if cached is not None:
+            return cached
+        try:
+            with API_REQUEST_SECONDS.time(operation="search"):
+                result = get_search_provider().search(query)
+        except Exception:
+            API_ERRORS.inc(operation="search")
+            raise
+        search_cache.set(query, result)
+        return result
+
+    return search_flight.do(normalize_query(query), search_and_cache)
 
 def generate_report_content(query: str, search_text: str) -> str:
     """
@@ -101,22 +165,277 @@ def generate_report_content(query: str, search_text: str) -> str:
         f"검색 결과:\n{search_text}\n\n"
         "보고서는 서론, 본론(분석 내용), 결론 및 주요 통찰 요약으로 구성되며, 독자가 내용을 쉽게 이해할 수 있도록 상세하고 명확하게 작성해 주시기 바랍니다."
     )
-    report_result = client.models.generate_content(
-        model='gemini-2.0-flash',
-        contents=report_prompt,
-        config=types.GenerateContentConfig(
-            # 추가 옵션이 필요하면 여기에 설정합니다.
-        )
-    )
-    return report_result.text or "보고서 생성에 실패하였습니다."
+    try:
+        with API_REQUEST_SECONDS.time(operation="report"):
+            report_text = get_text_provider("gemini").complete(
+                [{"role": "user", "content": report_prompt}],
+                model=REPORT_MODEL,
+            )
+    except Exception:
+        API_ERRORS.inc(operation="report")
+        raise
+    return report_text or "보고서 생성에 실패하였습니다."
+
+def format_sse(text: str) -> str:
+    """텍스트를 SSE data 이벤트로 변환합니다. 여러 줄은 data 필드를 나누어 줄바꿈을 보존합니다."""
+    return "".join(f"data: {line}\n" for line in text.split("\n")) + "\n"
+
+class SearchStreamCollector:
+    """
+    검색 스트림 조각을 SSE 이벤트로 바꾸면서 전체 텍스트와 출처를 모읍니다.
+    finish()에서 완성된 결과를 캐시에 저장하고 같은 쿼리를 기다리는 요청(call)에 전달합니다.
+    동기(/stream_search)와 비동기(asgi.py) 스트리밍이 함께 사용합니다.
+    """
+
+    def __init__(self, query: str, key: str, call):
+        self.query = query
+        self.key = key
+        self.call = call
+        self.texts = []
+        self.sources = {}
+        self.pending = ""
+        self.start = time.perf_counter()
+
+    def add(self, text: str, chunk_sources) -> str:
+        """조각을 반영하고 보낼 SSE 이벤트를 반환합니다 (보낼 것이 없으면 빈 문자열)."""
+        for source in chunk_sources:
+            self.sources.setdefault(source['url'], source)
+        if not text:
+            return ""
+        self.texts.append(text)
+        # 공백뿐인 이벤트는 클라이언트에서 종료 신호로 해석되므로 다음 조각에 붙여서 보냄
+        self.pending += text
+        if not self.pending.strip():
+            return ""
+        event, self.pending = format_sse(self.pending), ""
+        return event
+
+    def finish(self, error: BaseException = None):
+        if error is None:
+            API_REQUEST_SECONDS.observe(time.perf_counter() - self.start, operation="search")
+            result = {"text": "".join(self.texts), "sources": list(self.sources.values())}
+            search_cache.set(self.query, result)
+            search_flight.release(self.key, self.call, result=result)
+            return
+        # 클라이언트 연결 종료(GeneratorExit, 취소)는 API 오류로 세지 않음
+        if isinstance(error, Exception):
+            API_ERRORS.inc(operation="search")
+        search_flight.release(self.key, self.call,
+                              error=RuntimeError(f"검색 스트리밍이 중단되었습니다: {error!r}"))
+
+def stream_and_cache(query: str, key: str, call):
+    """검색 스트림을 SSE 이벤트로 전달하면서 전체 텍스트와 출처를 모아 캐시에 저장합니다."""
+    collector = SearchStreamCollector(query, key, call)
+    try:
+        for text, chunk_sources in get_search_provider().stream_search(query):
+            event = collector.add(text, chunk_sources)
+            if event:
+                yield event
+    except BaseException as e:
+        # 클라이언트 연결 종료(GeneratorExit)도 포함하여 대기 중인 요청에 실패를 알림
+        collector.finish(error=e)
+        raise
+    collector.finish()
+
+class PipelineError(Exception):
+    """팟캐스트/보고서 생성 파이프라인의 사용자에게 보여줄 실패"""
+
+def _noop_progress(stage: str, **data):
+    pass
+
+def with_deadline(pipeline):
+    """파이프라인 실행 전체에 외부 API 마감 시간 예산(REQUEST_DEADLINE)을 적용합니다 (중첩 시 바깥 예산 유지)."""
+    @functools.wraps(pipeline)
+    def run(*args, **kwargs):
+        with outbound.deadline(REQUEST_DEADLINE):
+            return pipeline(*args, **kwargs)
+    return run
+
+@with_deadline
+def build_podcast(query: str, progress=_noop_progress, search_result: dict = None) -> dict:
+    """
+    검색 → 스크립트 → TTS → 배경음악 합성까지 팟캐스트 생성 파이프라인을 실행합니다.
+    progress(stage, **data)로 단계별 진행 상황을 알리며, 결과 파일 경로와 (제목/썸네일을 보강한) 출처를 반환합니다.
+    search_result가 주어지면 검색 단계를 건너뛰고, 같은 입력으로 만든 팟캐스트가 있으면 바로 반환합니다.
+    """
+    # 캐시에서 Gemini API 결과 재사용 (없다면 호출)
+    if search_result is None:
+        progress("search")
+        with STAGE_SECONDS.time(stage="search"):
+            search_result = get_search_result(query)
+    # 출처 페이지 정보는 스크립트/TTS 단계와 겹쳐서 가져옴
+    prefetch_sources(search_result["sources"])
+
+    key = make_artifact_key("podcast", query, search_result["text"], podcast_params())
+    podcast_path = lookup_artifact(podcast_store, f"{key}.mp3")
+    if podcast_path is not None:
+        progress("cached")
+    else:
+        podcast_path = artifact_flight.do(
+            ("podcast", key), lambda: podcast_store.get(f"{key}.mp3") or render_podcast(query, search_result, key, progress))
+    return {"podcast_path": podcast_path, "sources": enrich_sources(search_result["sources"])}
+
+def render_podcast(query: str, search_result: dict, key: str, progress=_noop_progress) -> str:
+    """스크립트 생성부터 배경음악 합성까지 실행하여 결과물 저장소에 원자적으로 저장하고 경로를 반환합니다."""
+    # 검색 결과의 텍스트를 기반으로 스크립트 생성 (UI에 스크립트는 전달하지 않음)
+    progress("script")
+    tts_progress = lambda done, total: progress("tts", done=done, total=total)
+    if SCRIPT_STREAMING:
+        # 스크립트를 스트리밍으로 받으면서 완성된 대사부터 바로 음성 합성
+        script, audio = generate_podcast_audio(query, search_result["text"], duration_minutes=3,
+                                               progress=tts_progress)
+        if not script:
+            raise PipelineError("스크립트 생성 실패")
+    else:
+        script = generate_script(query, search_result["text"], duration_minutes=3)
+        if not script:
+            raise PipelineError("스크립트 생성 실패")
+        progress("tts", done=0)
+        audio = generate_audio(script, progress=tts_progress)
+    if audio is None:
+        raise PipelineError("오디오 생성 실패")
+    progress("mix")
+    save_outputs(script, query, key)
+    # 임시 파일로 인코딩한 뒤 교체하므로 다른 요청이 반쯤 쓰인 MP3를 받지 않음
+    with podcast_store.writing(f"{key}.mp3") as tmp_path:
+        if add_background_music(audio, BACKGROUND_MUSIC, tmp_path) is None:
+            raise PipelineError("팟캐스트 생성 실패 (배경음악 추가 오류)")
+    return str(podcast_store.path(f"{key}.mp3"))
+
+@with_deadline
+def build_report(query: str, progress=_noop_progress, search_result: dict = None) -> dict:
+    """
+    검색 → 보고서 작성 → PDF 생성 파이프라인을 실행하고 PDF 파일 경로를 반환합니다.
+    search_result가 주어지면 검색 단계를 건너뛰고, 같은 입력으로 만든 보고서가 있으면 바로 반환합니다.
+    """
+    # 캐시에서 Gemini API 결과 재사용 (없다면 호출)
+    if search_result is None:
+        progress("search")
+        with STAGE_SECONDS.time(stage="search"):
+            search_result = get_search_result(query)
+
+    key = make_artifact_key("report", query, search_result["text"], report_params())
+    report_path = lookup_artifact(report_store, f"{key}.pdf")
+    if report_path is not None:
+        progress("cached")
+    else:
+        report_path = artifact_flight.do(
+            ("report", key), lambda: report_store.get(f"{key}.pdf") or render_report_pdf(query, search_result, key, progress))
+    return {"report_path": report_path}
+
+def render_report_pdf(query: str, search_result: dict, key: str, progress=_noop_progress) -> str:
+    """
+    보고서 작성과 PDF 생성을 실행하여 결과물 저장소에 원자적으로 저장하고 경로를 반환합니다.
+    REPORT_SECTIONED이면 목차를 만든 뒤 섹션들을 동시에 작성하고, 끝난 섹션부터 flowable로 변환해 둡니다.
+    """
+    # 고퀄리티 보고서 생성
+    progress("report")
+    with STAGE_SECONDS.time(stage="report"):
+        if REPORT_SECTIONED:
+            _, body = generate_report_sections(query, search_result["text"], progress=progress)
+        else:
+            report_text = generate_report_content(query, search_result["text"])
+
+    progress("pdf")
+    # 최적화된 쿼리 처리 (제목용)
+    optimized_query = process_query(query)
+
+    # 보고서 파일 저장 (PDF 형식, 임시 파일에 만든 뒤 교체)
+    from services.report import build_pdf, markdown_to_flowables, title_flowables  # ReportLab은 첫 보고서 생성 시 로드
+    with STAGE_SECONDS.time(stage="pdf"), report_store.writing(f"{key}.pdf") as tmp_path:
+        if not REPORT_SECTIONED:
+            body = markdown_to_flowables(report_text)
+        build_pdf(title_flowables(optimized_query) + body, tmp_path)
+    return str(report_store.path(f"{key}.pdf"))
+
+@with_deadline
+def build_all(query: str, progress=_noop_progress) -> dict:
+    """
+    한 번의 검색 결과로 보고서와 팟캐스트를 워커 풀에서 동시에 생성합니다.
+    전체 소요 시간은 두 파이프라인 중 느린 쪽에 가까워지며, 한쪽이 실패해도 다른 쪽 결과는 반환합니다.
+    진행 이벤트에는 pipeline(podcast/report) 필드가 붙습니다.
+    """
+    progress("search")
+    with STAGE_SECONDS.time(stage="search"):
+        search_result = get_search_result(query)
+
+    pipelines = {"podcast": build_podcast, "report": build_report}
+    futures = {
+        name: fanout_executor.submit(
+            contextvars.copy_context().run, pipeline, query,
+            progress=lambda stage, _name=name, **data: progress(stage, pipeline=_name, **data),
+            search_result=search_result)
+        for name, pipeline in pipelines.items()
+    }
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            progress("failed", pipeline=name, error=str(e))
+            results[name] = {"error": str(e)}
+    if all("error" in result for result in results.values()):
+        errors = "; ".join(f"{name}: {result['error']}" for name, result in results.items())
+        raise PipelineError(f"팟캐스트와 보고서 생성에 모두 실패했습니다: {errors}")
+    return results
+
+def artifact_url(kind: str, path: str) -> str:
+    """결과물 저장소의 파일 경로를 다운로드 URL로 변환합니다."""
+    return url_for('artifact_file', kind=kind, name=os.path.basename(path))
+
+def job_result_payload(kind: str, result: dict) -> dict:
+    """파이프라인 결과를 API 응답 형식(URL 포함)으로 변환합니다."""
+    if "error" in result:
+        return {"error": result["error"]}
+    if kind == "all":
+        return {name: job_result_payload(name, part) for name, part in result.items()}
+    if kind == "podcast":
+        return {"podcast_url": artifact_url("podcasts", result["podcast_path"]), "sources": result["sources"]}
+    return {"report_url": artifact_url("reports", result["report_path"]), "report_format": "pdf"}
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
+@app.route("/stats")
+def stats():
+    """검색 캐시, 중복 검색 병합, TTS 캐시, 결과물 저장소, 출처 캐시, 백그라운드 작업 통계를 반환합니다."""
+    return jsonify({
+        "search_cache": search_cache.stats(),
+        "search_singleflight": search_flight.stats(),
+        "tts_cache": tts.tts_cache.stats() if tts.tts_cache is not None else None,
+        "artifacts": {kind: store.stats() for kind, store in ARTIFACT_STORES.items()},
+        "sources": get_source_cache().stats() if SOURCE_ENRICH else None,
+        "jobs": job_manager.stats(),
+    })
+
+@app.route("/metrics")
+def metrics_route():
+    """단계별 소요 시간, 외부 API 요청/오류, 캐시 적중 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route("/artifacts/<kind>/<name>")
+def artifact_file(kind, name):
+    """
+    생성된 팟캐스트/보고서 파일을 내려줍니다. Range 요청(206)과 조건부 요청(ETag, If-Modified-Since)을 지원하여
+    MP3 탐색/이어받기 시 파일 전체를 읽지 않고 요청한 구간만 전송합니다.
+    """
+    store = ARTIFACT_STORES.get(kind)
+    if store is None:
+        abort(404)
+    response = send_from_directory(os.path.abspath(store.directory), name,
+                                   conditional=True, max_age=ARTIFACT_CACHE_SECONDS)
+    # 파일 이름이 입력 해시이므로 같은 URL의 내용은 바뀌지 않음
+    response.cache_control.immutable = True
+    return response
+
 @app.route("/stream_search")
 def stream_search():
-    """SSE 방식으로 검색 결과를 스트리밍하며, Gemini API 호출 결과를 캐시에 저장"""
+    """
+    SSE 방식으로 검색 결과를 스트리밍하며, Gemini API 호출 결과를 캐시에 저장합니다.
+    캐시 미스 시 스트리밍 API의 토큰을 도착하는 즉시 전달하고, 캐시 적중 시 전체 텍스트를 바로 전송합니다.
+    """
     query = request.args.get('query')
 
     def generate():
@@ -125,29 +444,18 @@ def stream_search():
             return
 
         try:
-            if query not in search_cache:
-                search_result = client.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=query,
-                    config=types.GenerateContentConfig(
-                        tools=[types.Tool(google_search=types.GoogleSearchRetrieval)]
-                    )
-                )
-                search_cache[query] = search_result
-            else:
-                search_result = search_cache[query]
-
-            full_text = search_result.text or ""
-            chunk_size = 100
-
-            def format_chunk(text):
-                return "\n".join("data: " + line for line in text.splitlines())
-
-            for i in range(0, len(full_text), chunk_size):
-                chunk = full_text[i:i + chunk_size]
-                formatted_chunk = format_chunk(chunk)
-                yield f"{formatted_chunk}\n\n"
-                time.sleep(0.2)
+            search_result = lookup_search_cache(query) if SEARCH_STREAMING else get_search_result(query)
+            if search_result is None:
+                key = normalize_query(query)
+                call, leader = search_flight.acquire(key)
+                if leader:
+                    yield from stream_and_cache(query, key, call)
+                    return
+                # 같은 쿼리의 검색이 이미 진행 중이면 그 결과를 기다림
+                search_result = call.wait()
+
+            if search_result["text"].strip():
+                yield format_sse(search_result["text"])
 
         except Exception as e:
             # 오류 발생 시 클라이언트에 SSE 이벤트로 전송
@@ -168,38 +476,88 @@ def generate_podcast():
         return jsonify({"error": "쿼리 없음"}), 400
 
     try:
-        # 캐시에서 Gemini API 결과 재사용 (없다면 호출)
-        if query in search_cache:
-            search_result = search_cache[query]
-            del search_cache[query]
-        else:
-            search_result = client.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=query,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearchRetrieval)]
-                )
-            )
-        # 검색 결과의 텍스트를 기반으로 스크립트 생성 (UI에 스크립트는 전달하지 않음)
-        script = generate_script(query, search_result.text, duration_minutes=3)
-        audio = generate_audio(script)
-        if audio:
-            script_file, audio_file = save_outputs(script, audio, query)
-            music_file = os.path.join("static", "background.mp3")
-            output_with_music = str(output_dir / f"podcast_with_bgm_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3")
-            result_file = add_background_music(audio_file, music_file, output_with_music)
-            if result_file is None:
-                return jsonify({"error": "팟캐스트 생성 실패 (배경음악 추가 오류)"}), 500
-            # Windows 경로 구분자를 URL용 슬래시로 변환
-            relative_path = os.path.relpath(result_file, "static").replace("\\", "/")
-            podcast_url = url_for('static', filename=relative_path)
-            sources = extract_sources(search_result)
-            return jsonify({"podcast_url": podcast_url, "sources": sources})
-        else:
-            return jsonify({"error": "오디오 생성 실패"}), 500
+        result = build_podcast(query)
+        return jsonify(job_result_payload("podcast", result))
+    except PipelineError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "팟캐스트 생성 중 오류가 발생했습니다.", "details": str(e)}), 500
 
+@app.route("/stream_podcast")
+def stream_podcast():
+    """
+    팟캐스트를 생성하면서 배경음악까지 섞은 MP3를 chunked 전송으로 바로 내려보냅니다 (<audio src>로 재생 가능).
+    첫 세그먼트의 합성이 끝나면 재생이 시작되며, 끝까지 전송된 MP3는 결과물 저장소에 저장되어
+    같은 입력의 다음 요청은 저장된 파일(Range 지원)로 리다이렉트합니다.
+    스트리밍 렌더링은 음량 정규화/덕킹을 세그먼트마다 계산하므로 /generate_podcast 결과와 다른 키(render=stream)로
+    저장하고, 같은 입력의 전체 렌더링 결과가 있으면 그쪽을 우선 사용합니다.
+    같은 입력으로 동시에 들어온 요청은 첫 요청만 생성하고, 나머지는 저장이 끝나길 기다렸다가 리다이렉트합니다.
+    """
+    query = request.args.get("query")
+    if not query:
+        return jsonify({"error": "쿼리 없음"}), 400
+
+    # 검색부터 마지막 세그먼트까지 하나의 마감 시간 예산을 사용 (스트리밍 생성기에서 이어서 적용)
+    with outbound.deadline(REQUEST_DEADLINE) as budget:
+        try:
+            search_result = get_search_result(query)
+        except Exception as e:
+            return jsonify({"error": "검색 중 오류가 발생했습니다.", "details": str(e)}), 500
+
+    params = podcast_params()
+    full_name = f"{make_artifact_key('podcast', query, search_result['text'], params)}.mp3"
+    key = make_artifact_key("podcast", query, search_result["text"], {**params, "render": "stream"})
+    for name in (full_name, f"{key}.mp3"):
+        if lookup_artifact(podcast_store, name) is not None:
+            return redirect(url_for('artifact_file', kind="podcasts", name=name))
+
+    flight_key = ("podcast", key)
+    call, leader = artifact_flight.acquire(flight_key)
+    if not leader:
+        try:
+            call.wait(None if budget is None else max(0.0, budget.remaining()))
+        except Exception as e:
+            return jsonify({"error": "팟캐스트 생성 중 오류가 발생했습니다.", "details": str(e)}), 500
+        if podcast_store.get(f"{key}.mp3") is None:
+            return jsonify({"error": "팟캐스트 생성 중 오류가 발생했습니다."}), 500
+        return redirect(url_for('artifact_file', kind="podcasts", name=f"{key}.mp3"))
+
+    def generate():
+        script_lines = []
+        start = time.perf_counter()
+        try:
+            with outbound.resume_deadline(budget):
+                audio = stream_podcast_audio(query, search_result["text"], BACKGROUND_MUSIC, duration_minutes=3,
+                                             script_lines=script_lines)
+                try:
+                    # 클라이언트에 보내는 바이트를 임시 파일에도 써 두었다가 끝까지 성공하면 저장소에 반영
+                    with podcast_store.writing(f"{key}.mp3") as tmp_path, open(tmp_path, "wb") as f:
+                        for i, chunk in enumerate(audio):
+                            if i == 0:
+                                logger.info("팟캐스트 첫 오디오 전송까지 %.2f초: %s", time.perf_counter() - start, query)
+                            f.write(chunk)
+                            yield chunk
+                except Exception as e:
+                    # 응답 헤더가 이미 전송되었으므로 스트림을 끝내는 것으로 실패를 알림
+                    logger.error("팟캐스트 스트리밍 실패: %s", e)
+                    return
+                finally:
+                    audio.close()
+            save_outputs("\n".join(script_lines), query, key)
+        finally:
+            # 전송 완료, 실패, 연결 종료(GeneratorExit) 모두 기다리는 요청을 깨움
+            artifact_flight.release(flight_key, call)
+
+    headers = {
+        "Content-Type": "audio/mpeg",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    }
+    response = Response(generate(), headers=headers)
+    # 본문을 한 번도 읽기 전에 연결이 끊기면 generate()의 finally가 실행되지 않으므로 응답을 닫을 때도 해제
+    response.call_on_close(lambda: artifact_flight.release(flight_key, call))
+    return response
+
 @app.route("/generate_report", methods=["POST"])
 def generate_report_route():
     """검색 결과를 바탕으로 고퀄리티 보고서를 생성하고 URL을 반환합니다."""
@@ -208,91 +566,89 @@ def generate_report_route():
         return jsonify({"error": "쿼리 없음"}), 400
 
     try:
-        # Gemini API 호출 (캐시 처리 제외)
-        if query in search_cache:
-            search_result = search_cache[query]
-            del search_cache[query]
-        else:
-            search_result = client.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=query,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearchRetrieval)]
-                )
-            )
-
-        # 고퀄리티 보고서 생성
-        report_text = generate_report_content(query, search_result.text)
-
-        # ** 텍스트 bold 처리 및 사이즈 증가 처리
-        # ** 사이의 텍스트는 <b><font size="12">태그로 감쌉니다.
-        processed_text = re.sub(r'\*\*(.+?)\*\*', r'<b><font size="12">\1</font></b>', report_text)
-
-        # 보고서 파일 저장 (PDF 형식)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_filename = f"report_{timestamp}"
-        report_filename = output_report_dir / f"{base_filename}.pdf"  # 확장자 .pdf
-
-        # SimpleDocTemplate을 이용하여 PDF 생성
-        doc = SimpleDocTemplate(str(report_filename), pagesize=A4)
-        styles = getSampleStyleSheet()
-
-        # 한글 폰트 스타일 적용 (NanumGothic이 등록된 경우)
-        if 'NanumGothic' in pdfmetrics.getRegisteredFontNames():
-            styles['Title'].fontName = 'NanumGothic'
-            styles['BodyText'].fontName = 'NanumGothic'
-            styles['BodyText'].leading = 14  # 줄 간격 조정
-            # 소제목 스타일 (## 표시된 줄용) 추가: 폰트 사이즈 16, 볼드 처리, 가운데 정렬
-            styles.add(ParagraphStyle(name='Subtitle',
-                                      parent=styles['Heading2'],
-                                      fontName='NanumGothic',
-                                      fontSize=16,
-                                      leading=18,
-                                      alignment=1,  # 가운데 정렬
-                                      spaceAfter=12))
-            # 제목 스타일 (이미 CenterTitle를 사용하는 경우)
-            styles.add(ParagraphStyle(name='CenterTitle',
-                                      parent=styles['Title'],
-                                      alignment=1,
-                                      fontName='NanumGothic'))
-            print("NanumGothic 폰트 스타일 적용 완료")
-        else:
-            print("**경고: NanumGothic 폰트가 등록되지 않아 기본 폰트 사용.**")
-
-        flowables = []
-
-        # 최적화된 쿼리 처리 (제목용)
-        optimized_query = process_query(query)
-        title = Paragraph(f"<b>{optimized_query}</b>", styles["CenterTitle"])
-        flowables.append(title)
-        flowables.append(Spacer(1, 12))
-
-        # report_text를 줄 단위로 분리하여 처리 (소제목(##)과 일반 문단을 구분)
-        lines = processed_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue  # 빈 줄은 건너뜀
-            if line.startswith("##"):
-                # "##"로 시작하는 경우, 소제목으로 처리
-                subtitle_text = line.lstrip("#").strip()
-                flowables.append(Paragraph(subtitle_text, styles["Subtitle"]))
-                flowables.append(Spacer(1, 6))
-            else:
-                # 일반 문단: inline bold 처리는 이미 적용되어 있음
-                flowables.append(Paragraph(line, styles["BodyText"]))
-                flowables.append(Spacer(1, 6))
-
-        # PDF 문서 빌드
-        doc.build(flowables)
-
-        # URL용 상대 경로 변환 (Windows 경로 구분자 처리)
-        relative_path = os.path.relpath(report_filename, "static").replace("\\", "/")
-        report_url = url_for('static', filename=relative_path)
-
-        return jsonify({"report_url": report_url, "report_format": "pdf"})
+        result = build_report(query)
+        return jsonify(job_result_payload("report", result))
     except Exception as e:
         return jsonify({"error": "보고서 생성 중 오류가 발생했습니다.", "details": str(e)}), 500
 
+@app.route("/generate_all", methods=["POST"])
+def generate_all_route():
+    """한 번의 검색으로 팟캐스트와 보고서를 동시에 생성하고 두 결과를 함께 반환합니다."""
+    query = request.form.get("query")
+    if not query:
+        return jsonify({"error": "쿼리 없음"}), 400
+
+    try:
+        result = build_all(query)
+        return jsonify(job_result_payload("all", result))
+    except PipelineError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "팟캐스트/보고서 생성 중 오류가 발생했습니다.", "details": str(e)}), 500
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """팟캐스트(kind=podcast), 보고서(kind=report) 또는 둘 다(kind=all) 생성 작업을 백그라운드에 등록하고 즉시 반환합니다."""
+    query = request.form.get("query")
+    kind = request.form.get("kind", "podcast")
+    if not query:
+        return jsonify({"error": "쿼리 없음"}), 400
+    if kind not in JOB_PIPELINES:
+        return jsonify({"error": f"지원하지 않는 작업 종류: {kind}"}), 400
+
+    try:
+        job = job_manager.submit(kind, query, JOB_PIPELINES[kind], query)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+    return jsonify({
+        "job_id": job.id,
+        "status_url": url_for('job_status', job_id=job.id),
+        "events_url": url_for('job_events', job_id=job.id),
+    }), 202
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """작업 상태를 반환합니다. 완료된 경우 결과 URL을 포함합니다."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+    payload = job.snapshot()
+    if job.status == "done":
+        payload["result"] = job_result_payload(job.kind, job.result)
+    return jsonify(payload)
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """작업의 단계별 진행 상황(search → script → tts n/m → mix → done)을 SSE로 스트리밍합니다."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+
+    def generate():
+        for event in job.iter_events():
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            if event["stage"] == "done":
+                event = {**event, "result": job_result_payload(job.kind, job.result)}
+            yield f"event: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    headers = {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    }
+    # 완료 이벤트의 결과 URL 생성(url_for)을 위해 요청 컨텍스트를 유지
+    return Response(stream_with_context(generate()), headers=headers)
+
+# 작업 종류별 파이프라인
+JOB_PIPELINES = {"podcast": build_podcast, "report": build_report, "all": build_all}
+
+# 시작 시 warm-up: background는 부팅을 막지 않고 별도 스레드에서, sync는 임포트 중에 실행
+if WARMUP == "sync":
+    warm_up()
+elif WARMUP == "background":
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
 if __name__ == "__main__":
     app.run(debug=True)
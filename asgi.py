@@ -0,0 +1,259 @@
+"""
+ASGI 실행 모드
+
+/stream_search는 이벤트 루프에서 비동기 검색 클라이언트로 직접 처리하여, 열린 SSE 연결이 워커 스레드를
+점유하지 않습니다 (한 프로세스에서 수백 개의 연결 유지 가능). 나머지 라우트(팟캐스트/보고서 생성, 작업 API 등)는
+기존 Flask 앱을 전용 스레드 풀(ASGI_WSGI_THREADS)에서 실행하므로 믹싱, PDF 생성 같은 CPU 작업이 이벤트 루프를 막지 않습니다.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import io
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as flask_app
+from app import SearchStreamCollector, format_sse, lookup_search_cache, search_cache, search_flight
+from services.providers import get_search_provider
+from utils.cache import normalize_query
+from utils.config import ASGI_WSGI_THREADS, SEARCH_STREAMING
+from utils.metrics import API_ERRORS, API_REQUEST_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def wsgi_environ(scope, body: io.BytesIO) -> dict:
+    """ASGI HTTP scope를 WSGI environ으로 변환합니다 (PEP 3333)."""
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = name
+        else:
+            key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class WSGIBridge:
+    """
+    WSGI 앱을 전용 스레드 풀에서 실행하는 ASGI 어댑터. 응답 조각은 생성되는 대로 이벤트 루프로 전달합니다.
+    응답 중에 클라이언트가 연결을 끊으면 다음 조각을 받은 시점에 WSGI 이터레이터를 닫아, 스트리밍 응답
+    (/jobs/<id>/events, /stream_podcast 등)이 풀 스레드와 그 뒤의 TTS/인코딩 작업을 붙잡고 있지 않게 합니다.
+    """
+
+    def __init__(self, wsgi_app, max_workers: int):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        body = io.BytesIO()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.write(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body.seek(0)
+
+        loop = asyncio.get_running_loop()
+        disconnected = threading.Event()
+
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        async def wait_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(wait_disconnect())
+        try:
+            await loop.run_in_executor(self.executor, self._run, wsgi_environ(scope, body), send_sync, disconnected)
+        finally:
+            watcher.cancel()
+
+    def _run(self, environ: dict, send_sync, disconnected: threading.Event):
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start.update({
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+            })
+
+        result = self.wsgi_app(environ, start_response)
+        started = False
+        try:
+            for chunk in result:
+                if disconnected.is_set():
+                    # 이터레이터를 실행하는 이 스레드에서 닫도록 finally로 빠져나감
+                    logger.debug("클라이언트 연결 종료로 응답 중단: %s", environ["PATH_INFO"])
+                    return
+                if not started:
+                    send_sync(response_start)
+                    started = True
+                if chunk:
+                    send_sync({"type": "http.response.body", "body": chunk, "more_body": True})
+            if not started:
+                send_sync(response_start)
+            send_sync({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+async def search_once(query: str) -> dict:
+    """스트리밍을 쓰지 않을 때의 비동기 검색 (같은 쿼리의 동시 요청은 하나로 합침)"""
+    key = normalize_query(query)
+    call, leader = search_flight.acquire(key)
+    if not leader:
+        return await call.wait_async()
+    try:
+        with API_REQUEST_SECONDS.time(operation="search"):
+            result = await get_search_provider().asearch(query)
+    except BaseException as e:
+        if isinstance(e, Exception):
+            API_ERRORS.inc(operation="search")
+        search_flight.release(key, call, error=e)
+        raise
+    search_cache.set(query, result)
+    search_flight.release(key, call, result=result)
+    return result
+
+
+async def stream_and_cache(query: str, key: str, call):
+    """app.stream_and_cache의 비동기 버전"""
+    collector = SearchStreamCollector(query, key, call)
+    try:
+        async for text, chunk_sources in get_search_provider().astream_search(query):
+            event = collector.add(text, chunk_sources)
+            if event:
+                yield event
+    except BaseException as e:
+        # 클라이언트 연결 종료(취소)도 포함하여 대기 중인 요청에 실패를 알림
+        collector.finish(error=e)
+        raise
+    collector.finish()
+
+
+async def search_events(query: str):
+    """app.stream_search와 같은 SSE 이벤트를 비동기로 생성합니다."""
+    if not query:
+        yield "data: \n\n"
+        return
+
+    try:
+        search_result = lookup_search_cache(query)
+        if search_result is None and SEARCH_STREAMING:
+            key = normalize_query(query)
+            call, leader = search_flight.acquire(key)
+            if leader:
+                async for event in stream_and_cache(query, key, call):
+                    yield event
+                return
+            # 같은 쿼리의 검색이 이미 진행 중이면 (스레드를 점유하지 않고) 그 결과를 기다림
+            search_result = await call.wait_async()
+        elif search_result is None:
+            search_result = await search_once(query)
+
+        if search_result["text"].strip():
+            yield format_sse(search_result["text"])
+
+    except Exception as e:
+        # 오류 발생 시 클라이언트에 SSE 이벤트로 전송
+        yield f"data: 오류: 검색 스트리밍 중 문제가 발생했습니다: {e}\n\n"
+
+
+async def stream_search(scope, receive, send):
+    """SSE 검색 스트리밍. 클라이언트가 연결을 끊으면 진행 중인 검색 스트림을 취소합니다."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        if not message.get("more_body"):
+            break
+    query = parse_qs(scope["query_string"].decode("latin-1")).get("query", [None])[0]
+
+    async def pump():
+        events = search_events(query)
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+            async for event in events:
+                await send({"type": "http.response.body", "body": event.encode("utf-8"), "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await events.aclose()
+
+    async def wait_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    streaming = asyncio.ensure_future(pump())
+    disconnected = asyncio.ensure_future(wait_disconnect())
+    await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    for task in (streaming, disconnected):
+        task.cancel()
+    try:
+        await streaming
+    except asyncio.CancelledError:
+        logger.debug("클라이언트 연결 종료로 검색 스트리밍 취소: %s", query)
+
+
+wsgi_bridge = WSGIBridge(flask_app.app, max_workers=ASGI_WSGI_THREADS)
+
+# 이벤트 루프에서 직접 처리하는 라우트 (나머지는 Flask 앱으로 전달)
+ASYNC_ROUTES = {
+    ("GET", "/stream_search"): stream_search,
+}
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                wsgi_bridge.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        handler = wsgi_bridge
+    await handler(scope, receive, send)
@@ -0,0 +1,281 @@
+"""
+배치 생성 모드
+
+JSONL 또는 CSV 파일의 쿼리 목록으로 웹 앱과 같은 팟캐스트/보고서 파이프라인(app.JOB_PIPELINES)을
+스레드 또는 프로세스 풀에서 실행합니다. 항목이 끝날 때마다 체크포인트 파일에 한 줄씩 기록하므로,
+중단된 배치를 같은 명령으로 다시 실행하면 완료된 항목은 건너뛰고 실패/미완료 항목만 실행합니다.
+마지막에 처리량, 항목별 소요 시간, 실패 목록을 요약 파일(JSON)로 저장합니다.
+
+    python batch.py topics.jsonl --kind all --workers 4
+    python batch.py topics.csv --kind podcast --mode process --workers 4
+
+입력 형식 (kind가 없으면 --kind 값을 사용)
+    JSONL: {"query": "반도체 수출 동향", "kind": "report"}  한 줄에 하나 (문자열만 있는 줄도 허용)
+    CSV:   query[,kind] 열이 있는 헤더 포함 파일
+
+thread 모드에서 Ctrl+C로 중단하면 진행 중인 항목의 마감 시간 예산(utils.outbound.Deadline)을 취소하여
+다음 외부 API 호출부터 바로 실패하게 하므로, 이미 보낸 요청 외에 유료 API 호출이 더 나가지 않습니다.
+process 모드의 워커 프로세스는 진행 중인 항목을 끝까지 실행합니다. 어느 쪽이든 중단된 항목은 기록하지 않아 재실행 시 다시 실행됩니다.
+
+같은 프로세스의 항목들은 검색 캐시, TTS 캐시, 결과물 저장소를 공유합니다. process 모드에서는 검색 캐시를
+SQLite(SEARCH_CACHE_BACKEND=sqlite)로 설정하여 워커 프로세스끼리도 검색 결과를 공유하며, TTS 캐시와
+결과물 저장소는 원래 디스크에 있으므로 모든 워커와 이후 실행이 재사용합니다.
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional
+
+from utils import outbound
+from utils.cache import normalize_query
+from utils.config import REQUEST_DEADLINE
+
+logger = logging.getLogger("batch")
+
+KINDS = ("podcast", "report", "all")
+
+
+def item_key(kind: str, query: str) -> str:
+    return f"{kind}:{normalize_query(query)}"
+
+
+def read_items(path: str, default_kind: str) -> List[Dict[str, str]]:
+    """입력 파일에서 {"id", "query", "kind"} 목록을 읽습니다. 같은 (종류, 정규화된 쿼리)는 한 번만 포함합니다."""
+    def rows() -> Iterator[Dict[str, str]]:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            if path.lower().endswith(".csv"):
+                yield from csv.DictReader(f)
+                return
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: JSON 형식이 아닙니다 ({e})") from None
+                yield row if isinstance(row, dict) else {"query": str(row)}
+
+    items, seen = [], set()
+    for row in rows():
+        query = (row.get("query") or "").strip()
+        kind = (row.get("kind") or default_kind).strip()
+        if not query:
+            continue
+        if kind not in KINDS:
+            raise ValueError(f"알 수 없는 kind: {kind!r} (query={query!r})")
+        item_id = item_key(kind, query)
+        if item_id not in seen:
+            seen.add(item_id)
+            items.append({"id": item_id, "query": query, "kind": kind})
+    return items
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict]:
+    """체크포인트 파일에서 항목 id별 마지막 기록을 읽습니다 (중단 시 잘린 마지막 줄은 무시)."""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["id"]] = record
+    return records
+
+
+def _init_worker():
+    # 워커 프로세스는 Ctrl+C를 무시하고 부모가 정리하도록 함
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import app  # noqa: F401  (워커마다 한 번 임포트하여 클라이언트와 캐시를 준비)
+
+
+# thread 모드에서 진행 중인 항목의 마감 시간 예산 (중단 시 cancel_running으로 취소)
+_running: Dict[str, outbound.Deadline] = {}
+_running_lock = threading.Lock()
+_cancelled = False
+
+
+def cancel_running() -> List[str]:
+    """
+    진행 중인 항목의 예산을 취소하여 다음 외부 API 호출에서 멈추게 하고, 해당 항목 id 목록을 반환합니다.
+    이후에 시작하는 항목도 취소된 예산으로 시작합니다 (풀 종료 전에 대기열에서 꺼내진 경우).
+    """
+    global _cancelled
+    with _running_lock:
+        _cancelled = True
+        for budget in _running.values():
+            budget.cancel()
+        return list(_running)
+
+
+def run_item(kind: str, query: str) -> Dict:
+    """파이프라인 하나를 실행하고 체크포인트에 기록할 결과를 반환합니다 (프로세스 풀에서도 호출되므로 최상위 함수)."""
+    import app
+    item_id = item_key(kind, query)
+    # 파이프라인의 with_deadline보다 먼저 예산을 잡아 두어 취소할 수 있게 함 (REQUEST_DEADLINE이 0이면 무제한)
+    budget = outbound.Deadline(REQUEST_DEADLINE or math.inf)
+    with _running_lock:
+        if _cancelled:
+            budget.cancel()
+        _running[item_id] = budget
+    start = time.perf_counter()
+    try:
+        with outbound.resume_deadline(budget):
+            result = app.JOB_PIPELINES[kind](query)
+    except Exception as e:
+        return {"status": "error", "error": str(e), "seconds": time.perf_counter() - start}
+    finally:
+        with _running_lock:
+            _running.pop(item_id, None)
+    errors = {name: part["error"] for name, part in result.items() if "error" in part} if kind == "all" else {}
+    record = {"status": "partial" if errors else "done", "result": result, "seconds": time.perf_counter() - start}
+    if errors:
+        record["error"] = "; ".join(f"{name}: {error}" for name, error in errors.items())
+    return record
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def build_summary(items: List[Dict], records: Dict[str, Dict], ran: List[str], skipped: int,
+                  elapsed: float, interrupted: bool) -> Dict:
+    ran_records = [records[item_id] for item_id in ran]
+    seconds = [record["seconds"] for record in ran_records]
+    finished = [record for record in ran_records if record["status"] == "done"]
+    summary = {
+        "total": len(items),
+        "skipped": skipped,
+        "ran": len(ran_records),
+        "done": len(finished),
+        "failed": len(ran_records) - len(finished),
+        "remaining": sum(1 for item in items if records.get(item["id"], {}).get("status") != "done"),
+        "interrupted": interrupted,
+        "wall_seconds": round(elapsed, 3),
+        "items_per_minute": round(len(finished) / elapsed * 60, 2) if elapsed > 0 else None,
+        "item_seconds": {
+            "p50": percentile(seconds, 50),
+            "p95": percentile(seconds, 95),
+            "max": max(seconds) if seconds else None,
+        },
+        "failures": [{"query": records[item_id]["query"], "kind": records[item_id]["kind"],
+                      "status": records[item_id]["status"], "error": records[item_id].get("error")}
+                     for item_id in ran if records[item_id]["status"] != "done"],
+    }
+    if "app" in sys.modules:
+        # thread 모드에서는 이번 실행의 캐시 재사용 정도를 함께 기록
+        app = sys.modules["app"]
+        summary["caches"] = {
+            "search": app.search_cache.stats(),
+            "tts": app.tts.tts_cache.stats() if app.tts.tts_cache is not None else None,
+            "artifacts": {kind: store.stats() for kind, store in app.ARTIFACT_STORES.items()},
+        }
+    return summary
+
+
+def run_batch(items: List[Dict], checkpoint_path: str, mode: str, workers: int, retry_failed: bool) -> Dict:
+    records = load_checkpoint(checkpoint_path)
+    todo = [item for item in items
+            if records.get(item["id"], {}).get("status") != "done"
+            and (retry_failed or item["id"] not in records)]
+    skipped = len(items) - len(todo)
+    logger.info("항목 %d개 중 %d개 실행 (%d개는 체크포인트에서 건너뜀), %s 풀 %d개",
+                len(items), len(todo), skipped, mode, workers)
+
+    if mode == "process":
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+
+    ran, interrupted, pending = [], False, {}
+    start = time.perf_counter()
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        try:
+            pending = {executor.submit(run_item, item["kind"], item["query"]): item for item in todo}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:  # 워커 프로세스 비정상 종료 등
+                        record = {"status": "error", "error": repr(e), "seconds": 0.0}
+                    record = {"id": item["id"], "query": item["query"], "kind": item["kind"],
+                              "finished_at": time.time(), **record}
+                    checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    checkpoint.flush()
+                    records[item["id"]] = record
+                    ran.append(item["id"])
+                    logger.info("[%d/%d] %s %s (%.1fs)%s", len(ran), len(todo), record["status"], item["id"],
+                                record["seconds"], f": {record['error']}" if record.get("error") else "")
+        except KeyboardInterrupt:
+            interrupted = True
+            abandoned = [item["id"] for future, item in pending.items() if future.running()]
+            if mode == "thread":
+                cancel_running()
+            logger.warning("중단 요청: 진행 중인 항목은 기록하지 않고 요약을 저장합니다. 같은 명령으로 다시 실행하면 이어서 진행합니다.")
+            logger.warning("중단된 항목 %d개%s: %s", len(abandoned),
+                           " (다음 외부 API 호출에서 취소)" if mode == "thread" else " (워커 프로세스가 끝까지 실행)",
+                           ", ".join(abandoned) or "-")
+            logger.warning("시작하지 않은 항목 %d개는 실행하지 않습니다.", len(pending) - len(abandoned))
+        finally:
+            executor.shutdown(wait=not interrupted, cancel_futures=True)
+    return build_summary(items, records, ran, skipped, time.perf_counter() - start, interrupted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="쿼리 목록 파일 (.jsonl 또는 .csv)")
+    parser.add_argument("--kind", choices=KINDS, default="all", help="항목에 kind가 없을 때 생성할 결과물")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread",
+                        help="thread: 한 프로세스에서 캐시를 메모리로 공유, process: CPU 작업(믹싱/PDF)을 여러 코어로 분산")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 실행할 항목 수")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 (기본: <input>.checkpoint.jsonl)")
+    parser.add_argument("--summary", help="요약 파일 (기본: <input>.summary.json)")
+    parser.add_argument("--no-retry-failed", dest="retry_failed", action="store_false",
+                        help="재실행 시 이전에 실패한 항목은 건너뜀")
+    args = parser.parse_args()
+
+    stem = os.path.splitext(args.input)[0]
+    checkpoint_path = args.checkpoint or f"{stem}.checkpoint.jsonl"
+    summary_path = args.summary or f"{stem}.summary.json"
+
+    if args.mode == "process":
+        # 워커 프로세스가 검색 결과를 공유하도록 SQLite 캐시 사용 (spawn된 워커가 환경 변수를 상속)
+        os.environ.setdefault("SEARCH_CACHE_BACKEND", "sqlite")
+    else:
+        import app  # noqa: F401  (로깅 설정과 클라이언트 준비)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    items = read_items(args.input, args.kind)
+    summary = run_batch(items, checkpoint_path, args.mode, max(1, args.workers), args.retry_failed)
+    summary.update(input=args.input, mode=args.mode, workers=args.workers, checkpoint=checkpoint_path)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"완료 {summary['done']}/{summary['ran']} (건너뜀 {summary['skipped']}, 남은 항목 {summary['remaining']}), "
+          f"{summary['wall_seconds']:.1f}s, 분당 {summary['items_per_minute'] or 0:.1f}건 -> {summary_path}")
+    for failure in summary["failures"]:
+        print(f"  실패 [{failure['kind']}] {failure['query']}: {failure['error']}")
+    sys.exit(130 if summary["interrupted"] else 1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+팟캐스트 출력 오디오 프리셋 벤치마크
+
+합성한 음성 트랙(말소리처럼 끊기는 변조 톤, 24kHz 모노)에 배경음악을 깔아 프리셋별로 믹싱 + MP3 인코딩을
+실행하고, 소요 시간(중앙값), 출력 크기, 실제 비트레이트, 청취자 한 명이 한 시간 듣는 데 필요한 전송량을 비교합니다.
+legacy는 프리셋 도입 전 방식(음성/배경음악 중 높은 포맷으로 믹싱, ffmpeg 기본 비트레이트, 정규화/덕킹 없음)입니다.
+
+    python benchmarks/bench_audio.py --seconds 180 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from pydub import AudioSegment  # noqa: E402
+
+from services.audio import (MIX_BLOCK_SECONDS, background_bed, background_music, encode_mp3,  # noqa: E402
+                            mix_blocks, to_pcm)
+from services.audio_output import PRESETS, analyze_voice  # noqa: E402
+from services.models import add_background_music  # noqa: E402
+
+FRAME_RATE = 24000
+
+
+def make_voice(seconds: float) -> AudioSegment:
+    """1.5~4초 길이의 발화와 0.3~0.8초 쉼이 번갈아 나오는 음성 대용 트랙"""
+    rng = np.random.default_rng(0)
+    chunks, total = [], 0
+    while total < seconds * FRAME_RATE:
+        length = int(rng.uniform(1.5, 4.0) * FRAME_RATE)
+        t = np.arange(length) / FRAME_RATE
+        pitch = rng.uniform(110, 220)
+        tone = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(2 * np.pi * pitch * 2.7 * t)
+        syllables = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+        chunks.append((tone * syllables * rng.uniform(2000, 9000)).astype(np.int16))
+        pause = int(rng.uniform(0.3, 0.8) * FRAME_RATE)
+        chunks.append(np.zeros(pause, dtype=np.int16))
+        total += length + pause
+    return AudioSegment(data=np.concatenate(chunks).tobytes(), sample_width=2, frame_rate=FRAME_RATE, channels=1)
+
+
+def legacy_mix(voice: AudioSegment, music_file: str, output: str):
+    music = background_music(music_file, -20)
+    frame_rate, channels = max(voice.frame_rate, music.frame_rate), max(voice.channels, music.channels)
+    bed = background_bed(music_file, -20, frame_rate, channels)
+    blocks = mix_blocks(to_pcm(voice, frame_rate, channels), bed, block_frames=frame_rate * MIX_BLOCK_SECONDS)
+    encode_mp3(blocks, frame_rate, channels, output)
+
+
+def measure(name: str, run, repeat: int, seconds: float, output: str):
+    run()  # 배경음악 디코딩/포맷 변환을 캐시에 올림
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    size = os.path.getsize(output)
+    kbps = size * 8 / seconds / 1000
+    print(f"{name:<8}{statistics.median(timings) * 1000:9.1f}ms{size / 2**20:9.2f}MiB{kbps:8.1f}kbps"
+          f"{size / seconds * 3600 / 2**20:10.1f}MiB/h")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=180, help="합성 음성 길이(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--music", default=os.path.join("static", "background.mp3"))
+    args = parser.parse_args()
+
+    voice = make_voice(args.seconds)
+    seconds = len(voice) / 1000
+    print(f"voice={seconds:.1f}s music={args.music}")
+    print(f"{'preset':<8}{'mix+enc':>11}{'size':>12}{'bitrate':>12}{'per hour':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "legacy.mp3")
+        measure("legacy", lambda: legacy_mix(voice, args.music, output), args.repeat, seconds, output)
+        for name, preset in PRESETS.items():
+            output = os.path.join(tmp, f"{name}.mp3")
+            measure(name, lambda: add_background_music(voice, args.music, output, preset=preset),
+                    args.repeat, seconds, output)
+
+    # 음량/덕킹 분석만 따로 측정 (믹싱 전 한 번 실행되는 NumPy 계산)
+    for name, preset in PRESETS.items():
+        pcm = to_pcm(voice, preset.frame_rate, preset.channels)
+        start = time.perf_counter()
+        voice_gain, bed_gains = analyze_voice(pcm, preset.frame_rate, preset)
+        elapsed = time.perf_counter() - start
+        print(f"analyze {name:<8}{elapsed * 1000:7.1f}ms  voice_gain={20 * np.log10(voice_gain):+.1f}dB "
+              f"ducked={np.mean(bed_gains < 0.99) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+엔드포인트 종단 간 부하 테스트
+
+benchmarks/fake_server.py 대역 서버를 제공자로 사용하여(PROVIDER_BACKEND=fake) 앱을 스레드 WSGI 서버로 띄우고,
+/stream_search, /generate_podcast, /generate_report를 동시 클라이언트로 호출합니다.
+엔드포인트별 p50/p95/p99 지연 시간, 첫 SSE 이벤트까지의 시간, 초당 요청 수, 최대 RSS를 보고하고,
+파이프라인을 한 번씩 직접 실행하여 단계(search, script, tts, mix, report, pdf)별 소요 시간과 최대 RSS를 측정합니다.
+
+    python benchmarks/bench_endpoints.py --requests 40 --concurrency 8 --latency 0.2
+    python benchmarks/bench_endpoints.py --save-baseline            # 결과를 기준선으로 저장
+    python benchmarks/bench_endpoints.py --compare                  # 기준선과 비교 (회귀 시 종료 코드 1)
+
+검색 캐시 효과를 빼고 측정하도록 요청마다 다른 쿼리를 사용합니다 (--same-query로 캐시 적중 경로 측정).
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_server  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "endpoints.json")
+ENDPOINTS = ("stream_search", "podcast", "report")
+# 값이 커지면 회귀인 지표 / 작아지면 회귀인 지표
+LOWER_IS_BETTER = ("p50", "p95", "p99", "ttfe_p50", "ttfe_p95", "seconds")
+HIGHER_IS_BETTER = ("rps",)
+
+
+def rss_bytes() -> int:
+    """현재 프로세스의 RSS (Linux는 /proc, 그 외에는 지금까지의 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class RSSSampler:
+    """백그라운드 스레드에서 RSS를 주기적으로 기록하여 구간별 최대값을 계산합니다."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append((time.perf_counter(), rss_bytes()))
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def peak(self, start: float, end: float) -> int:
+        values = [rss for t, rss in self.samples if start <= t <= end]
+        return max(values, default=rss_bytes())
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def request_stream_search(base_url: str, query: str) -> Dict[str, float]:
+    """SSE 응답을 끝까지 읽고 첫 data 이벤트까지의 시간과 전체 시간을 반환합니다."""
+    url = urlsplit(base_url)
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=120)
+    try:
+        conn.request("GET", "/stream_search?" + urlencode({"query": query}))
+        response = conn.getresponse()
+        first_event = None
+        for line in response:
+            if first_event is None and line.startswith(b"data:") and line[5:].strip():
+                first_event = time.perf_counter() - start
+        ok = response.status == 200 and first_event is not None
+    finally:
+        conn.close()
+    return {"ok": ok, "seconds": time.perf_counter() - start, "ttfe": first_event}
+
+
+def request_form(base_url: str, path: str, query: str) -> Dict[str, float]:
+    url = urlsplit(base_url)
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=600)
+    try:
+        conn.request("POST", path, body=urlencode({"query": query}),
+                     headers={"Content-Type": "application/x-www-form-urlencoded"})
+        response = conn.getresponse()
+        body = response.read()
+        ok = response.status == 200
+        error = None if ok else body[:300].decode("utf-8", "replace")
+        if error:
+            try:
+                error = json.dumps(json.loads(body), ensure_ascii=False)
+            except ValueError:
+                pass
+    finally:
+        conn.close()
+    return {"ok": ok, "seconds": time.perf_counter() - start, "error": error}
+
+
+def run_load(request_fn: Callable[[str], Dict], queries: List[str], concurrency: int,
+             sampler: RSSSampler) -> Dict:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(request_fn, queries))
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["seconds"] for r in ok]
+    summary = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "rps": len(ok) / wall if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "peak_rss_mb": sampler.peak(start, start + wall) / 2**20,
+    }
+    ttfe = [r["ttfe"] for r in ok if r.get("ttfe") is not None]
+    if ttfe:
+        summary["ttfe_p50"] = percentile(ttfe, 50)
+        summary["ttfe_p95"] = percentile(ttfe, 95)
+    first_error = next((r.get("error") for r in results if not r["ok"] and r.get("error")), None)
+    if first_error:
+        summary["first_error"] = first_error
+    return summary
+
+
+def profile_stages(app_module, query: str, sampler: RSSSampler) -> Dict[str, Dict[str, float]]:
+    """팟캐스트와 보고서 파이프라인을 한 번씩 직접 실행하여 progress 이벤트 사이 구간을 단계로 측정합니다."""
+    stages = {}
+    for name, pipeline in (("podcast", app_module.build_podcast), ("report", app_module.build_report)):
+        marks = []
+
+        def progress(stage, **data):
+            if not marks or marks[-1][0] != stage:
+                marks.append((stage, time.perf_counter()))
+
+        try:
+            pipeline(f"{query} {name} 단계 측정", progress=progress)
+            marks.append(("done", time.perf_counter()))
+        except Exception as e:
+            print(f"  {name} 파이프라인 실패: {e}")
+            marks.append(("failed", time.perf_counter()))
+        for (stage, start), (_, end) in zip(marks, marks[1:]):
+            stages[f"{name}.{stage}"] = {"seconds": end - start,
+                                         "peak_rss_mb": sampler.peak(start, end) / 2**20}
+    return stages
+
+
+def format_seconds(value: Optional[float]) -> str:
+    return "     -" if value is None else f"{value * 1000:7.1f}ms"
+
+
+def print_results(results: Dict):
+    print(f"{'endpoint':<14}{'ok/req':>9}{'rps':>8}{'p50':>11}{'p95':>11}{'p99':>11}"
+          f"{'ttfe p50':>11}{'ttfe p95':>11}{'peak RSS':>11}")
+    for name, s in results["endpoints"].items():
+        print(f"{name:<14}{s['requests'] - s['errors']:>4}/{s['requests']:<4}{s['rps']:8.2f}"
+              f"{format_seconds(s['p50']):>11}{format_seconds(s['p95']):>11}{format_seconds(s['p99']):>11}"
+              f"{format_seconds(s.get('ttfe_p50')):>11}{format_seconds(s.get('ttfe_p95')):>11}"
+              f"{s['peak_rss_mb']:8.1f}MiB")
+        if s.get("first_error"):
+            print(f"  첫 오류: {s['first_error']}")
+    if not results["stages"]:
+        return
+    print(f"\n{'stage':<22}{'time':>11}{'peak RSS':>11}")
+    for name, s in results["stages"].items():
+        print(f"{name:<22}{format_seconds(s['seconds']):>11}{s['peak_rss_mb']:8.1f}MiB")
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """기준선 대비 tolerance 비율 이상 나빠진 지표를 반환합니다."""
+    regressions = []
+    for section in ("endpoints", "stages"):
+        for name, current in results[section].items():
+            base = baseline.get(section, {}).get(name)
+            if not base:
+                continue
+            for metric, value in current.items():
+                old = base.get(metric)
+                if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                    continue
+                if metric in LOWER_IS_BETTER and value > old * (1 + tolerance):
+                    regressions.append(f"{section}.{name}.{metric}: {old:.4f} -> {value:.4f} (+{value / old - 1:.0%})")
+                elif metric in HIGHER_IS_BETTER and value < old * (1 - tolerance):
+                    regressions.append(f"{section}.{name}.{metric}: {old:.4f} -> {value:.4f} ({value / old - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=20, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--same-query", action="store_true", help="모든 요청에 같은 쿼리 사용 (캐시 적중 경로)")
+    parser.add_argument("--latency", type=float, default=0.1, help="대역 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    parser.add_argument("--search-bytes", type=int, default=4096)
+    parser.add_argument("--report-bytes", type=int, default=8192)
+    parser.add_argument("--script-lines", type=int, default=12)
+    parser.add_argument("--no-stages", action="store_true", help="단계별 측정 생략")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="결과를 기준선으로 저장")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="기준선과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 판단할 악화 비율")
+    args = parser.parse_args()
+
+    fake = fake_server.start_server(port=0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                    chunk_delay=args.chunk_delay, search_bytes=args.search_bytes,
+                                    report_bytes=args.report_bytes, script_lines=args.script_lines)
+    # 설정은 임포트 시점에 읽으므로 앱 임포트 전에 환경 변수를 지정
+    os.environ["PROVIDER_BACKEND"] = "fake"
+    os.environ["FAKE_PROVIDER_URL"] = f"http://127.0.0.1:{fake.server_port}"
+    os.environ.setdefault("TTS_CACHE_DIR", "")
+    os.environ.setdefault("WARMUP", "sync")
+    os.chdir(ROOT)  # 앱은 static/ 아래 상대 경로에 결과를 저장
+
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # 요청마다 찍히는 접근 로그 생략
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    sampler = RSSSampler().start()
+
+    request_fns = {
+        "stream_search": lambda q: request_stream_search(base_url, q),
+        "podcast": lambda q: request_form(base_url, "/generate_podcast", q),
+        "report": lambda q: request_form(base_url, "/generate_report", q),
+    }
+    run_id = datetime.now().strftime("%H%M%S")
+    results = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "options": {k: v for k, v in vars(args).items()
+                        if k not in ("output", "save_baseline", "compare", "tolerance")},
+        },
+        "endpoints": {},
+        "stages": {},
+    }
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency}s "
+          f"error_rate={args.error_rate} same_query={args.same_query}")
+    for name in args.endpoints:
+        queries = [f"부하 테스트 {name} {run_id} {'' if args.same_query else i}".strip()
+                   for i in range(args.requests)]
+        results["endpoints"][name] = run_load(request_fns[name], queries, args.concurrency, sampler)
+    if not args.no_stages:
+        results["stages"] = profile_stages(app_module, f"단계 측정 {run_id}", sampler)
+
+    sampler.stop()
+    server.shutdown()
+    fake.shutdown()
+    print_results(results)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n기준선 대비 회귀 ({len(regressions)}건, 허용 {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n기준선 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+외부 API 속도 제한/재시도 벤치마크
+
+초당 요청 한도를 넘으면 429 + Retry-After로 응답하는 로컬 대역 서버(fake_server.py --rate-limit)를 띄우고,
+같은 TTS 버스트를 클라이언트 쪽 토큰 버킷(OUTBOUND_RATE_LIMITS) 설정별로 실행하여
+소요 시간, 성공 여부, 서버가 거절한 요청(429) 수, 재시도 수를 비교합니다.
+
+    python benchmarks/bench_outbound.py --segments 60 --server-rate 10 --client-rates 0 10 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_server  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 지연 시간(초)")
+    parser.add_argument("--server-rate", type=float, default=10, help="대역 서버의 초당 허용 요청 수")
+    parser.add_argument("--client-rates", type=float, nargs="+", default=[0, 10],
+                        help="비교할 클라이언트 토큰 버킷 초당 요청 수 (0이면 제한 없음)")
+    args = parser.parse_args()
+
+    server = fake_server.start_server(port=0, latency=args.latency, jitter=0.0, rate_limit=args.server_rate)
+    os.environ["PROVIDER_BACKEND"] = "fake"
+    os.environ["FAKE_PROVIDER_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["TTS_CACHE_DIR"] = ""
+
+    from services.tts import synthesize_segments
+    from utils import outbound
+    from utils.metrics import OUTBOUND_RETRIES
+
+    limiter = server.RequestHandlerClass.rate_limiter
+    print(f"segments={args.segments} workers={args.workers} server_rate={args.server_rate}/s")
+    for rate in args.client_rates:
+        outbound.set_rate_limits(f"fake={rate:g}/{rate:g}" if rate else "")
+        rejected = limiter.rejected
+        retries = OUTBOUND_RETRIES.value(provider="fake", model="tts-1")
+        # 세그먼트마다 텍스트를 달리하여 이전 실행과 섞이지 않도록 함
+        segments = [("onyx", f"{rate:g}-{i:03d} " + "가" * 40) for i in range(args.segments)]
+        start = time.perf_counter()
+        try:
+            synthesize_segments(segments, max_workers=args.workers)
+            outcome = "ok"
+        except Exception as e:
+            outcome = f"failed ({type(e).__name__})"
+        elapsed = time.perf_counter() - start
+        print(f"client_rate={f'{rate:g}' if rate else '-':>4}  {elapsed:6.2f}s  {outcome:<20} "
+              f"429={limiter.rejected - rejected:<4} retries={OUTBOUND_RETRIES.value(provider='fake', model='tts-1') - retries:g}")
+        time.sleep(1.0)  # 서버의 1초 창을 비움
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
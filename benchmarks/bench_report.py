@@ -0,0 +1,103 @@
+"""
+보고서 PDF 렌더링 벤치마크
+
+합성한 대용량 마크다운(제목, 목록, 굵게, 표)을 services.report로 렌더링하여
+반복별 소요 시간, tracemalloc 최대 메모리, 페이지 수를 측정합니다.
+--legacy를 주면 기존 방식(요청마다 스타일 시트 생성, 줄마다 Spacer)과 비교합니다.
+
+    python benchmarks/bench_report.py --sections 60 --repeat 3 --legacy
+"""
+import argparse
+import io
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle  # noqa: E402
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer  # noqa: E402
+
+from services.report import render_report  # noqa: E402
+
+
+def make_markdown(sections: int) -> str:
+    lines = []
+    for i in range(1, sections + 1):
+        lines.append(f"## {i}. 분석 섹션 {i}")
+        for j in range(6):
+            lines.append(f"시장 동향 {i}-{j}에 대한 **핵심 통찰**을 설명하는 문단입니다. " * 6)
+            lines.append("")
+        for j in range(5):
+            lines.append(f"- 주요 요인 {j}: 수요 증가와 **공급망** 변화 및 규제 영향")
+        for j in range(1, 4):
+            lines.append(f"{j}. 단계별 전략 {j}")
+        lines.append("| 항목 | 2023 | 2024 | 비고 |")
+        lines.append("| --- | --- | --- | --- |")
+        for j in range(6):
+            lines.append(f"| 지표 {j} | {j * 10} | {j * 12} | **증가** |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_legacy(title: str, markdown: str) -> bytes:
+    """기존 /generate_report의 PDF 생성 방식 (비교용)"""
+    processed_text = re.sub(r'\*\*(.+?)\*\*', r'<b><font size="12">\1</font></b>', markdown)
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    styles['BodyText'].leading = 14
+    styles.add(ParagraphStyle(name='Subtitle', parent=styles['Heading2'], fontSize=16, leading=18,
+                              alignment=1, spaceAfter=12))
+    styles.add(ParagraphStyle(name='CenterTitle', parent=styles['Title'], alignment=1))
+    flowables = [Paragraph(f"<b>{title}</b>", styles["CenterTitle"]), Spacer(1, 12)]
+    for line in processed_text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("##"):
+            flowables.append(Paragraph(line.lstrip("#").strip(), styles["Subtitle"]))
+        else:
+            flowables.append(Paragraph(line, styles["BodyText"]))
+        flowables.append(Spacer(1, 6))
+    doc.build(flowables)
+    return buffer.getvalue()
+
+
+def measure(name: str, fn, repeat: int):
+    times = []
+    peaks = []
+    size = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        pdf = fn()
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        size = len(pdf)
+    pages = pdf.count(b"/Type /Page") - pdf.count(b"/Type /Pages")
+    print(f"{name:<8} median {statistics.median(times):6.2f}s  min {min(times):6.2f}s  "
+          f"peak {max(peaks) / 2**20:7.1f} MiB  pages {pages:4d}  size {size / 2**10:8.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=60, help="## 섹션 수 (60이면 약 50페이지 이상)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy", action="store_true", help="기존 렌더링 방식과 비교")
+    args = parser.parse_args()
+
+    markdown = make_markdown(args.sections)
+    print(f"markdown: {len(markdown) / 2**10:.1f} KiB, {markdown.count(chr(10)) + 1} lines")
+    measure("report", lambda: render_report("대용량 보고서 벤치마크", markdown), args.repeat)
+    if args.legacy:
+        measure("legacy", lambda: render_legacy("대용량 보고서 벤치마크", markdown), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
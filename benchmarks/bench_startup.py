@@ -0,0 +1,83 @@
+"""
+콜드 스타트 벤치마크
+
+새 파이썬 프로세스에서 `python -X importtime -c "import app"`을 실행하여 누적 임포트 시간이 큰 모듈을 보여주고,
+프로세스 시작부터 첫 요청(GET /) 응답까지의 시간을 측정합니다.
+
+    python benchmarks/bench_startup.py --runs 5 --top 15
+    WARMUP=sync python benchmarks/bench_startup.py   # warm-up을 부팅 중에 실행할 때와 비교
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST_SNIPPET = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get("/")
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(f"{imported - start:.6f} {served - start:.6f}")
+"""
+
+
+def import_profile(top: int):
+    """-X importtime 출력에서 누적 시간이 큰 최상위 임포트를 반환합니다."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        name = name[1:].rstrip()  # 구분자 뒤 공백 제거, 나머지 들여쓰기는 임포트 깊이 (2칸 단위)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    app_row = next((row for row in rows if row[2] == 0 and row[3] == "app"), None)
+    # app이 직접 임포트한 모듈만 보여줌
+    top_level = sorted((row for row in rows if row[2] == 1), reverse=True)[:top]
+    return app_row, top_level
+
+
+def first_request(runs: int):
+    imports, firsts = [], []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", FIRST_REQUEST_SNIPPET],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SystemExit(result.stderr[-2000:])
+        imported, served = map(float, result.stdout.strip().splitlines()[-1].split())
+        imports.append(imported)
+        firsts.append(served)
+    return imports, firsts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    app_row, top_level = import_profile(args.top)
+    if app_row:
+        print(f"import app: cumulative {app_row[0] / 1000:8.1f} ms")
+    print("가장 느린 직접 임포트 (cumulative ms / self ms):")
+    for cumulative_us, self_us, _, name in top_level:
+        print(f"  {cumulative_us / 1000:8.1f}  {self_us / 1000:8.1f}  {name}")
+
+    imports, firsts = first_request(args.runs)
+    print(f"WARMUP={os.getenv('WARMUP', 'background')}  runs={args.runs}")
+    print(f"import app       median {statistics.median(imports) * 1000:8.1f} ms  max {max(imports) * 1000:8.1f} ms")
+    print(f"first request    median {statistics.median(firsts) * 1000:8.1f} ms  max {max(firsts) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+TTS 병렬 합성 벤치마크
+
+지연 시간을 주입한 로컬 가짜 TTS 서버(OpenAI 호환 /v1/audio/speech)를 띄우고
+synthesize_segments를 순차(workers=1)와 병렬 설정으로 각각 실행하여 소요 시간을 비교합니다.
+
+    python benchmarks/bench_tts.py --segments 30 --latency 0.8 --workers 1 4 8 16
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 병렬도 자체를 비교하므로 클라이언트 쪽 속도 제한은 끔 (bench_outbound.py 참고)
+os.environ.setdefault("OUTBOUND_RATE_LIMITS", "")
+
+import openai  # noqa: E402
+from services import tts  # noqa: E402
+from services.tts import synthesize_segments  # noqa: E402
+from services.tts_cache import TTSCache  # noqa: E402
+
+
+def make_handler(latency: float, jitter: float, error_rate: float):
+    class FakeTTSHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if random.random() < error_rate:
+                self.send_response(500)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b'{"error": {"message": "injected failure"}}')
+                return
+            # 입력 텍스트를 그대로 담아 순서 검증에 사용
+            payload = body.get("input", "").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeTTSHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.8, help="요청당 지연 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--cache-dir", default=None, help="지정하면 해당 디렉토리의 TTS 캐시를 사용 (기본: 캐시 비활성화)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency, args.jitter, args.error_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    openai.api_key = "bench"
+    openai.base_url = f"http://127.0.0.1:{server.server_port}/v1/"
+    openai.max_retries = 0
+    tts.tts_cache = TTSCache(args.cache_dir, 64 * 1024 * 1024) if args.cache_dir else None
+
+    voices = ["onyx", "nova"]
+    segments = [(voices[i % 2], f"세그먼트 {i:03d} " + "가" * 80) for i in range(args.segments)]
+
+    print(f"segments={args.segments} latency={args.latency}s jitter={args.jitter}s error_rate={args.error_rate}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        audio = synthesize_segments(segments, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        assert [a.decode("utf-8") for a in audio] == [text for _, text in segments], "순서가 보존되지 않았습니다"
+        baseline = baseline or elapsed
+        print(f"workers={workers:>3}  {elapsed:7.2f}s  speedup x{baseline / elapsed:5.2f}")
+
+    if tts.tts_cache is not None:
+        print(f"cache: {tts.tts_cache.stats()}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
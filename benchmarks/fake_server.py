@@ -0,0 +1,289 @@
+"""
+로컬 대역(fake) 제공자 서버
+
+services.providers의 Fake*Provider가 호출하는 검색/텍스트/TTS 엔드포인트를 흉내 냅니다.
+응답 지연, 오류 비율, 페이로드 크기를 조절할 수 있어 유료 API 없이 /stream_search,
+/generate_podcast, /generate_report를 오프라인으로 끝까지 부하 테스트할 수 있습니다.
+
+    python benchmarks/fake_server.py --port 8765 --latency 0.3 --jitter 0.1 --error-rate 0.02
+    python benchmarks/fake_server.py --rate-limit 20   # 초당 20건을 넘으면 429 + Retry-After
+    PROVIDER_BACKEND=fake FAKE_PROVIDER_URL=http://127.0.0.1:8765 python app.py
+
+엔드포인트 (모두 POST, JSON 본문, "stream": true이면 NDJSON으로 조각을 나누어 전송)
+    /search  {"query"}                  -> {"text", "sources"}
+    /chat    {"model", "messages"}      -> {"text"}  (스크립트/보고서 목차·섹션/키워드를 프롬프트로 구분)
+    /speech  {"voice", "input", "speed"} -> audio/mpeg (무음 MP3 프레임)
+
+검색 결과의 출처는 이 서버의 GET 엔드포인트를 가리키므로 출처 보강(services/sources.py)도 오프라인으로 동작합니다.
+    GET /source/<n>  -> 302 /page/<n>  (그라운딩 리다이렉트 URI 흉내)
+    GET /page/<n>    -> <title>과 og:image가 있는 HTML
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+# MPEG-1 Layer III, 128kbps, 44.1kHz, 모노 무음 프레임 (1152 샘플 = 약 26ms)
+MP3_FRAME_HEADER = b"\xff\xfb\x90\xc4"
+MP3_FRAME_BYTES = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+MP3_FRAME = MP3_FRAME_HEADER + bytes(MP3_FRAME_BYTES - len(MP3_FRAME_HEADER))
+# 합성 음성 길이 추정용 초당 글자 수
+CHARS_PER_SECOND = 12
+
+QUERY_RE = re.compile(r'Original query: "(.*?)"')
+SECTION_RE = re.compile(r'작성할 섹션: \d+\. (.*?)(?: - |$)', re.MULTILINE)
+FILLER = "관련 동향과 주요 수치, 전문가 의견을 정리한 가짜 검색 결과 문장입니다. "
+
+
+def fill(prefix: str, size: int) -> str:
+    """prefix로 시작하여 UTF-8 기준 약 size 바이트가 되도록 채운 텍스트"""
+    text = prefix
+    while len(text.encode("utf-8")) < size:
+        text += FILLER
+    return text
+
+
+def search_text(query: str, size: int) -> str:
+    return fill(f"'{query}' 검색 결과 요약입니다. ", size)
+
+
+def search_sources(query: str, base_url: str, count: int = 3) -> List[Dict[str, str]]:
+    return [{"url": f"{base_url}/source/{i}?q={len(query)}", "title": "example.com"}
+            for i in range(1, count + 1)]
+
+
+def source_page(number: str) -> str:
+    return (f"<!doctype html><html><head><meta charset=\"utf-8\"><title>참고 자료 {number}</title>"
+            f"<meta property=\"og:title\" content=\"참고 자료 {number} - 가짜 기사\">"
+            f"<meta property=\"og:site_name\" content=\"가짜 뉴스\">"
+            f"<meta property=\"og:image\" content=\"/images/{number}.png\"></head>"
+            f"<body>{FILLER * 20}</body></html>")
+
+
+def script_text(lines: int) -> str:
+    speakers = ["지식", "호기심"]
+    return "\n".join(f"{speakers[i % 2]}: 대사 {i + 1}번입니다. " + "이 주제의 핵심을 짚어 보겠습니다. " * 2
+                     for i in range(lines)) + "\n"
+
+
+def report_text(size: int) -> str:
+    sections = []
+    index = 1
+    while sum(len(s.encode("utf-8")) for s in sections) < size:
+        sections.append(
+            f"## {index}. 분석 섹션\n"
+            f"{FILLER * 4}**핵심 통찰**을 정리합니다.\n\n"
+            f"- 주요 요인 {index}: 수요 변화\n"
+            f"- 주요 요인 {index + 1}: 규제 영향\n\n"
+        )
+        index += 1
+    return "# 가짜 보고서\n\n" + "".join(sections)
+
+
+def report_outline(sections: int) -> str:
+    outline = [{"title": f"{i}. 분석 섹션", "focus": "주요 요인과 영향"} for i in range(1, sections + 1)]
+    return json.dumps(outline, ensure_ascii=False)
+
+
+def report_section(title: str, size: int) -> str:
+    return fill(f"## {title}\n", size) + "\n**핵심 통찰**을 정리합니다.\n\n- 주요 요인: 수요 변화\n- 주요 요인: 규제 영향\n"
+
+
+def chat_text(messages: List[Dict[str, str]], options: argparse.Namespace) -> str:
+    """프롬프트 내용으로 용도(스크립트, 보고서 목차/섹션/전체, 키워드)를 구분하여 응답을 만듭니다."""
+    prompt = "\n".join(m.get("content", "") for m in messages)
+    if "지식" in prompt and "호기심" in prompt:
+        return script_text(options.script_lines)
+    section = SECTION_RE.search(prompt)
+    if section:
+        # 섹션들을 합치면 전체 보고서와 비슷한 크기가 되도록 나눔
+        return report_section(section.group(1), options.report_bytes // max(1, options.report_sections))
+    if "목차" in prompt and "JSON" in prompt:
+        return report_outline(options.report_sections)
+    if "보고서" in prompt:
+        return report_text(options.report_bytes)
+    # 키워드 추출: 프롬프트의 Original query: "..." 부분에서 앞 단어 몇 개를 돌려줌
+    match = QUERY_RE.search(prompt)
+    return " ".join((match.group(1) if match else prompt).split()[:3])
+
+
+def speech_audio(text: str, speed: float, audio_bytes: int) -> bytes:
+    if audio_bytes:
+        frames = max(1, audio_bytes // MP3_FRAME_BYTES)
+    else:
+        seconds = len(text) / CHARS_PER_SECOND / (speed or 1.0)
+        frames = max(1, math.ceil(seconds / MP3_FRAME_SECONDS))
+    return MP3_FRAME * frames
+
+
+def chunks(text: str, count: int) -> List[str]:
+    size = max(1, math.ceil(len(text) / max(1, count)))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class RateLimiter:
+    """제공자의 요청 한도를 흉내 내는 고정 창(1초) 카운터. 한도를 넘으면 다음 창까지 남은 시간을 반환합니다."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.window = 0
+        self.count = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def check(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.time()
+            if int(now) != self.window:
+                self.window, self.count = int(now), 0
+            self.count += 1
+            if self.count <= self.rate:
+                return 0.0
+            self.rejected += 1
+            return self.window + 1 - now
+
+
+def make_handler(options: argparse.Namespace):
+    limiter = RateLimiter(options.rate_limit)
+
+    class FakeProviderHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        rate_limiter = limiter
+
+        def do_GET(self):
+            time.sleep(max(0.0, options.page_latency))
+            kind, _, rest = self.path.lstrip("/").partition("/")
+            number = rest.split("?", 1)[0]
+            if kind == "source" and number:
+                self.send_response(302)
+                self.send_header("Location", f"/page/{number}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if kind == "page" and number:
+                data = source_page(number).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self.send_json({"error": {"message": f"unknown path {self.path}"}}, status=404)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            retry_after = limiter.check()
+            if retry_after:
+                return self.send_json({"error": {"message": "rate limit exceeded"}}, status=429,
+                                      headers={"Retry-After": f"{retry_after:.3f}"})
+            time.sleep(max(0.0, options.latency + random.uniform(-options.jitter, options.jitter)))
+            if random.random() < options.error_rate:
+                return self.send_json({"error": {"message": "injected failure"}}, status=500)
+
+            if self.path == "/search":
+                query = body.get("query", "")
+                text = search_text(query, options.search_bytes)
+                sources = search_sources(query, f"http://{self.headers.get('Host', 'localhost')}")
+                if body.get("stream"):
+                    return self.send_stream([{"text": part, "sources": sources if i == 0 else []}
+                                             for i, part in enumerate(chunks(text, options.stream_chunks))])
+                return self.send_json({"text": text, "sources": sources})
+            if self.path == "/chat":
+                text = chat_text(body.get("messages", []), options)
+                if body.get("stream"):
+                    return self.send_stream([{"text": part} for part in chunks(text, options.stream_chunks)])
+                return self.send_json({"text": text})
+            if self.path == "/speech":
+                audio = speech_audio(body.get("input", ""), body.get("speed", 1.0), options.audio_bytes)
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Content-Length", str(len(audio)))
+                self.end_headers()
+                self.wfile.write(audio)
+                return
+            self.send_json({"error": {"message": f"unknown path {self.path}"}}, status=404)
+
+        def send_json(self, payload, status: int = 200, headers: Dict[str, str] = None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_stream(self, events: List[Dict]):
+            """NDJSON 조각을 chunk_delay 간격으로 보내고 연결을 닫습니다."""
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for event in events:
+                self.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                time.sleep(options.chunk_delay)
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeProviderHandler
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청당 첫 응답까지 지연 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답을 보낼 확률 (0~1)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="초당 허용 요청 수, 넘으면 429와 Retry-After로 응답 (0이면 제한 없음)")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="출처 페이지(GET) 응답 지연 시간(초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="스트리밍 조각 사이 지연 시간(초)")
+    parser.add_argument("--stream-chunks", type=int, default=20, help="스트리밍 응답을 나눌 조각 수")
+    parser.add_argument("--search-bytes", type=int, default=4096, help="검색 결과 텍스트 크기")
+    parser.add_argument("--report-bytes", type=int, default=8192, help="보고서 본문 크기")
+    parser.add_argument("--report-sections", type=int, default=4, help="보고서 목차 응답의 섹션 수")
+    parser.add_argument("--script-lines", type=int, default=12, help="팟캐스트 스크립트 대사 수")
+    parser.add_argument("--audio-bytes", type=int, default=0, help="TTS 응답 크기 (0이면 텍스트 길이에 비례)")
+    return parser
+
+
+def start_server(**overrides) -> ThreadingHTTPServer:
+    """
+    기본 옵션에 overrides를 덮어써서 백그라운드 스레드로 서버를 시작합니다 (벤치마크에서 사용).
+    port=0이면 빈 포트를 사용하며, 실제 주소는 server.server_address로 확인합니다.
+    """
+    options = build_parser().parse_args([])
+    for name, value in overrides.items():
+        setattr(options, name, value)
+    server = ThreadingHTTPServer((options.host, options.port), make_handler(options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    options = build_parser().parse_args()
+    server = ThreadingHTTPServer((options.host, options.port), make_handler(options))
+    server.daemon_threads = True
+    print(f"fake provider server: http://{options.host}:{server.server_port} "
+          f"(latency={options.latency}s error_rate={options.error_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
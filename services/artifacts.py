@@ -0,0 +1,165 @@
+"""
+생성 결과물(팟캐스트 MP3와 스크립트, PDF 보고서) 저장소.
+
+(종류, 쿼리, 검색 텍스트, 생성 파라미터)의 해시를 파일 이름으로 사용하므로 같은 입력이면 기존 파일을 바로
+돌려주고, 같은 초에 들어온 요청끼리 파일 이름이 겹치지 않습니다. 쓰기는 같은 디렉토리의 임시 파일에 쓴 뒤
+os.replace로 교체하여 원자적으로 처리하고, 오래된 파일(max_age)과 전체 크기 초과분(max_bytes)은
+가장 오래 사용되지 않은 파일부터 삭제합니다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from services.tts_cache import normalize_text
+
+TMP_SUFFIX = ".tmp"
+# 이보다 오래된 임시 파일은 중단된 쓰기의 잔여물로 보고 시작 시 정리 (다른 프로세스가 쓰는 중일 수 있으므로 여유를 둠)
+STALE_TMP_SECONDS = 3600
+
+
+def make_artifact_key(kind: str, query: str, search_text: str, params: dict) -> str:
+    payload = json.dumps([kind, normalize_text(query), normalize_text(search_text), params],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_fingerprint(path: str) -> Optional[Tuple[str, int, int]]:
+    """입력 파일(배경음악 등)이 바뀌면 키도 바뀌도록 (이름, 크기, 수정 시각)을 반환합니다."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.basename(path), stat.st_size, stat.st_mtime_ns
+
+
+class ArtifactStore:
+    """
+    결과물 파일을 한 디렉토리에 "<키>.<확장자>" 이름으로 저장하는 디스크 저장소.
+
+    사용 순서는 파일 mtime으로 기록하므로 프로세스를 재시작해도 LRU 순서와 만료 시각이 유지됩니다.
+    max_age가 0이면 기간 만료를 적용하지 않습니다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # name -> (크기, 마지막 사용 시각), 오래된 순
+        self._total_bytes = 0
+        self._load_index()
+        with self._lock:
+            self._evict()
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _load_index(self):
+        entries = []
+        now = time.time()
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if not path.is_file():
+                continue
+            if path.name.endswith(TMP_SUFFIX):
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    self._unlink(path)
+                continue
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        for mtime, name, size in sorted(entries):
+            self._index[name] = (size, mtime)
+            self._total_bytes += size
+
+    def get(self, name: str) -> Optional[str]:
+        """저장된 결과물의 경로를 반환합니다. 없거나 만료되었으면 None."""
+        path = self.path(name)
+        now = time.time()
+        try:
+            stat = path.stat()
+            expired = self.max_age and now - stat.st_mtime > self.max_age
+            if not expired:
+                os.utime(path)
+        except OSError:
+            stat, expired = None, False
+        with self._lock:
+            if stat is None or expired:
+                self.misses += 1
+                if name in self._index:
+                    self._total_bytes -= self._index.pop(name)[0]
+                if expired:
+                    self.evictions += 1
+                    self._unlink(path)
+                return None
+            self.hits += 1
+            self._total_bytes += stat.st_size - self._index.pop(name, (0, 0))[0]
+            self._index[name] = (stat.st_size, now)
+        return str(path)
+
+    @contextmanager
+    def writing(self, name: str) -> Iterator[str]:
+        """
+        임시 파일 경로를 넘겨주고, with 블록이 정상 종료되면 name으로 원자적으로 교체합니다.
+        블록에서 예외가 나면 임시 파일을 지우므로 반쯤 쓰인 결과물이 노출되지 않습니다.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.", suffix=TMP_SUFFIX)
+        os.close(fd)
+        try:
+            yield tmp_path
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self.path(name))
+        except BaseException:
+            self._unlink(Path(tmp_path))
+            raise
+        with self._lock:
+            self._total_bytes += size - self._index.pop(name, (0, 0))[0]
+            self._index[name] = (size, time.time())
+            self._evict()
+
+    def put_bytes(self, name: str, data: bytes) -> str:
+        with self.writing(name) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        return str(self.path(name))
+
+    def _evict(self):
+        """만료된 항목과 크기 초과분을 오래된 순으로 삭제합니다 (가장 최근 항목은 유지). _lock을 잡은 상태에서 호출."""
+        deadline = time.time() - self.max_age if self.max_age else None
+        while len(self._index) > 1:
+            name, (size, used_at) = next(iter(self._index.items()))
+            if self._total_bytes <= self.max_bytes and (deadline is None or used_at >= deadline):
+                break
+            del self._index[name]
+            self._total_bytes -= size
+            self.evictions += 1
+            self._unlink(self.path(name))
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,181 @@
+import io
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+MIX_BLOCK_SECONDS = 5  # 한 번에 섞는 블록 길이
+DECODE_WORKERS = 4  # 세그먼트 MP3를 동시에 디코딩하는 ffmpeg 프로세스 수
+
+
+@lru_cache(maxsize=4)
+def background_music(music_file: str, volume_reduction: int) -> AudioSegment:
+    """배경음악을 한 번만 디코딩하고 볼륨을 줄여 둡니다."""
+    music = AudioSegment.from_file(music_file)
+    return music - abs(volume_reduction)
+
+
+@lru_cache(maxsize=8)
+def background_bed(music_file: str, volume_reduction: int, frame_rate: int, channels: int) -> np.ndarray:
+    """
+    감쇠된 배경음악을 지정한 포맷의 16-bit PCM 배열(frames x channels)로 반환합니다.
+    포맷별로 한 번만 변환하여 재사용하며, 공유 버퍼이므로 읽기 전용입니다.
+    """
+    music = (background_music(music_file, volume_reduction)
+             .set_frame_rate(frame_rate)
+             .set_channels(channels)
+             .set_sample_width(SAMPLE_WIDTH))
+    bed = np.frombuffer(music.raw_data, dtype=np.int16).reshape(-1, channels)
+    bed.flags.writeable = False
+    return bed
+
+
+def preload_background(music_file: str, frame_rate: int, channels: int, volume_reduction: int = -20):
+    """서버 시작 시 배경음악을 출력 포맷으로 미리 디코딩하여 첫 요청의 지연을 없앱니다."""
+    background_bed(music_file, volume_reduction, frame_rate, channels)
+
+
+def decode_mp3(data: bytes) -> AudioSegment:
+    """메모리의 MP3 바이트를 AudioSegment로 디코딩합니다."""
+    return AudioSegment.from_file(io.BytesIO(data), format="mp3")
+
+
+def assemble_segments(parts: List[bytes], voices: List[str], gap_ms: int = 0) -> AudioSegment:
+    """
+    TTS가 만든 개별 MP3 파일들을 PCM 수준에서 이어 붙여 하나의 음성 트랙을 만듭니다.
+    화자(voice)가 바뀌는 지점에는 gap_ms 길이의 무음을 넣습니다.
+    """
+    with ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="decode") as executor:
+        decoded = list(executor.map(decode_mp3, parts))
+
+    first = decoded[0]
+    frame_rate, channels = first.frame_rate, first.channels
+    frame_bytes = SAMPLE_WIDTH * channels
+    silence = b"\0" * (int(frame_rate * gap_ms / 1000) * frame_bytes)
+
+    chunks = []
+    for i, segment in enumerate(decoded):
+        if i and gap_ms and voices[i] != voices[i - 1]:
+            chunks.append(silence)
+        segment = segment.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(SAMPLE_WIDTH)
+        chunks.append(segment.raw_data)
+
+    return AudioSegment(data=b"".join(chunks), sample_width=SAMPLE_WIDTH,
+                        frame_rate=frame_rate, channels=channels)
+
+
+def to_pcm(segment: AudioSegment, frame_rate: int, channels: int) -> np.ndarray:
+    """AudioSegment를 지정한 포맷의 16-bit PCM 배열(frames x channels)로 변환합니다."""
+    segment = segment.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(SAMPLE_WIDTH)
+    return np.frombuffer(segment.raw_data, dtype=np.int16).reshape(-1, channels)
+
+
+def mix_blocks(voice: np.ndarray, bed: np.ndarray, block_frames: int, offset: int = 0,
+               voice_gain: float = 1.0, bed_gains: Optional[np.ndarray] = None,
+               gain_window: int = 1) -> Iterator[np.ndarray]:
+    """
+    음성 PCM 위에 배경음악을 반복 재생하며 고정 크기 블록 단위로 섞습니다.
+    배경음악을 음성 길이만큼 복제하지 않고, 블록마다 필요한 구간만 순환 인덱스로 잘라 씁니다.
+    offset은 배경음악에서 시작할 프레임 위치입니다.
+    voice_gain은 음성에 곱할 게인(음량 정규화), bed_gains는 gain_window 프레임마다 배경음악에 곱할 게인(덕킹)입니다.
+    """
+    bed_frames = len(bed)
+    mixed = np.empty((block_frames, voice.shape[1]), dtype=np.float32)
+    for start in range(0, len(voice), block_frames):
+        block = voice[start:start + block_frames]
+        out = mixed[:len(block)]
+        np.multiply(block, np.float32(voice_gain), out=out)
+        envelope = None
+        if bed_gains is not None:
+            # 창 단위 게인을 이 블록 구간의 프레임 단위로 펼침
+            first, skip = divmod(start, gain_window)
+            windows = bed_gains[first:first + -(-(skip + len(block)) // gain_window)]
+            envelope = np.repeat(windows, gain_window)[skip:skip + len(block), np.newaxis]
+        # 블록이 배경음악 끝을 넘으면 앞부분으로 돌아가 이어서 더함
+        filled = 0
+        position = (offset + start) % bed_frames
+        while filled < len(block):
+            take = min(len(block) - filled, bed_frames - position)
+            if envelope is None:
+                out[filled:filled + take] += bed[position:position + take]
+            else:
+                out[filled:filled + take] += bed[position:position + take] * envelope[filled:filled + take]
+            filled += take
+            position = 0
+        yield np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def mp3_output_args(bitrate: Optional[str]) -> List[str]:
+    return ["-f", "mp3"] + (["-b:a", bitrate] if bitrate else [])
+
+
+def encode_mp3(blocks: Iterator[np.ndarray], frame_rate: int, channels: int, output_file: str,
+               bitrate: Optional[str] = None):
+    """PCM 블록을 ffmpeg 한 프로세스에 스트리밍하여 MP3로 인코딩합니다 (bitrate가 없으면 ffmpeg 기본값)."""
+    command = [AudioSegment.converter, "-y", "-loglevel", "error",
+               "-f", "s16le", "-ar", str(frame_rate), "-ac", str(channels), "-i", "pipe:0",
+               *mp3_output_args(bitrate), output_file]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for block in blocks:
+            process.stdin.write(block.tobytes())
+        process.stdin.close()
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg 인코딩 실패: {stderr.decode('utf-8', 'replace').strip()}")
+
+
+def encode_mp3_stream(blocks: Iterator[np.ndarray], frame_rate: int, channels: int,
+                      bitrate: Optional[str] = None, chunk_size: int = 16 * 1024) -> Iterator[bytes]:
+    """
+    PCM 블록을 ffmpeg 한 프로세스에 넣으면서 인코딩된 MP3 바이트를 나오는 대로 yield합니다 (점진적 전송용).
+    블록은 별도 스레드에서 읽으므로 블록 생성(TTS 대기, 디코딩)과 인코딩 결과 전송이 겹쳐 실행됩니다.
+    소비를 중단하면 ffmpeg를 종료하고 블록 이터레이터를 닫습니다.
+    """
+    command = [AudioSegment.converter, "-y", "-loglevel", "error",
+               "-f", "s16le", "-ar", str(frame_rate), "-ac", str(channels), "-i", "pipe:0",
+               *mp3_output_args(bitrate), "-write_xing", "0", "-flush_packets", "1", "pipe:1"]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    errors = []
+
+    def feed():
+        try:
+            for block in blocks:
+                process.stdin.write(block.tobytes())
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            if hasattr(blocks, "close"):
+                blocks.close()
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, name="mp3-feeder", daemon=True)
+    feeder.start()
+    try:
+        while True:
+            chunk = process.stdout.read1(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    feeder.join()
+    stderr = process.stderr.read()
+    if errors:
+        raise errors[0]
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg 인코딩 실패: {stderr.decode('utf-8', 'replace').strip()}")
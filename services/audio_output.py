@@ -0,0 +1,81 @@
+"""
+팟캐스트 출력 오디오 설정: 인코딩 프리셋, 음성 음량 정규화, 배경음악 덕킹.
+
+프리셋이 출력 샘플레이트/채널/비트레이트를 정하고 믹싱을 처음부터 그 포맷으로 하므로, ffmpeg는 변환 없이
+인코딩만 합니다. 음량과 덕킹 엔벨로프는 짧은 창(WINDOW_SECONDS) 단위 RMS를 NumPy로 한 번에 계산하고,
+게인 적용은 services.audio.mix_blocks의 블록 믹싱과 함께 처리하여 PCM을 추가로 복사하지 않습니다.
+"""
+import math
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+
+class AudioPreset(NamedTuple):
+    name: str
+    frame_rate: int
+    channels: int
+    bitrate: str
+    # 음성의 목표 음량 (무음 구간을 제외한 RMS, dBFS). K 가중치를 생략한 LUFS 근사값
+    target_loudness: float
+    # 음성이 나오는 동안 배경음악을 추가로 줄이는 양(dB), 0이면 덕킹하지 않음
+    duck_db: float
+
+
+PRESETS: Dict[str, AudioPreset] = {
+    # TTS 음성(24kHz 모노)에 맞춘 기본값: 파일 크기와 청취자당 대역폭이 128k 스테레오의 절반
+    "speech": AudioPreset("speech", frame_rate=24000, channels=1, bitrate="64k", target_loudness=-19.0, duck_db=8.0),
+    "stereo": AudioPreset("stereo", frame_rate=44100, channels=2, bitrate="128k", target_loudness=-16.0, duck_db=6.0),
+}
+
+WINDOW_SECONDS = 0.05  # RMS 엔벨로프 창 길이
+GATE_DBFS = -50.0  # 음량 측정에서 제외하는 무음 기준
+PEAK_CEILING_DBFS = -1.0  # 정규화 후 음성 최대 피크
+SPEECH_THRESHOLD_DBFS = -40.0  # 이보다 큰 창을 음성 구간으로 보고 배경음악을 줄임
+DUCK_RAMP_SECONDS = 0.3  # 덕킹 게인이 바뀌는 구간 길이 (음성 시작 직전부터 줄어듦)
+
+
+def get_preset(name: str) -> AudioPreset:
+    try:
+        return PRESETS[name]
+    except KeyError:
+        raise ValueError(f"알 수 없는 오디오 프리셋: {name!r} (사용 가능: {', '.join(PRESETS)})") from None
+
+
+def window_frames(frame_rate: int) -> int:
+    return max(1, int(frame_rate * WINDOW_SECONDS))
+
+
+def window_rms(pcm: np.ndarray, frame_rate: int) -> np.ndarray:
+    """16-bit PCM(frames x channels)의 창별 RMS를 0~1 스케일로 반환합니다 (마지막 창은 0으로 채움)."""
+    window = window_frames(frame_rate)
+    count = -(-len(pcm) // window)
+    power = np.zeros(count * window, dtype=np.float32)
+    np.mean(np.square(pcm, dtype=np.float32), axis=1, out=power[:len(pcm)])
+    return np.sqrt(power.reshape(count, window).mean(axis=1)) / 32768.0
+
+
+def analyze_voice(pcm: np.ndarray, frame_rate: int, preset: AudioPreset) -> Tuple[float, np.ndarray]:
+    """
+    음성 PCM을 한 번 훑어 (음성에 곱할 게인, 배경음악에 곱할 창별 게인)을 계산합니다.
+    음성 게인은 목표 음량에 맞추되 피크가 PEAK_CEILING_DBFS를 넘지 않도록 제한하고,
+    배경음악 게인은 음성 구간에서 duck_db만큼 낮추며 DUCK_RAMP_SECONDS에 걸쳐 부드럽게 바뀝니다.
+    """
+    rms = window_rms(pcm, frame_rate)
+    voiced = rms[rms > 10 ** (GATE_DBFS / 20)]
+    voice_gain = 1.0
+    if voiced.size:
+        loudness = 10 * math.log10(float(np.mean(np.square(voiced))))
+        peak = max(int(pcm.max()), -int(pcm.min())) / 32768.0
+        gain_db = min(preset.target_loudness - loudness, PEAK_CEILING_DBFS - 20 * math.log10(peak))
+        voice_gain = 10 ** (gain_db / 20)
+
+    bed_gains = np.ones(len(rms), dtype=np.float32)
+    if preset.duck_db > 0:
+        bed_gains[rms > 10 ** (SPEECH_THRESHOLD_DBFS / 20)] = 10 ** (-preset.duck_db / 20)
+        ramp = max(1, round(DUCK_RAMP_SECONDS / WINDOW_SECONDS))
+        # 가장자리는 1.0(덕킹 없음)으로 채워 이동 평균이 구간 밖 값을 0으로 보지 않도록 함
+        padded = np.pad(bed_gains, ramp // 2, constant_values=1.0)
+        bed_gains = np.convolve(padded, np.full(ramp, 1 / ramp, dtype=np.float32), mode="valid")[:len(rms)]
+    return voice_gain, bed_gains.astype(np.float32)
+
@@ -0,0 +1,147 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+TERMINAL_STATUSES = ("done", "error")
+
+
+class JobQueueFull(Exception):
+    """대기 중이거나 실행 중인 작업이 max_pending개에 도달하여 새 작업을 받을 수 없음"""
+
+
+class Job:
+    """백그라운드 작업 하나의 상태와 단계별 진행 이벤트"""
+
+    def __init__(self, kind: str, query: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.query = query
+        self.status = "queued"
+        self.stage = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+
+    def emit(self, stage: str, **data):
+        """진행 단계 이벤트를 기록하고 이벤트 스트림 구독자를 깨웁니다."""
+        with self._cond:
+            self.stage = stage
+            self.events.append({"stage": stage, "time": time.time(), **data})
+            self._cond.notify_all()
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self.stage = status
+            event = {"stage": status, "time": self.finished_at}
+            if error:
+                event["error"] = error
+            self.events.append(event)
+            self._cond.notify_all()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "query": self.query,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.events[-1] if self.events else None,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+    def iter_events(self, timeout: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        지금까지의 이벤트와 이후 이벤트를 순서대로 yield합니다.
+        timeout 동안 새 이벤트가 없으면 None을 yield하여 호출자가 keep-alive를 보낼 수 있게 합니다.
+        """
+        index = 0
+        while True:
+            with self._cond:
+                if index >= len(self.events) and not self.finished:
+                    self._cond.wait(timeout)
+                pending = self.events[index:]
+                index += len(pending)
+                finished = self.finished
+            if not pending:
+                yield None
+            for event in pending:
+                yield event
+            if finished and index >= len(self.events):
+                return
+
+
+class JobManager:
+    """
+    팟캐스트/보고서 생성 같은 긴 작업을 로컬 워커 풀에서 실행합니다.
+
+    작업 함수는 progress 키워드 인자로 Job.emit을 받아 단계별 진행 상황을 보고합니다.
+    완료된 작업은 최근 retention개까지만 보관합니다.
+    끝나지 않은 작업이 max_pending개이면 submit이 JobQueueFull을 내어, 요청이 몰려도 대기열이 끝없이 쌓이지 않습니다.
+    """
+
+    def __init__(self, max_workers: int, retention: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.retention = retention
+        self.max_pending = max_pending
+
+    def submit(self, kind: str, query: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        job = Job(kind, query)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"대기 중인 작업이 너무 많습니다 ({self._pending}/{self.max_pending})")
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args, kwargs):
+        try:
+            with job._cond:
+                job.status = "running"
+            job.emit("started")
+            try:
+                result = fn(*args, progress=job.emit, **kwargs)
+            except Exception as e:
+                job._finish("error", error=str(e))
+            else:
+                job._finish("done", result=result)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.retention)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
@@ -1,26 +1,36 @@
-import openai
-import google.generativeai as genai
-from utils.config import OPENAI_API_KEY, GEMINI_API_KEY
-from typing import Optional, Dict, Any, List
-from pydub import AudioSegment
-openai.api_key = OPENAI_API_KEY
-genai.configure(api_key=GEMINI_API_KEY)
-gemini_model = genai.GenerativeModel('gemini-1.5-flash-002')
+import itertools
+import logging
+import time
 
+from utils.config import AUDIO_PRESET, SPEAKER_GAP_MS
+from utils.metrics import API_ERRORS, STAGE_SECONDS
+from services.providers import get_text_provider
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable, Iterator, Union, TYPE_CHECKING
+from services import tts
+from services.tts import split_text, synthesize_ordered, synthesize_segments, synthesize_stream, TTSError
 
+if TYPE_CHECKING:
+    from pydub import AudioSegment
+    from services.audio_output import AudioPreset
 
-def generate_script(query: str, search_results: str, 
-                       duration_minutes: int = 5) -> str:
+logger = logging.getLogger(__name__)
+
+SCRIPT_MODEL = "gpt-4o-mini"
+SCRIPT_TEMPERATURE = 0.2
+
+
+def build_script_messages(query: str, search_results: str,
+                          duration_minutes: int = 5) -> List[Dict[str, str]]:
     """
-    Generates a strictly formatted podcast script for two AI hosts.
-    
+    Builds the chat messages that ask for a strictly formatted podcast script.
+
     Args:
         query (str): The topic of the podcast.
         search_results (str): The results of the search to be used in the script.
         duration_minutes (int): The desired duration of the podcast in minutes.
 
     Returns:
-        str: The generated script in a strict format that can be reliably parsed.
+        List[Dict[str, str]]: System and user messages for the chat completion.
     """
     system_prompt = """You are an expert Korean podcast script writer. Your task is to create a precisely formatted script 
 that follows strict formatting rules. The podcast features two AI hosts:
@@ -80,130 +90,285 @@ INCORRECT formatting examples to AVOID:
 검색 결과:
 {search_results}"""
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def generate_script(query: str, search_results: str, 
+                       duration_minutes: int = 5) -> str:
+    """
+    Generates a strictly formatted podcast script for two AI hosts.
+    
+    Args:
+        query (str): The topic of the podcast.
+        search_results (str): The results of the search to be used in the script.
+        duration_minutes (int): The desired duration of the podcast in minutes.
+
+    Returns:
+        str: The generated script in a strict format that can be reliably parsed.
+    """
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.2,
-            max_tokens=2000
-        )
-        return response.choices[0].message.content
+        with STAGE_SECONDS.time(stage="script"):
+            return get_text_provider("openai").complete(
+                build_script_messages(query, search_results, duration_minutes),
+                model=SCRIPT_MODEL,
+                temperature=SCRIPT_TEMPERATURE,
+                max_tokens=2000
+            )
     except Exception as e:
-        console.print(f"[red]Error generating podcast script: {str(e)}[/red]")
+        API_ERRORS.inc(operation="script")
+        logger.error("Error generating podcast script: %s", e)
         return None
 
-def generate_audio(script: str) -> Optional[bytes]:
-    try:
-        if not script.strip():
-            print("오류: 제공된 스크립트가 비어 있습니다.")
-            return None
+def stream_script_lines(query: str, search_results: str,
+                        duration_minutes: int = 5) -> Iterator[str]:
+    """
+    Streams the podcast script and yields each dialogue line as soon as it is complete.
 
-        segments = []
-        current_speaker = None
-        current_text = []
-
-        for line in script.split('\n'):
-            stripped_line = line.strip()
-            print(f"처리 중인 라인: {stripped_line}")
-
-            if stripped_line.startswith('지식:'):
-                if current_speaker and current_text:
-                    segments.append((current_speaker, ' '.join(current_text)))
-                current_speaker = "onyx"  # 권위적인 음성
-                current_text = [stripped_line[3:].strip()]  # "지식:" 제거
-            elif stripped_line.startswith('호기심:'):
-                if current_speaker and current_text:
-                    segments.append((current_speaker, ' '.join(current_text)))
-                current_speaker = "nova"  # 활기찬 음성
-                current_text = [stripped_line[4:].strip()]  # "호기심:" 제거
-            elif stripped_line:  # 공백이 아닌 줄은 현재 스피커의 텍스트에 추가
-                if current_speaker:
-                    current_text.append(stripped_line)
-                else:
-                    print(f"[warning]현재 스피커가 없어서 해당 라인 '{stripped_line}'을 건너뜁니다.")
+    Args:
+        query (str): The topic of the podcast.
+        search_results (str): The results of the search to be used in the script.
+        duration_minutes (int): The desired duration of the podcast in minutes.
 
+    Yields:
+        str: One finished line of the script (without the trailing newline).
+    """
+    start = time.perf_counter()
+    stream = get_text_provider("openai").stream(
+        build_script_messages(query, search_results, duration_minutes),
+        model=SCRIPT_MODEL,
+        temperature=SCRIPT_TEMPERATURE,
+        max_tokens=2000
+    )
+    buffer = ""
+    try:
+        for text in stream:
+            buffer += text
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                yield line
+    except Exception:
+        API_ERRORS.inc(operation="script")
+        raise
+    # 스트림을 끝까지 받은 시간 (완성된 줄은 그 사이 TTS로 넘어가 병행 처리됨)
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="script")
+    if buffer:
+        yield buffer
+
+def iter_segments(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    스크립트 줄을 받아 (voice, text) 세그먼트를 완성되는 즉시 yield합니다.
+    화자 라벨이 없는 줄은 직전 화자의 대사에 이어 붙이므로, 세그먼트는 다음 화자가 나올 때 확정됩니다.
+    """
+    current_speaker = None
+    current_text = []
+
+    for line in lines:
+        stripped_line = line.strip()
+        logger.debug("처리 중인 라인: %s", stripped_line)
+
+        if stripped_line.startswith('지식:'):
+            if current_speaker and current_text:
+                yield current_speaker, ' '.join(current_text)
+            current_speaker = "onyx"  # 권위적인 음성
+            current_text = [stripped_line[3:].strip()]  # "지식:" 제거
+        elif stripped_line.startswith('호기심:'):
+            if current_speaker and current_text:
+                yield current_speaker, ' '.join(current_text)
+            current_speaker = "nova"  # 활기찬 음성
+            current_text = [stripped_line[4:].strip()]  # "호기심:" 제거
+        elif stripped_line:  # 공백이 아닌 줄은 현재 스피커의 텍스트에 추가
+            if current_speaker:
+                current_text.append(stripped_line)
             else:
-                # 지식, 호기심이 없거나 공백인 경우 건너뜀
-                print(f"건너뜬 라인: {stripped_line}")
+                logger.warning("현재 스피커가 없어서 해당 라인 '%s'을 건너뜁니다.", stripped_line)
+
+        else:
+            # 지식, 호기심이 없거나 공백인 경우 건너뜀
+            logger.debug("건너뜬 라인: %s", stripped_line)
 
-        # 마지막으로 남은 텍스트 세그먼트 처리
-        if current_speaker and current_text:
-            segments.append((current_speaker, ' '.join(current_text)))
+    # 마지막으로 남은 텍스트 세그먼트 처리
+    if current_speaker and current_text:
+        yield current_speaker, ' '.join(current_text)
+
+def parse_script(script: str) -> List[Tuple[str, str]]:
+    """스크립트를 (voice, text) 세그먼트 목록으로 변환합니다."""
+    return list(iter_segments(script.split('\n')))
+
+def generate_audio(script: str, progress: Optional[Callable[[int, int], None]] = None) -> Optional['AudioSegment']:
+    """
+    스크립트의 대사를 음성으로 합성하여 하나의 음성 트랙(AudioSegment)으로 이어 붙여 반환합니다.
+    실패하면 None을 반환합니다.
+    """
+    try:
+        if not script.strip():
+            logger.error("제공된 스크립트가 비어 있습니다.")
+            return None
 
+        segments = parse_script(script)
         if not segments:
-            print("오류: 세그먼트가 생성되지 않았습니다.")
+            logger.error("세그먼트가 생성되지 않았습니다.")
             return None
 
-        print(f"생성된 세그먼트 수: {len(segments)}")
-        for i, (speaker, text) in enumerate(segments, 1):
-            print(f"Segment {i} - Speaker: {speaker}, Text: {text[:50]}...")
-
-        all_audio = []
-        for i, (voice, text) in enumerate(segments, 1):
-            try:
-                text_parts = []
-                if len(text) > 1000:
-                    print(f"[yellow]Segment {i} 텍스트가 너무 깁니다. 나눕니다.[/yellow]")
-                    words = text.split()
-                    part = []
-                    for word in words:
-                        if len(' '.join(part) + ' ' + word) <= 1000:
-                            part.append(word)
-                        else:
-                            text_parts.append(' '.join(part))
-                            part = [word]
-                    if part:
-                        text_parts.append(' '.join(part))
-                else:
-                    text_parts = [text]
-
-                # 나뉜 텍스트 각각에 대해 음성 생성
-                for part in text_parts:
-                    response = openai.audio.speech.create(
-                        model="tts-1",
-                        voice=voice,
-                        input=part,
-                        speed=1.05
-                    )
-                    all_audio.append(response.content)
-            except Exception as e:
-                print(f"[red]Segment {i} 음성 생성 실패: {str(e)}[/red]")
-
-        # 생성된 모든 오디오 조합
-        if all_audio:
-            print(f"[green]총 생성된 오디오 세그먼트 수: {len(all_audio)}[/green]")
-            return b''.join(all_audio)
-        else:
-            print("[red]오디오 세그먼트 생성 실패: 생성된 데이터 없음[/red]")
+        logger.info("생성된 세그먼트 수: %d", len(segments))
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, (speaker, text) in enumerate(segments, 1):
+                logger.debug("Segment %d - Speaker: %s, Text: %s...", i, speaker, text[:50])
+
+        # 세그먼트를 병렬로 합성 (결과는 스크립트 순서 유지, 실패 시 재시도 후 TTSError)
+        try:
+            with STAGE_SECONDS.time(stage="tts"):
+                all_audio = synthesize_segments(segments, progress=progress)
+        except TTSError as e:
+            logger.error("오디오 세그먼트 생성 실패: %s", e)
             return None
 
-    except Exception as e:
-        print(f"[red]generate_audio 오류: {str(e)}[/red]")
-        return None
+        if tts.tts_cache is not None:
+            logger.debug("TTS 캐시 통계: %s", tts.tts_cache.stats())
 
+        # 생성된 모든 오디오를 PCM 수준에서 이어 붙임
+        if all_audio:
+            from services.audio import assemble_segments
+            logger.info("총 생성된 오디오 세그먼트 수: %d", len(all_audio))
+            voices = [voice for voice, text in segments for _ in split_text(text)]
+            return assemble_segments(all_audio, voices, gap_ms=SPEAKER_GAP_MS)
+        else:
+            logger.error("오디오 세그먼트 생성 실패: 생성된 데이터 없음")
+            return None
 
     except Exception as e:
-        print(f"[red]generate_audio 오류: {str(e)}[/red]")
+        logger.exception("generate_audio 오류: %s", e)
         return None
-def add_background_music(audio_file: str, music_file: str, output_file: str, volume_reduction: int = -20):
-    try:
-        voice = AudioSegment.from_file(audio_file)
 
-        music = AudioSegment.from_file(music_file)
+def generate_podcast_audio(query: str, search_results: str, duration_minutes: int = 5,
+                           progress: Optional[Callable[[int, int], None]] = None) -> Tuple[Optional[str], Optional['AudioSegment']]:
+    """
+    스크립트 생성과 음성 합성을 파이프라인으로 겹쳐 실행합니다.
+    스트리밍으로 받은 대사가 완성되는 즉시 TTS 요청을 보내고, (스크립트, 오디오)를 반환합니다.
+    """
+    script_lines = []
+    voices = []
 
-        music = music - abs(volume_reduction)
+    def lines():
+        for line in stream_script_lines(query, search_results, duration_minutes):
+            script_lines.append(line)
+            yield line
 
-        if len(music) < len(voice):
-            music = music * (len(voice) // len(music) + 1)
-        music = music[:len(voice)]
+    def segments():
+        for voice, text in iter_segments(lines()):
+            voices.extend(voice for _ in split_text(text))
+            yield voice, text
 
-        combined = voice.overlay(music)
+    try:
+        # 스크립트 스트리밍과 겹쳐 실행되므로 tts 단계 시간에는 스크립트 수신 시간이 포함됨
+        with STAGE_SECONDS.time(stage="tts"):
+            audio = synthesize_stream(segments(), progress=progress)
+    except TTSError as e:
+        logger.error("오디오 세그먼트 생성 실패: %s", e)
+        return '\n'.join(script_lines) or None, None
+    except Exception as e:
+        logger.exception("generate_podcast_audio 오류: %s", e)
+        return '\n'.join(script_lines) or None, None
+
+    script = '\n'.join(script_lines)
+    if not audio:
+        logger.error("오디오 세그먼트 생성 실패: 생성된 데이터 없음")
+        return script or None, None
+    logger.info("총 생성된 오디오 세그먼트 수: %d", len(audio))
+    try:
+        from services.audio import assemble_segments
+        return script, assemble_segments(audio, voices, gap_ms=SPEAKER_GAP_MS)
+    except Exception as e:
+        logger.error("오디오 세그먼트 조합 오류: %s", e)
+        return script, None
 
-        combined.export(output_file, format="mp3")
+def stream_podcast_audio(query: str, search_results: str, music_file: str, duration_minutes: int = 5,
+                         volume_reduction: int = -20, script_lines: Optional[List[str]] = None,
+                         preset: Optional['AudioPreset'] = None) -> Iterator[bytes]:
+    """
+    스크립트 스트리밍 → TTS → 배경음악 믹싱 → MP3 인코딩을 세그먼트 단위로 이어서 실행하며 MP3 조각을 yield합니다.
+    합성된 조각을 순서대로 디코딩하여 배경음악의 같은 구간(지금까지 나간 프레임 수를 offset으로 사용)과 섞으므로,
+    첫 세그먼트의 합성이 끝나면 바로 재생을 시작할 수 있습니다. 전체 트랙을 미리 알 수 없으므로
+    add_background_music과 달리 음량 정규화와 덕킹은 세그먼트마다 계산합니다.
+    script_lines가 주어지면 수신한 스크립트 줄을 채워 넣습니다.
+    """
+    from services.audio import (MIX_BLOCK_SECONDS, background_bed, decode_mp3, encode_mp3_stream,
+                                mix_blocks, to_pcm)
+    from services.audio_output import analyze_voice, get_preset, window_frames
+    import numpy as np
+    preset = preset or get_preset(AUDIO_PRESET)
+    if script_lines is None:
+        script_lines = []
+
+    def lines():
+        for line in stream_script_lines(query, search_results, duration_minutes):
+            script_lines.append(line)
+            yield line
+
+    parts = synthesize_ordered(iter_segments(lines()))
+    # 첫 세그먼트 디코딩이나 배경음악 준비가 실패해도 합성 워커와 스크립트 스트림을 정리
+    try:
+        try:
+            first_voice, first_audio = next(parts)
+        except StopIteration:
+            raise TTSError("생성된 오디오 세그먼트가 없습니다.")
+        first = decode_mp3(first_audio)
+        frame_rate, channels = preset.frame_rate, preset.channels
+        bed = background_bed(music_file, volume_reduction, frame_rate, channels)
+    except BaseException:
+        parts.close()
+        raise
+    window = window_frames(frame_rate)
+    block_frames = frame_rate * MIX_BLOCK_SECONDS
+    gap = np.zeros((int(frame_rate * SPEAKER_GAP_MS / 1000), channels), dtype=np.int16)
+
+    def blocks():
+        # encode_mp3_stream의 feeder 스레드가 실행하므로 parts도 그 스레드에서 닫음
+        # (클라이언트 연결 종료 시 다른 스레드가 실행 중인 생성기를 닫으면 ValueError가 발생)
+        try:
+            offset = 0
+            previous = None
+            segments = ((voice, decode_mp3(audio)) for voice, audio in parts)
+            for voice, segment in itertools.chain([(first_voice, first)], segments):
+                pcm = to_pcm(segment, frame_rate, channels)
+                if previous is not None and voice != previous and len(gap):
+                    pcm = np.concatenate([gap, pcm])
+                voice_gain, bed_gains = analyze_voice(pcm, frame_rate, preset)
+                yield from mix_blocks(pcm, bed, block_frames, offset=offset, voice_gain=voice_gain,
+                                      bed_gains=bed_gains, gain_window=window)
+                offset += len(pcm)
+                previous = voice
+        finally:
+            parts.close()
+
+    yield from encode_mp3_stream(blocks(), frame_rate, channels, bitrate=preset.bitrate)
+
+def add_background_music(audio: Union['AudioSegment', str], music_file: str, output_file: str,
+                         volume_reduction: int = -20, preset: Optional['AudioPreset'] = None):
+    """
+    음성 트랙(AudioSegment 또는 파일 경로)에 배경음악을 깔아 프리셋(기본 AUDIO_PRESET)의 포맷과 비트레이트로 MP3를 저장합니다.
+    배경음악은 출력 포맷별로 한 번만 디코딩/감쇠하여 재사용하고, 음성 음량 정규화와 배경음악 덕킹을
+    고정 크기 블록 단위 믹싱과 함께 적용하여 ffmpeg로 바로 인코딩합니다.
+    """
+    from pydub import AudioSegment
+    from services.audio import MIX_BLOCK_SECONDS, background_bed, encode_mp3, mix_blocks, to_pcm
+    from services.audio_output import analyze_voice, get_preset, window_frames
+    start = time.perf_counter()
+    try:
+        preset = preset or get_preset(AUDIO_PRESET)
+        voice = audio if isinstance(audio, AudioSegment) else AudioSegment.from_file(audio)
+
+        frame_rate, channels = preset.frame_rate, preset.channels
+        bed = background_bed(music_file, volume_reduction, frame_rate, channels)
+        voice_pcm = to_pcm(voice, frame_rate, channels)
+        voice_gain, bed_gains = analyze_voice(voice_pcm, frame_rate, preset)
+
+        blocks = mix_blocks(voice_pcm, bed, block_frames=frame_rate * MIX_BLOCK_SECONDS, voice_gain=voice_gain,
+                            bed_gains=bed_gains, gain_window=window_frames(frame_rate))
+        encode_mp3(blocks, frame_rate, channels, output_file, bitrate=preset.bitrate)
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="mix")
         return output_file
     except Exception as e:
-        print(f"[red]배경음악 추가 중 오류 발생: {str(e)}[/red]")
-        return None
\ No newline at end of file
+        logger.error("배경음악 추가 중 오류 발생: %s", e)
+        return None
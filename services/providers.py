@@ -0,0 +1,352 @@
+"""
+검색, 텍스트 생성, TTS 백엔드 추상화.
+
+파이프라인 코드는 SDK를 직접 호출하지 않고 get_search_provider / get_text_provider / get_tts_provider로
+제공자를 받아 사용합니다. PROVIDER_BACKEND=live(기본)는 Gemini/OpenAI를, fake는 로컬 대역 서버
+(benchmarks/fake_server.py)를 호출하므로 유료 네트워크 없이 전체 파이프라인을 부하 테스트할 수 있습니다.
+검색 제공자는 ASGI 모드(asgi.py)에서 쓰는 비동기 메서드(asearch, astream_search)도 제공합니다.
+모든 호출은 utils.outbound를 거치므로 제공자/모델별 속도 제한, 재시도, 요청 마감 시간이 적용됩니다.
+"""
+import asyncio
+import json
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+from urllib.parse import urlsplit
+
+from utils import outbound
+from utils.clients import get_genai_client, get_genai_types, get_openai
+from utils.outbound import attempt_timeout, http_client
+from utils.config import PROVIDER_BACKEND, FAKE_PROVIDER_URL, FAKE_PROVIDER_TIMEOUT
+from utils.metrics import API_ERRORS
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class SearchProvider:
+    """근거 검색: 결과 텍스트와 출처 목록({"url", "title"})을 반환합니다."""
+
+    def search(self, query: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def stream_search(self, query: str) -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+        """도착하는 조각마다 (텍스트, 출처 목록)을 yield합니다."""
+        raise NotImplementedError
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def astream_search(self, query: str) -> AsyncIterator[Tuple[str, List[Dict[str, str]]]]:
+        """stream_search의 비동기 버전 (이벤트 루프 스레드를 막지 않음)"""
+        raise NotImplementedError
+
+
+class TextProvider:
+    """채팅 형식 메시지로 텍스트를 생성합니다."""
+
+    def complete(self, messages: Messages, model: str, **options) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: Messages, model: str, **options) -> Iterator[str]:
+        """생성되는 텍스트 조각을 도착 순서대로 yield합니다."""
+        raise NotImplementedError
+
+
+class TTSProvider:
+    """텍스트를 MP3 바이트로 합성합니다."""
+
+    def synthesize(self, voice: str, text: str, model: str, speed: float) -> bytes:
+        raise NotImplementedError
+
+
+def extract_sources(response):
+    """검색 결과에서 소스 URL, 제목 추출"""
+    sources = []
+    try:
+        if response and hasattr(response, 'candidates') and response.candidates:
+            metadata = getattr(response.candidates[0], 'grounding_metadata', None)
+            if metadata and hasattr(metadata, 'grounding_chunks'):
+                for chunk in metadata.grounding_chunks:
+                    web_data = getattr(chunk, 'web', None)
+                    if web_data and hasattr(web_data, 'uri'):
+                        sources.append({
+                            'url': web_data.uri,
+                            'title': getattr(web_data, 'title', '제목 없음'),
+                        })
+    except Exception as e:
+        # 출처 없이도 검색 결과는 쓸 수 있으므로 기록만 하고 계속 진행
+        API_ERRORS.inc(operation="search_sources")
+        logger.warning("출처 추출 실패: %s", e)
+    return sources
+
+
+def _gemini_contents(messages: Messages) -> Tuple[str, str]:
+    """채팅 메시지를 Gemini의 (system_instruction, contents)로 변환합니다."""
+    system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    contents = "\n\n".join(m["content"] for m in messages if m["role"] != "system")
+    return system, contents
+
+
+class GeminiSearchProvider(SearchProvider):
+    def __init__(self, model: str = 'gemini-2.0-flash'):
+        self.model = model
+
+    def _config(self):
+        types = get_genai_types()
+        return types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearchRetrieval)]
+        )
+
+    def search(self, query: str) -> Dict[str, Any]:
+        response = outbound.call("gemini", self.model, lambda: get_genai_client().models.generate_content(
+            model=self.model,
+            contents=query,
+            config=self._config()
+        ))
+        return {"text": response.text or "", "sources": extract_sources(response)}
+
+    def stream_search(self, query: str) -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+        stream = outbound.stream("gemini", self.model, lambda: get_genai_client().models.generate_content_stream(
+            model=self.model,
+            contents=query,
+            config=self._config()
+        ))
+        for chunk in stream:
+            yield chunk.text or "", extract_sources(chunk)
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        response = await outbound.acall("gemini", self.model, lambda: get_genai_client().aio.models.generate_content(
+            model=self.model,
+            contents=query,
+            config=self._config()
+        ))
+        return {"text": response.text or "", "sources": extract_sources(response)}
+
+    async def astream_search(self, query: str) -> AsyncIterator[Tuple[str, List[Dict[str, str]]]]:
+        stream = outbound.astream("gemini", self.model, lambda: get_genai_client().aio.models.generate_content_stream(
+            model=self.model,
+            contents=query,
+            config=self._config()
+        ))
+        async for chunk in stream:
+            yield chunk.text or "", extract_sources(chunk)
+
+
+class GeminiTextProvider(TextProvider):
+    def _config(self, system: str, options: Dict[str, Any]):
+        types = get_genai_types()
+        return types.GenerateContentConfig(system_instruction=system or None, **options)
+
+    def complete(self, messages: Messages, model: str, **options) -> str:
+        system, contents = _gemini_contents(messages)
+        response = outbound.call("gemini", model, lambda: get_genai_client().models.generate_content(
+            model=model, contents=contents, config=self._config(system, options)))
+        return response.text or ""
+
+    def stream(self, messages: Messages, model: str, **options) -> Iterator[str]:
+        system, contents = _gemini_contents(messages)
+        for chunk in outbound.stream("gemini", model, lambda: get_genai_client().models.generate_content_stream(
+                model=model, contents=contents, config=self._config(system, options))):
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAITextProvider(TextProvider):
+    def complete(self, messages: Messages, model: str, **options) -> str:
+        response = outbound.call("openai", model, lambda: get_openai().chat.completions.create(
+            model=model, messages=messages, timeout=attempt_timeout(), **options))
+        return response.choices[0].message.content or ""
+
+    def stream(self, messages: Messages, model: str, **options) -> Iterator[str]:
+        stream = outbound.stream("openai", model, lambda: get_openai().chat.completions.create(
+            model=model, messages=messages, stream=True, timeout=attempt_timeout(), **options))
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class OpenAITTSProvider(TTSProvider):
+    def synthesize(self, voice: str, text: str, model: str, speed: float) -> bytes:
+        response = outbound.call("openai", model, lambda: get_openai().audio.speech.create(
+            model=model, voice=voice, input=text, speed=speed, timeout=attempt_timeout()))
+        return response.content
+
+
+class FakeProviderError(Exception):
+    """로컬 대역 서버가 오류 응답을 보낸 경우 (status_code, headers로 재시도 여부와 Retry-After를 판단)"""
+
+    def __init__(self, message: str, status_code: int = None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _FakeClient:
+    """로컬 대역 서버에 JSON 요청을 보내는 공용 HTTP 클라이언트 (동기 요청은 utils.outbound의 연결 풀 사용)"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _raise_for_status(self, path: str, response):
+        if response.status_code != 200:
+            raise FakeProviderError(f"{path} {response.status_code}: {response.read()[:200]!r}",
+                                    response.status_code, response.headers)
+
+    def post(self, path: str, payload: Dict[str, Any]) -> bytes:
+        response = http_client().post(self.base_url + path, json=payload,
+                                      timeout=min(self.timeout, attempt_timeout()))
+        self._raise_for_status(path, response)
+        return response.content
+
+    def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return json.loads(self.post(path, payload))
+
+    def post_lines(self, path: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """NDJSON 스트리밍 응답을 줄 단위로 읽습니다."""
+        with http_client().stream("POST", self.base_url + path, json={**payload, "stream": True},
+                                  timeout=min(self.timeout, attempt_timeout())) as response:
+            self._raise_for_status(path, response)
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    async def _within_timeout(self, awaitable):
+        # 3.11+의 asyncio.timeout은 완료와 취소가 겹쳐도 취소를 잃지 않음 (wait_for는 3.12 전까지 취소를 삼킬 수 있음)
+        if hasattr(asyncio, 'timeout'):
+            async with asyncio.timeout(self.timeout):
+                return await awaitable
+        return await asyncio.wait_for(awaitable, self.timeout)
+
+    async def _aopen(self, path: str, payload: Dict[str, Any]):
+        """asyncio 스트림으로 요청을 보내고 응답 헤더까지 읽어 (reader, writer, headers)를 반환합니다."""
+        url = urlsplit(self.base_url)
+        reader, writer = await self._within_timeout(asyncio.open_connection(url.hostname, url.port or 80))
+        try:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            writer.write((f"POST {url.path}{path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                          "Connection: close\r\n\r\n").encode('latin-1') + body)
+            await writer.drain()
+            status = int((await self._within_timeout(reader.readline())).split()[1])
+            headers = {}
+            while True:
+                line = await self._within_timeout(reader.readline())
+                if not line.strip():
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if status != 200:
+                raise FakeProviderError(f"{path} {status}: {(await reader.read(200))!r}", status, headers)
+            return reader, writer, headers
+        except BaseException:
+            writer.close()
+            raise
+
+    async def apost_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        reader, writer, headers = await self._aopen(path, payload)
+        try:
+            length = int(headers.get('content-length', -1))
+            read = reader.readexactly(length) if length >= 0 else reader.read()
+            return json.loads(await self._within_timeout(read))
+        finally:
+            writer.close()
+
+    async def apost_lines(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        reader, writer, _ = await self._aopen(path, {**payload, "stream": True})
+        try:
+            while True:
+                line = await self._within_timeout(reader.readline())
+                if not line:
+                    break
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            writer.close()
+
+
+class FakeSearchProvider(SearchProvider):
+    def __init__(self, client: _FakeClient):
+        self.client = client
+
+    def search(self, query: str) -> Dict[str, Any]:
+        return outbound.call("fake", "search", lambda: self.client.post_json("/search", {"query": query}))
+
+    def stream_search(self, query: str) -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+        for event in outbound.stream("fake", "search", lambda: self.client.post_lines("/search", {"query": query})):
+            yield event.get("text", ""), event.get("sources", [])
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        return await outbound.acall("fake", "search", lambda: self.client.apost_json("/search", {"query": query}))
+
+    async def astream_search(self, query: str) -> AsyncIterator[Tuple[str, List[Dict[str, str]]]]:
+        async def open_stream():
+            return self.client.apost_lines("/search", {"query": query})
+
+        async for event in outbound.astream("fake", "search", open_stream):
+            yield event.get("text", ""), event.get("sources", [])
+
+
+class FakeTextProvider(TextProvider):
+    def __init__(self, client: _FakeClient):
+        self.client = client
+
+    def complete(self, messages: Messages, model: str, **options) -> str:
+        return outbound.call("fake", model, lambda: self.client.post_json(
+            "/chat", {"model": model, "messages": messages}))["text"]
+
+    def stream(self, messages: Messages, model: str, **options) -> Iterator[str]:
+        for event in outbound.stream("fake", model, lambda: self.client.post_lines(
+                "/chat", {"model": model, "messages": messages})):
+            yield event.get("text", "")
+
+
+class FakeTTSProvider(TTSProvider):
+    def __init__(self, client: _FakeClient):
+        self.client = client
+
+    def synthesize(self, voice: str, text: str, model: str, speed: float) -> bytes:
+        return outbound.call("fake", model, lambda: self.client.post(
+            "/speech", {"model": model, "voice": voice, "input": text, "speed": speed}))
+
+
+@lru_cache(maxsize=1)
+def _fake_client() -> _FakeClient:
+    return _FakeClient(FAKE_PROVIDER_URL, FAKE_PROVIDER_TIMEOUT)
+
+
+@lru_cache(maxsize=1)
+def get_search_provider() -> SearchProvider:
+    if PROVIDER_BACKEND == "fake":
+        return FakeSearchProvider(_fake_client())
+    return GeminiSearchProvider()
+
+
+@lru_cache(maxsize=None)
+def get_text_provider(name: str) -> TextProvider:
+    """name: 'openai'(스크립트, 키워드) 또는 'gemini'(보고서)"""
+    if PROVIDER_BACKEND == "fake":
+        return FakeTextProvider(_fake_client())
+    if name == "gemini":
+        return GeminiTextProvider()
+    if name == "openai":
+        return OpenAITextProvider()
+    raise ValueError(f"알 수 없는 텍스트 제공자: {name}")
+
+
+@lru_cache(maxsize=1)
+def get_tts_provider() -> TTSProvider:
+    if PROVIDER_BACKEND == "fake":
+        return FakeTTSProvider(_fake_client())
+    return OpenAITTSProvider()
+
+
+def warm_up_providers():
+    """실제 백엔드를 사용할 때 SDK 클라이언트를 미리 생성합니다."""
+    if PROVIDER_BACKEND == "fake":
+        return
+    get_genai_client()
+    get_genai_types()
+    get_openai()
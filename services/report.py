@@ -0,0 +1,176 @@
+import io
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Union
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Flowable
+
+logger = logging.getLogger(__name__)
+
+FONT_NAME = 'NanumGothic'
+FONT_PATH = os.path.join("static", "fonts", "NanumGothic.ttf")  # static 폴더 내 fonts 폴더에 폰트 파일 위치
+
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+HEADING_RE = re.compile(r'^(#{1,6})\s*(.*)$')
+BULLET_RE = re.compile(r'^[-*+]\s+(.*)$')
+NUMBERED_RE = re.compile(r'^(\d+)[.)]\s+(.*)$')
+TABLE_SEPARATOR_RE = re.compile(r'^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$')
+
+
+@lru_cache(maxsize=1)
+def register_fonts() -> Optional[str]:
+    """NanumGothic 폰트를 한 번만 등록하고, 사용할 한글 폰트 이름을 반환합니다 (실패 시 None)."""
+    if not os.path.exists(FONT_PATH):
+        logger.warning("폰트 파일(%s)을 찾을 수 없습니다. NanumGothic 폰트 등록 실패.", FONT_PATH)
+        return None
+    try:
+        pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+        logger.info("NanumGothic 폰트 등록 성공")
+        return FONT_NAME
+    except Exception as e:
+        logger.warning("NanumGothic 폰트 등록 실패: %s", e)
+        return None
+
+
+@lru_cache(maxsize=1)
+def report_styles() -> StyleSheet1:
+    """보고서용 스타일 시트를 한 번만 만들어 모든 요청이 공유합니다 (수정하지 말 것)."""
+    font_name = register_fonts()
+    styles = getSampleStyleSheet()
+    if font_name:
+        for name in ('Title', 'BodyText', 'Heading1', 'Heading2', 'Heading3'):
+            styles[name].fontName = font_name
+    else:
+        logger.warning("NanumGothic 폰트가 등록되지 않아 기본 폰트 사용.")
+    font_name = styles['BodyText'].fontName
+
+    styles['BodyText'].leading = 14  # 줄 간격 조정
+    styles['BodyText'].spaceAfter = 6
+    # 제목 스타일
+    styles.add(ParagraphStyle(name='CenterTitle',
+                              parent=styles['Title'],
+                              alignment=1,
+                              fontName=font_name,
+                              spaceAfter=12))
+    # 소제목 스타일 (## 표시된 줄용): 폰트 사이즈 16, 볼드 처리, 가운데 정렬
+    styles.add(ParagraphStyle(name='Subtitle',
+                              parent=styles['Heading2'],
+                              fontName=font_name,
+                              fontSize=16,
+                              leading=18,
+                              alignment=1,  # 가운데 정렬
+                              spaceAfter=12))
+    styles.add(ParagraphStyle(name='ListItem',
+                              parent=styles['BodyText'],
+                              leftIndent=18,
+                              bulletIndent=6,
+                              spaceAfter=3))
+    styles.add(ParagraphStyle(name='TableCell',
+                              parent=styles['BodyText'],
+                              fontSize=9,
+                              leading=12,
+                              spaceAfter=0))
+    return styles
+
+
+def inline_markup(text: str) -> str:
+    """Paragraph 마크업용으로 특수문자를 이스케이프하고 **굵게**를 <b><font size="12">로 변환합니다."""
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return BOLD_RE.sub(r'<b><font size="12">\1</font></b>', text)
+
+
+def _table(rows: List[List[str]], styles: StyleSheet1) -> Table:
+    width = max(len(row) for row in rows)
+    cell_style = styles['TableCell']
+    data = [[Paragraph(inline_markup(cell), cell_style) for cell in row + [''] * (width - len(row))]
+            for row in rows]
+    table = Table(data, repeatRows=1, hAlign='LEFT',
+                  colWidths=[(A4[0] - 144) / width] * width)
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    return table
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def markdown_to_flowables(markdown: str) -> List[Flowable]:
+    """
+    모델이 생성한 마크다운(제목, 목록, 굵게, 표)을 한 번의 순회로 ReportLab flowable 목록으로 변환합니다.
+    문단 간격은 스타일의 spaceAfter로 처리하여 줄마다 Spacer를 추가하지 않습니다.
+    """
+    styles = report_styles()
+    flowables = []
+    table_rows: List[List[str]] = []
+
+    for raw_line in markdown.split('\n'):
+        line = raw_line.strip()
+
+        if line.startswith('|'):
+            if not TABLE_SEPARATOR_RE.match(line):
+                table_rows.append(_split_row(line))
+            continue
+        if table_rows:
+            flowables.append(_table(table_rows, styles))
+            flowables.append(Spacer(1, 6))
+            table_rows = []
+
+        if not line:
+            continue  # 빈 줄은 건너뜀
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            level, text = len(heading.group(1)), inline_markup(heading.group(2).strip())
+            if level == 1:
+                flowables.append(Paragraph(text, styles['CenterTitle']))
+            elif level == 2:
+                flowables.append(Paragraph(text, styles['Subtitle']))
+            else:
+                flowables.append(Paragraph(text, styles['Heading3']))
+            continue
+
+        bullet = BULLET_RE.match(line)
+        if bullet:
+            flowables.append(Paragraph(inline_markup(bullet.group(1)), styles['ListItem'], bulletText='•'))
+            continue
+
+        numbered = NUMBERED_RE.match(line)
+        if numbered:
+            flowables.append(Paragraph(inline_markup(numbered.group(2)), styles['ListItem'],
+                                       bulletText=f"{numbered.group(1)}."))
+            continue
+
+        # 일반 문단
+        flowables.append(Paragraph(inline_markup(line), styles['BodyText']))
+
+    if table_rows:
+        flowables.append(_table(table_rows, styles))
+    return flowables
+
+
+def title_flowables(title: str) -> List[Flowable]:
+    return [Paragraph(f"<b>{inline_markup(title)}</b>", report_styles()['CenterTitle'])]
+
+
+def build_pdf(flowables: List[Flowable], output: Optional[str] = None) -> Union[bytes, str]:
+    """flowable 목록으로 A4 PDF를 만듭니다. output이 없으면 메모리 버퍼의 PDF 바이트를 반환합니다."""
+    target = output if output is not None else io.BytesIO()
+    doc = SimpleDocTemplate(target, pagesize=A4)
+    doc.build(flowables)
+    return output if output is not None else target.getvalue()
+
+
+def render_report(title: str, markdown: str, output: Optional[str] = None) -> Union[bytes, str]:
+    """제목과 마크다운 본문으로 보고서 PDF를 생성합니다."""
+    return build_pdf(title_flowables(title) + markdown_to_flowables(markdown), output)
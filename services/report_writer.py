@@ -0,0 +1,189 @@
+"""
+섹션 단위 보고서 작성.
+
+검색 결과 전체로 보고서 하나를 한 번에 받는 대신, 먼저 목차(섹션 제목과 다룰 내용)를 만들고
+섹션들을 동시에 작성합니다. 끝난 섹션부터 바로 ReportLab flowable로 변환하므로 전체 소요 시간은
+"목차 + 가장 느린 섹션"에 가까워지고, 마지막 섹션이 도착했을 때는 PDF 조립만 남습니다.
+검색 결과 전체는 목차 프롬프트에만 넣고, 섹션 프롬프트에는 섹션과 관련된 줄만 골라(section_context)
+REPORT_SECTION_CONTEXT_CHARS 글자 안으로 넣어 입력 토큰이 섹션 수만큼 곱해지지 않도록 합니다.
+"""
+import contextvars
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from services.providers import get_text_provider
+from utils.config import REPORT_MAX_SECTIONS, REPORT_SECTION_CONTEXT_CHARS, REPORT_SECTION_WORKERS
+from utils.metrics import API_ERRORS, API_REQUEST_SECONDS
+
+if TYPE_CHECKING:
+    from reportlab.platypus import Flowable
+
+logger = logging.getLogger(__name__)
+
+REPORT_MODEL = 'gemini-2.0-flash'
+MIN_SECTIONS = 3
+
+# 목차 응답을 해석하지 못했을 때 사용하는 기본 구성 (기존 단일 프롬프트 보고서와 같은 구성)
+DEFAULT_OUTLINE = [
+    {"title": "서론", "focus": "주제의 배경과 보고서의 목적"},
+    {"title": "본론: 주요 동향과 분석", "focus": "검색 결과에 나타난 핵심 사실, 수치, 원인과 영향에 대한 심도 있는 분석"},
+    {"title": "결론 및 주요 통찰", "focus": "분석 내용의 요약과 시사점"},
+]
+
+OUTLINE_LINE_RE = re.compile(r'^\s*(?:#+|\d+[.)]|[-*+])\s*(.+?)\s*$')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def build_outline_messages(query: str, search_text: str, max_sections: int) -> List[Dict[str, str]]:
+    prompt = (
+        f"주제 '{query}'에 대해 다음의 검색 결과를 참고하여 체계적이고 심도 있는 분석 보고서의 목차를 만들어 주세요.\n\n"
+        f"검색 결과:\n{search_text}\n\n"
+        f"서론과 결론을 포함하여 {MIN_SECTIONS}~{max_sections}개의 섹션으로 구성하고, "
+        "각 섹션의 제목(title)과 그 섹션에서 다룰 내용(focus)을 다음 형식의 JSON 배열로만 답해 주세요.\n"
+        '[{"title": "서론", "focus": "주제의 배경과 보고서의 목적"}]'
+    )
+    return [{"role": "user", "content": prompt}]
+
+
+def parse_outline(text: str, max_sections: int) -> List[Dict[str, str]]:
+    """
+    목차 응답을 [{"title", "focus"}] 목록으로 해석합니다.
+    JSON 배열을 우선 찾고, 없으면 번호/글머리 줄을 제목으로 사용하며, 둘 다 실패하면 DEFAULT_OUTLINE을 반환합니다.
+    """
+    outline = []
+    start, end = text.find('['), text.rfind(']')
+    if 0 <= start < end:
+        try:
+            items = json.loads(text[start:end + 1])
+        except ValueError:
+            items = []
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and str(item.get("title", "")).strip():
+                outline.append({"title": str(item["title"]).strip(), "focus": str(item.get("focus", "")).strip()})
+            elif isinstance(item, str) and item.strip():
+                outline.append({"title": item.strip(), "focus": ""})
+    if not outline:
+        for line in text.splitlines():
+            match = OUTLINE_LINE_RE.match(line)
+            if match:
+                outline.append({"title": match.group(1).strip('*# '), "focus": ""})
+    if len(outline) < 2:
+        logger.warning("보고서 목차를 해석하지 못해 기본 목차를 사용합니다: %r", text[:200])
+        return [dict(section) for section in DEFAULT_OUTLINE]
+    return outline[:max_sections]
+
+
+def generate_outline(query: str, search_text: str, max_sections: int = REPORT_MAX_SECTIONS) -> List[Dict[str, str]]:
+    try:
+        with API_REQUEST_SECONDS.time(operation="report_outline"):
+            text = get_text_provider("gemini").complete(
+                build_outline_messages(query, search_text, max_sections), model=REPORT_MODEL)
+    except Exception:
+        API_ERRORS.inc(operation="report_outline")
+        raise
+    return parse_outline(text or "", max_sections)
+
+
+def _bigrams(text: str) -> Set[str]:
+    """단어별 글자 바이그램 (조사가 붙은 한국어 단어도 어간이 같으면 겹치도록 형태소 분석 대신 사용)"""
+    grams = set()
+    for word in re.findall(r'\w+', text.lower()):
+        grams.update(word[i:i + 2] for i in range(max(1, len(word) - 1)))
+    return grams
+
+
+def section_context(search_text: str, section: Dict[str, str], max_chars: int = REPORT_SECTION_CONTEXT_CHARS) -> str:
+    """
+    검색 결과에서 섹션 제목/다룰 내용과 바이그램이 많이 겹치는 줄부터 max_chars 글자까지 골라 원래 순서대로 반환합니다.
+    검색 결과가 max_chars 이하이거나 max_chars가 0이면 그대로 반환하며, 긴 줄은 문장 단위로 나누어 고릅니다.
+    """
+    if max_chars <= 0 or len(search_text) <= max_chars:
+        return search_text
+    units = []
+    for line in search_text.splitlines():
+        line = line.strip()
+        if line:
+            units.extend(SENTENCE_END_RE.split(line) if len(line) > max_chars // 4 else [line])
+    terms = _bigrams(f"{section['title']} {section['focus']}")
+    # 점수가 같으면 앞쪽(보통 요약이 먼저 나옴)을 우선
+    ranked = sorted(range(len(units)), key=lambda i: (-len(terms & _bigrams(units[i])), i))
+    chosen, used = [], 0
+    for i in ranked:
+        if used + len(units[i]) + 1 <= max_chars:
+            chosen.append(i)
+            used += len(units[i]) + 1
+    if not chosen:
+        return search_text[:max_chars]
+    return "\n".join(units[i] for i in sorted(chosen))
+
+
+def build_section_messages(query: str, search_text: str, outline: List[Dict[str, str]],
+                           index: int) -> List[Dict[str, str]]:
+    """섹션 하나의 프롬프트. 검색 결과는 section_context로 이 섹션과 관련된 부분만 넣습니다."""
+    section = outline[index]
+    contents = "\n".join(f"{i + 1}. {s['title']}" for i, s in enumerate(outline))
+    target = f"{index + 1}. {section['title']}" + (f" - {section['focus']}" if section["focus"] else "")
+    prompt = (
+        f"주제 '{query}'에 대한 보고서의 한 섹션을 작성해 주세요.\n\n"
+        f"보고서 전체 목차:\n{contents}\n\n"
+        f"작성할 섹션: {target}\n\n"
+        f"검색 결과:\n{section_context(search_text, section)}\n\n"
+        f"'## {section['title']}' 제목으로 시작하는 마크다운으로 이 섹션만 작성하고, 다른 섹션에서 다룰 내용은 반복하지 마세요. "
+        "독자가 쉽게 이해할 수 있도록 구체적인 근거와 함께 상세하고 명확하게 작성해 주시기 바랍니다."
+    )
+    return [{"role": "user", "content": prompt}]
+
+
+def generate_section(query: str, search_text: str, outline: List[Dict[str, str]], index: int) -> str:
+    """섹션 하나를 작성합니다. 모델이 섹션 제목을 빠뜨리면 '## 제목'을 붙여 PDF에서 섹션이 구분되도록 합니다."""
+    try:
+        with API_REQUEST_SECONDS.time(operation="report_section"):
+            text = get_text_provider("gemini").complete(
+                build_section_messages(query, search_text, outline, index), model=REPORT_MODEL)
+    except Exception:
+        API_ERRORS.inc(operation="report_section")
+        raise
+    text = (text or "").strip()
+    if not text.startswith('#'):
+        text = f"## {outline[index]['title']}\n\n{text}"
+    return text
+
+
+def generate_report_sections(query: str, search_text: str,
+                             progress: Optional[Callable[..., None]] = None,
+                             max_workers: int = REPORT_SECTION_WORKERS) -> Tuple[str, List["Flowable"]]:
+    """
+    목차를 만든 뒤 섹션들을 워커 풀에서 동시에 작성하고, 끝나는 섹션부터 flowable로 변환합니다.
+    (마크다운 본문, 목차 순서의 flowable 목록)을 반환하며, 한 섹션이라도 실패하면 남은 섹션을 취소하고 예외를 전달합니다.
+
+    progress("outline", total, sections)는 목차가 정해졌을 때,
+    progress("section", done, total, index, title)은 섹션이 하나 끝날 때마다 호출됩니다.
+    """
+    from services.report import markdown_to_flowables  # ReportLab은 첫 보고서 생성 시 로드
+
+    progress = progress or (lambda stage, **data: None)
+    outline = generate_outline(query, search_text)
+    total = len(outline)
+    progress("outline", total=total, sections=[section["title"] for section in outline])
+
+    markdown: List[Optional[str]] = [None] * total
+    flowables: List[List["Flowable"]] = [[] for _ in range(total)]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)), thread_name_prefix="report") as executor:
+        # 마감 시간 예산(outbound.deadline)이 섹션 작성 스레드에도 적용되도록 컨텍스트를 복사
+        futures = {executor.submit(contextvars.copy_context().run, generate_section, query, search_text, outline, i): i
+                   for i in range(total)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                markdown[index] = future.result()
+                # 나머지 섹션을 기다리는 동안 변환해 두어 마지막에는 PDF 조립만 남김
+                flowables[index] = markdown_to_flowables(markdown[index])
+                progress("section", done=done, total=total, index=index, title=outline[index]["title"])
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return "\n\n".join(markdown), [flowable for section in flowables for flowable in section]
@@ -0,0 +1,311 @@
+"""
+검색 출처 보강.
+
+Gemini 그라운딩 출처는 리다이렉트 URI와 도메인 수준의 제목만 담고 있으므로, 리다이렉트를 따라가 최종 URL을
+확인하고 페이지의 <title>/OpenGraph 제목과 썸네일(og:image)을 가져옵니다. 결과는 URL을 키로 SQLite에
+TTL과 함께 저장하여 자주 나오는 출처는 한 번만 가져오고, 응답 시에는 짧은 시간(SOURCE_ENRICH_TIMEOUT)만
+기다린 뒤 끝나지 않은 출처는 원래 값으로 반환합니다 (가져오기는 백그라운드에서 끝까지 진행되어 캐시에 남음).
+
+출처 URL은 검색 결과(외부 페이지)에서 오므로, 리다이렉트를 한 단계씩 직접 따라가며 매번 호스트를 해석하여
+사설/루프백/링크 로컬 등 공인 주소가 아닌 곳으로 가는 요청을 거부합니다 (SOURCE_ALLOW_PRIVATE로 해제).
+연결은 확인한 IP로 직접 맺으므로(Host 헤더와 TLS SNI는 원래 호스트 이름) DNS 응답이 그사이 바뀌어도 우회되지 않습니다.
+제공자 API와 연결 풀을 나누기 위해 출처 전용 클라이언트를 사용합니다.
+"""
+import codecs
+import ipaddress
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from utils.config import (SOURCE_ALLOW_PRIVATE, SOURCE_ENRICH, SOURCE_CACHE_PATH, SOURCE_CACHE_TTL,
+                          SOURCE_FAILURE_TTL, SOURCE_ENRICH_TIMEOUT, SOURCE_FETCH_TIMEOUT, SOURCE_FETCH_WORKERS)
+from utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# <head>만 필요하므로 페이지 앞부분만 읽음
+MAX_PAGE_BYTES = 256 * 1024
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (compatible; ReportCast/1.0; +source-preview)"
+META_KEYS = ("og:title", "og:image", "og:image:url", "og:site_name", "twitter:title", "twitter:image")
+
+
+class UnsafeSourceURL(ValueError):
+    """가져오지 않을 출처 URL (http(s)가 아니거나 공인 주소가 아닌 호스트)"""
+
+
+class SourceCache:
+    """URL별 보강 결과를 저장하는 SQLite 캐시 (여러 워커 프로세스가 공유, 만료된 항목은 쓰기 시 정리)"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS source_cache ("
+                " url TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """캐시된 값을 반환합니다. DB가 잠겼거나 손상되어 읽을 수 없으면 미스로 처리합니다."""
+        try:
+            row = self._connect().execute("SELECT value FROM source_cache WHERE url = ? AND expires_at > ?",
+                                          (url, time.time())).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("출처 캐시 조회 실패: %s", e)
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_REQUESTS.inc(cache="sources", result="miss" if row is None else "hit")
+        return None if row is None else json.loads(row[0])
+
+    def set(self, url: str, value: Dict[str, Any], ttl: float):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO source_cache VALUES (?, ?, ?)",
+                     (url, json.dumps(value, ensure_ascii=False), now + ttl))
+        conn.execute("DELETE FROM source_cache WHERE expires_at <= ?", (now,))
+
+    def stats(self) -> Dict[str, int]:
+        count, = self._connect().execute("SELECT COUNT(*) FROM source_cache").fetchone()
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": count}
+
+
+class _HeadParser(HTMLParser):
+    """<title>과 OpenGraph/Twitter 메타 태그를 모으고 <body>가 시작되면 done을 설정합니다."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.title = ""
+        self.done = False
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key in META_KEYS and attrs.get("content"):
+                self.meta.setdefault(key, attrs["content"].strip())
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+
+def _http_url(url: Optional[str], base: str) -> Optional[str]:
+    if not url:
+        return None
+    url = urljoin(base, url)
+    return url if urlsplit(url).scheme in ("http", "https") else None
+
+
+def check_public_url(url: str) -> Optional[str]:
+    """
+    http(s) URL의 호스트를 해석하여 모든 주소가 공인 주소인지 확인하고, 아니면 UnsafeSourceURL을 발생시킵니다.
+    연결에 사용할 (확인한) IP 주소를 반환하며, SOURCE_ALLOW_PRIVATE이면 스킴만 확인하고 None을 반환합니다.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeSourceURL(f"지원하지 않는 출처 URL: {url}")
+    if SOURCE_ALLOW_PRIVATE:
+        return None
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    addresses = []
+    for *_, address in socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM):
+        ip = ipaddress.ip_address(address[0].split("%", 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeSourceURL(f"공인 주소가 아닌 출처 호스트: {parts.hostname} ({ip})")
+        addresses.append(ip)
+    if not addresses:
+        raise UnsafeSourceURL(f"출처 호스트의 주소를 찾을 수 없습니다: {parts.hostname}")
+    return str(addresses[0])
+
+
+def pinned_request(url: str, address: Optional[str]) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    확인한 IP로 바로 연결하도록 (요청 URL, 추가 헤더, httpx extensions)를 만듭니다.
+    Host 헤더와 TLS SNI(인증서 검증 포함)에는 원래 호스트 이름을 사용합니다. address가 None이면 URL을 그대로 사용합니다.
+    """
+    if address is None:
+        return url, {}, {}
+    parts = urlsplit(url)
+    host = f"[{address}]" if ":" in address else address
+    netloc = f"{host}:{parts.port}" if parts.port else host
+    host_header = f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname
+    extensions = {"sni_hostname": parts.hostname} if parts.scheme == "https" else {}
+    return urlunsplit(parts._replace(netloc=netloc)), {"Host": host_header}, extensions
+
+
+@lru_cache(maxsize=1)
+def source_client():
+    """출처 페이지 전용 httpx 클라이언트 (제공자 API 연결 풀과 분리, 리다이렉트는 fetch_metadata가 직접 처리)"""
+    import httpx
+    return httpx.Client(
+        timeout=SOURCE_FETCH_TIMEOUT,
+        follow_redirects=False,
+        limits=httpx.Limits(max_connections=SOURCE_FETCH_WORKERS, max_keepalive_connections=SOURCE_FETCH_WORKERS,
+                            keepalive_expiry=30),
+    )
+
+
+def _read_head(url: str, timeout: float) -> Tuple[str, Optional[_HeadParser]]:
+    """
+    리다이렉트를 한 단계씩 따라가며 단계마다 check_public_url로 확인한 IP로 연결하고,
+    (최종 URL, <head>까지 읽은 파서)를 반환합니다. HTML이 아니면 파서 대신 None을 반환합니다.
+    """
+    headers = {"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+    for _ in range(MAX_REDIRECTS + 1):
+        target, host_headers, extensions = pinned_request(url, check_public_url(url))
+        with source_client().stream("GET", target, timeout=timeout, headers={**headers, **host_headers},
+                                    extensions=extensions) as response:
+            if response.is_redirect:
+                url = urljoin(url, response.headers["location"])
+                continue
+            response.raise_for_status()
+            if "html" not in response.headers.get("content-type", "html"):
+                return url, None
+            parser = _HeadParser()
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+            received = 0
+            for chunk in response.iter_bytes():
+                parser.feed(decoder.decode(chunk))
+                received += len(chunk)
+                if parser.done or received >= MAX_PAGE_BYTES:
+                    break
+            return url, parser
+    raise UnsafeSourceURL(f"리다이렉트가 {MAX_REDIRECTS}번을 넘습니다: {url}")
+
+
+def fetch_metadata(url: str, timeout: float = SOURCE_FETCH_TIMEOUT) -> Dict[str, Any]:
+    """
+    리다이렉트를 따라가 최종 URL과 페이지 제목, 사이트 이름, 썸네일 URL을 반환합니다.
+    HTML이 아니면 최종 URL만 반환하며, HTTP 오류와 공인 주소가 아닌 호스트(UnsafeSourceURL)는 예외로 전달합니다.
+    """
+    resolved, parser = _read_head(url, timeout)
+    metadata: Dict[str, Any] = {"resolved_url": resolved}
+    if parser is None:
+        return metadata
+
+    meta = parser.meta
+    title = " ".join((meta.get("og:title") or meta.get("twitter:title") or parser.title).split())
+    if title:
+        metadata["title"] = title
+    if meta.get("og:site_name"):
+        metadata["site_name"] = meta["og:site_name"]
+    thumbnail = _http_url(meta.get("og:image") or meta.get("og:image:url") or meta.get("twitter:image"), resolved)
+    if thumbnail:
+        metadata["thumbnail"] = thumbnail
+    return metadata
+
+
+@lru_cache(maxsize=1)
+def get_source_cache() -> SourceCache:
+    return SourceCache(SOURCE_CACHE_PATH)
+
+
+@lru_cache(maxsize=1)
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=SOURCE_FETCH_WORKERS, thread_name_prefix="sources")
+
+
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _fetch_and_store(url: str) -> Dict[str, Any]:
+    try:
+        metadata, ttl = fetch_metadata(url), SOURCE_CACHE_TTL
+    except Exception as e:
+        # 실패도 짧게 캐시하여 응답하지 않는 사이트를 요청마다 다시 기다리지 않음
+        logger.info("출처 정보 가져오기 실패 (%s): %s", url, e)
+        metadata, ttl = {}, SOURCE_FAILURE_TTL
+    try:
+        get_source_cache().set(url, metadata, ttl)
+    except sqlite3.Error as e:
+        logger.warning("출처 캐시 저장 실패: %s", e)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(url, None)
+    return metadata
+
+
+def _lookup(url: str):
+    """캐시된 보강 결과(dict)를 반환하거나, 없으면 진행 중인(또는 새로 시작한) 가져오기 Future를 반환합니다."""
+    try:
+        cached = get_source_cache().get(url)
+    except sqlite3.Error as e:
+        # 캐시 DB를 열 수 없어도 보강 없이(또는 새로 가져와서) 응답을 끝낼 수 있도록 미스로 처리
+        logger.warning("출처 캐시를 열 수 없습니다: %s", e)
+        cached = None
+    if cached is not None:
+        return cached
+    with _inflight_lock:
+        future = _inflight.get(url)
+        if future is None:
+            future = _inflight[url] = _executor().submit(_fetch_and_store, url)
+    return future
+
+
+def prefetch_sources(sources: List[Dict[str, str]]):
+    """출처 보강을 백그라운드에서 미리 시작합니다 (파이프라인의 다른 단계와 겹쳐 실행)."""
+    if SOURCE_ENRICH:
+        for source in sources:
+            _lookup(source["url"])
+
+
+def enrich_sources(sources: List[Dict[str, str]], timeout: float = SOURCE_ENRICH_TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    출처 목록에 resolved_url, site_name, thumbnail과 페이지 제목을 채워 반환합니다.
+    캐시에 없는 출처는 동시에 가져오되 최대 timeout초만 기다리고, 그때까지 끝나지 않은 출처는 원래 값으로 둡니다.
+    """
+    if not SOURCE_ENRICH or not sources:
+        return sources
+    found = {source["url"]: _lookup(source["url"]) for source in sources}
+    futures = [value for value in found.values() if isinstance(value, Future)]
+    if futures:
+        wait(futures, timeout=timeout)
+    enriched = []
+    for source in sources:
+        value = found[source["url"]]
+        if isinstance(value, Future):
+            value = value.result() if value.done() else {}
+        enriched.append({**source, **value})
+    return enriched
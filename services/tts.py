@@ -0,0 +1,165 @@
+import contextvars
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from services.tts_cache import TTSCache
+from services.providers import get_tts_provider
+from utils.config import TTS_MAX_WORKERS, TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+from utils.metrics import API_ERRORS, API_REQUEST_SECONDS, CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+TTS_MODEL = "tts-1"
+TTS_SPEED = 1.05
+MAX_TTS_CHARS = 1000  # 한 번의 TTS 호출에 보내는 최대 글자 수
+
+
+# 합성된 세그먼트 디스크 캐시 (TTS_CACHE_DIR가 비어 있으면 사용하지 않음)
+tts_cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES) if TTS_CACHE_DIR else None
+
+
+class TTSError(Exception):
+    """재시도 후에도 세그먼트 음성 합성에 실패한 경우 (재시도는 utils.outbound가 처리)"""
+
+
+def split_text(text: str, limit: int = MAX_TTS_CHARS) -> List[str]:
+    """TTS 입력 제한에 맞게 단어 경계에서 텍스트를 나눕니다."""
+    if len(text) <= limit:
+        return [text]
+
+    parts = []
+    part = []
+    for word in text.split():
+        if len(' '.join(part) + ' ' + word) <= limit:
+            part.append(word)
+        else:
+            if part:
+                parts.append(' '.join(part))
+            part = [word]
+    if part:
+        parts.append(' '.join(part))
+    return parts
+
+
+def synthesize_part(voice: str, text: str) -> bytes:
+    """
+    텍스트 한 조각을 음성으로 합성합니다. 캐시에 있으면 재사용합니다.
+    속도 제한과 재시도(Retry-After, 지수 백오프)는 제공자 호출을 감싼 utils.outbound가 처리합니다.
+    """
+    if tts_cache is not None:
+        cached = tts_cache.get(voice, TTS_MODEL, TTS_SPEED, text)
+        CACHE_REQUESTS.inc(cache="tts", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+
+    try:
+        with API_REQUEST_SECONDS.time(operation="tts"):
+            audio = get_tts_provider().synthesize(voice, text, model=TTS_MODEL, speed=TTS_SPEED)
+    except Exception as e:
+        API_ERRORS.inc(operation="tts")
+        raise TTSError(f"음성 합성 실패: {e}") from e
+
+    if tts_cache is not None:
+        try:
+            tts_cache.put(voice, TTS_MODEL, TTS_SPEED, text, audio)
+        except OSError as e:
+            logger.warning("TTS 캐시 저장 실패: %s", e)
+    return audio
+
+
+def synthesize_segments(segments: List[Tuple[str, str]],
+                        max_workers: Optional[int] = None,
+                        progress: Optional[Callable[[int, int], None]] = None) -> List[bytes]:
+    """
+    (voice, text) 세그먼트 목록을 병렬로 합성하여 스크립트 순서대로 오디오를 반환합니다.
+
+    긴 세그먼트는 MAX_TTS_CHARS 단위로 나누어 각각 별도의 요청으로 보내며,
+    동시 요청 수는 max_workers(기본값 TTS_MAX_WORKERS)로 제한됩니다.
+    하나라도 최종 실패하면 TTSError를 발생시킵니다.
+    progress가 주어지면 조각 하나가 끝날 때마다 progress(완료 수, 전체 수)를 호출합니다.
+    """
+    part_count = sum(len(split_text(text)) for _, text in segments)
+    if not part_count:
+        return []
+    workers = min(max_workers or TTS_MAX_WORKERS, part_count)
+    return synthesize_stream(segments, max_workers=workers, progress=progress)
+
+
+def synthesize_stream(segments: Iterable[Tuple[str, str]],
+                      max_workers: Optional[int] = None,
+                      progress: Optional[Callable[[int, int], None]] = None) -> List[bytes]:
+    """
+    세그먼트 이터레이터에서 세그먼트가 나오는 즉시 TTS 요청을 보내고, 끝나면 순서대로 오디오를 반환합니다.
+    스크립트를 스트리밍으로 받는 동안 이미 완성된 대사의 합성을 진행할 때 사용합니다.
+    progress의 전체 수는 지금까지 요청한 조각 수입니다.
+    """
+    workers = max(1, max_workers or TTS_MAX_WORKERS)
+    futures = []
+    lock = threading.Lock()
+    completed = [0]
+
+    def on_done(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        with lock:
+            completed[0] += 1
+            done, total = completed[0], len(futures)
+        progress(done, total)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts") as executor:
+        try:
+            for voice, text in segments:
+                for part in split_text(text):
+                    with lock:
+                        # 요청 마감 시간(contextvars)을 워커 스레드로 전달
+                        future = executor.submit(contextvars.copy_context().run, synthesize_part, voice, part)
+                        futures.append(future)
+                    if progress is not None:
+                        future.add_done_callback(on_done)
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def synthesize_ordered(segments: Iterable[Tuple[str, str]],
+                       max_workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    세그먼트 이터레이터에서 세그먼트가 나오는 즉시 TTS 요청을 보내고, 합성된 조각을 스크립트 순서대로
+    (voice, 오디오)로 바로 yield합니다. 전체가 끝나기를 기다리지 않으므로 점진적 재생에 사용합니다.
+    세그먼트 이터레이터(스크립트 스트리밍)는 별도 스레드에서 읽으며, 소비를 중단하면 남은 요청을 취소합니다.
+    """
+    workers = max(1, max_workers or TTS_MAX_WORKERS)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+    pending: "queue.Queue" = queue.Queue()  # (voice, future), 끝이면 None, 실패면 예외
+    stopped = threading.Event()
+
+    def submit_all():
+        try:
+            for voice, text in segments:
+                for part in split_text(text):
+                    if stopped.is_set():
+                        return
+                    pending.put((voice, executor.submit(contextvars.copy_context().run, synthesize_part, voice, part)))
+        except BaseException as e:
+            pending.put(e)
+            return
+        pending.put(None)
+
+    threading.Thread(target=contextvars.copy_context().run, args=(submit_all,), name="tts-feeder", daemon=True).start()
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            voice, future = item
+            yield voice, future.result()
+    finally:
+        stopped.set()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용 텍스트 정규화 (유니코드 NFC, 연속 공백 축약)"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def make_key(voice: str, model: str, speed: float, text: str) -> str:
+    payload = json.dumps([voice, model, round(float(speed), 3), normalize_text(text)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """
+    (voice, model, speed, 정규화된 텍스트)를 키로 MP3 바이트를 저장하는 디스크 캐시.
+
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다(LRU).
+    사용 순서는 파일 mtime으로 기록하므로 프로세스를 재시작해도 유지됩니다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> 파일 크기 (오래된 순)
+        self._total_bytes = 0
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp3"
+
+    def _load_index(self):
+        entries = []
+        for path in self.directory.glob("*/*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def get(self, voice: str, model: str, speed: float, text: str) -> Optional[bytes]:
+        key = make_key(voice, model, speed, text)
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                if key in self._index:
+                    self._total_bytes -= self._index.pop(key)
+            return None
+        with self._lock:
+            self.hits += 1
+            if key not in self._index:
+                self._total_bytes += len(data)
+            self._index[key] = len(data)
+            self._index.move_to_end(key)
+        return data
+
+    def put(self, voice: str, model: str, speed: float, text: str, data: bytes):
+        key = make_key(voice, model, speed, text)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체하여 다른 워커가 반쯤 쓰인 파일을 읽지 않도록 함
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._total_bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,42 @@
+"""
+테스트 공용 설정: benchmarks/fake_server.py 대역 서버를 띄우고 fake 백엔드로 app 모듈을 임포트합니다.
+설정(utils.config)은 임포트 시 환경 변수를 읽으므로, 세션 동안 환경 변수와 작업 디렉터리를 바꿔 두었다가 끝나면 되돌립니다.
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import fake_server  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def fake_provider(tmp_path_factory):
+    """대역 서버 주소를 반환합니다. 스트리밍 응답은 조각 사이에 지연을 두어 1초 넘게 이어집니다 (연결 종료 테스트용)."""
+    server = fake_server.start_server(port=0, latency=0.0, jitter=0.0, chunk_delay=0.2, stream_chunks=8)
+    tmp = tmp_path_factory.mktemp("app")
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in {
+            "PROVIDER_BACKEND": "fake",
+            "FAKE_PROVIDER_URL": f"http://127.0.0.1:{server.server_port}",
+            "OUTBOUND_RATE_LIMITS": "",
+            "WARMUP": "off",
+            "SEARCH_STREAMING": "1",
+            "ARTIFACT_DIR": str(tmp / "artifacts"),
+            "TTS_CACHE_DIR": "",
+            "SOURCE_CACHE_PATH": str(tmp / "sources.sqlite3"),
+        }.items():
+            mp.setenv(name, value)
+        mp.chdir(ROOT)
+        yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture(scope="session")
+def app_module(fake_provider):
+    return importlib.import_module("app")
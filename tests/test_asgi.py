@@ -0,0 +1,142 @@
+"""
+asgi.application 테스트: WSGI 브리지로 전달되는 Flask 라우트, 이벤트 루프에서 처리하는 /stream_search SSE,
+스트리밍 도중 클라이언트 연결 종료를 ASGI 서버 없이 scope/receive/send로 직접 호출하여 확인합니다.
+제공자는 benchmarks/fake_server.py 대역 서버를 사용하므로 외부 네트워크와 API 키가 필요 없습니다.
+
+    python -m pytest tests
+"""
+import asyncio
+import importlib
+import json
+import threading
+import time
+
+import pytest
+
+TIMEOUT = 10
+
+
+@pytest.fixture(scope="module")
+def asgi(app_module):
+    """대역 서버 설정으로 임포트한 asgi 모듈 (conftest.fake_provider 참고)"""
+    module = importlib.import_module("asgi")
+    yield module
+    module.wsgi_bridge.shutdown()
+
+
+def http_scope(path: str, query_string: str = "", method: str = "GET") -> dict:
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": query_string.encode("latin-1"),
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def run_request(application, scope, disconnect_after_body: bool = False) -> list:
+    """
+    요청 본문 없이 application을 호출하고 보낸 메시지 목록을 반환합니다.
+    disconnect_after_body이면 첫 본문 조각을 받은 직후 http.disconnect를 보내 클라이언트 연결 종료를 흉내 냅니다.
+    """
+    inbox: asyncio.Queue = asyncio.Queue()
+    inbox.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+    sent = []
+
+    async def receive():
+        return await inbox.get()
+
+    async def send(message):
+        sent.append(message)
+        if disconnect_after_body and message["type"] == "http.response.body" and message.get("body"):
+            inbox.put_nowait({"type": "http.disconnect"})
+
+    await asyncio.wait_for(application(scope, receive, send), TIMEOUT)
+    return sent
+
+
+def response_body(sent: list) -> bytes:
+    return b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+
+
+def test_wsgi_bridge_get_route(asgi):
+    sent = asyncio.run(run_request(asgi.application, http_scope("/stats")))
+    start = sent[0]
+    assert start["type"] == "http.response.start"
+    assert start["status"] == 200
+    assert (b"content-type", b"application/json") in start["headers"]
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+    assert "search_cache" in json.loads(response_body(sent))
+
+
+def test_wsgi_bridge_bad_request(asgi):
+    sent = asyncio.run(run_request(asgi.application, http_scope("/generate_podcast", method="POST")))
+    assert sent[0]["status"] == 400
+    assert json.loads(response_body(sent)) == {"error": "쿼리 없음"}
+
+
+def test_stream_search_sse(asgi):
+    sent = asyncio.run(run_request(asgi.application, http_scope("/stream_search", "query=asgi+sse")))
+    assert sent[0]["status"] == 200
+    assert dict(sent[0]["headers"])[b"content-type"].startswith(b"text/event-stream")
+    assert sent[-1]["more_body"] is False
+    events = [message["body"].decode("utf-8") for message in sent[1:-1]]
+    assert len(events) > 1
+    assert all(event.startswith("data: ") and event.endswith("\n\n") for event in events)
+    assert "검색 결과" in response_body(sent).decode("utf-8")
+    # 끝까지 받은 검색 결과는 캐시되어 다음 요청이 재사용함
+    assert asgi.lookup_search_cache("asgi sse") is not None
+
+
+def test_stream_search_client_disconnect(asgi):
+    query = "asgi disconnect"
+    sent = asyncio.run(run_request(asgi.application, http_scope("/stream_search", "query=asgi+disconnect"),
+                                   disconnect_after_body=True))
+    # 첫 이벤트 이후 스트림이 취소되어 응답을 끝내는 메시지 없이 반환됨
+    assert sent[0]["status"] == 200
+    assert not any(message["type"] == "http.response.body" and message.get("more_body") is False
+                   for message in sent)
+    # 진행 중이던 검색은 정리되고, 끝나지 않은 결과는 캐시하지 않음
+    assert asgi.search_flight.stats()["in_flight"] == 0
+    assert asgi.lookup_search_cache(query) is None
+
+
+class EndlessBody:
+    """끝나지 않는 WSGI 응답 본문. 닫힐 때와 조각을 몇 개 만들었는지 기록합니다."""
+
+    def __init__(self):
+        self.chunks = 0
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        while not self.closed.is_set():
+            self.chunks += 1
+            time.sleep(0.05)
+            yield b"data: tick\n\n"
+
+    def close(self):
+        self.closed.set()
+
+
+def test_wsgi_bridge_client_disconnect(asgi):
+    body = EndlessBody()
+
+    def endless_app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/event-stream")])
+        return body
+
+    bridge = asgi.WSGIBridge(endless_app, max_workers=1)
+    try:
+        sent = asyncio.run(run_request(bridge, http_scope("/jobs/1/events"), disconnect_after_body=True))
+    finally:
+        bridge.shutdown()
+    # 연결 종료 후 다음 조각에서 이터레이터를 닫고 응답을 끝내는 메시지 없이 반환
+    assert body.closed.is_set()
+    assert body.chunks < 10
+    assert sent[0]["status"] == 200
+    assert not any(message.get("more_body") is False for message in sent)
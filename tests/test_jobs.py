@@ -0,0 +1,46 @@
+"""
+services.jobs.JobManager 테스트: 끝나지 않은 작업 상한(max_pending)과 상한 도달 시 POST /jobs의 503 응답을 확인합니다.
+
+    python -m pytest tests
+"""
+import threading
+
+import pytest
+
+from services.jobs import JobManager, JobQueueFull
+
+TIMEOUT = 10
+
+
+def blocking_pipeline(release: threading.Event):
+    def run(query, progress):
+        progress("search")
+        assert release.wait(TIMEOUT)
+        return query
+    return run
+
+
+def test_job_queue_full():
+    release = threading.Event()
+    manager = JobManager(max_workers=1, retention=10, max_pending=2)
+    try:
+        running = manager.submit("podcast", "a", blocking_pipeline(release), "a")
+        queued = manager.submit("podcast", "b", blocking_pipeline(release), "b")
+        with pytest.raises(JobQueueFull):
+            manager.submit("podcast", "c", blocking_pipeline(release), "c")
+        release.set()
+        for job in (running, queued):
+            assert [event["stage"] for event in job.iter_events(timeout=TIMEOUT)][-1] == "done"
+        # 끝난 작업은 상한에서 빠져 다시 받을 수 있음
+        assert manager.submit("podcast", "d", blocking_pipeline(release), "d").query == "d"
+    finally:
+        release.set()
+        manager._executor.shutdown(wait=True)
+
+
+def test_submit_job_rejects_when_full(app_module, monkeypatch):
+    monkeypatch.setattr(app_module.job_manager, "max_pending", 0)
+    response = app_module.app.test_client().post("/jobs", data={"query": "queue full", "kind": "podcast"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+    assert "error" in response.get_json()
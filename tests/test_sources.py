@@ -0,0 +1,67 @@
+"""
+출처 보강(services/sources.py) 테스트: 공인 주소 확인, 확인한 IP로 고정한 연결, 캐시 DB 오류 처리.
+"""
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def sources(app_module):
+    import services.sources as module
+    return module
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/", "http://localhost/", "http://169.254.169.254/latest", "http://[::ffff:10.0.0.1]/",
+    "http://0.0.0.0/", "file:///etc/passwd",
+])
+def test_check_public_url_rejects_private_hosts(sources, monkeypatch, url):
+    monkeypatch.setattr(sources, "SOURCE_ALLOW_PRIVATE", False)
+    with pytest.raises(sources.UnsafeSourceURL):
+        sources.check_public_url(url)
+
+
+def test_check_public_url_returns_checked_address(sources, monkeypatch):
+    monkeypatch.setattr(sources, "SOURCE_ALLOW_PRIVATE", False)
+    assert sources.check_public_url("https://93.184.216.34:8443/page") == "93.184.216.34"
+
+
+def test_pinned_request_keeps_host_name(sources):
+    assert sources.pinned_request("https://example.com/a?b=1", "93.184.216.34") == (
+        "https://93.184.216.34/a?b=1", {"Host": "example.com"}, {"sni_hostname": "example.com"})
+    assert sources.pinned_request("http://example.com:8080/", "2606:2800:220:1::") == (
+        "http://[2606:2800:220:1::]:8080/", {"Host": "example.com:8080"}, {})
+    assert sources.pinned_request("http://example.com/", None) == ("http://example.com/", {}, {})
+
+
+def test_fetch_connects_to_checked_address(sources, monkeypatch, fake_provider):
+    # DNS가 다시 해석되지 않도록, 확인 단계가 돌려준 주소(대역 서버)로 연결하고 Host는 원래 이름을 유지하는지 확인
+    port = fake_provider.rsplit(":", 1)[1]
+    checked = []
+
+    def check(url):
+        checked.append(url)
+        return "127.0.0.1"
+
+    monkeypatch.setattr(sources, "check_public_url", check)
+    metadata = sources.fetch_metadata(f"http://rebind.invalid:{port}/source/1")
+    assert metadata["resolved_url"] == f"http://rebind.invalid:{port}/page/1"
+    assert metadata["title"]
+    assert checked == [f"http://rebind.invalid:{port}/source/1", f"http://rebind.invalid:{port}/page/1"]
+
+
+def test_cache_errors_are_misses(sources, monkeypatch, tmp_path):
+    path = tmp_path / "sources.sqlite3"
+    cache = sources.SourceCache(str(path))
+    cache._connect().execute("DROP TABLE source_cache")
+    assert cache.get("http://example.com/") is None
+    assert cache.misses == 1
+
+    def broken():
+        raise sqlite3.DatabaseError("file is not a database")
+
+    # 캐시를 열 수 없어도 미스로 보고 가져오기를 진행 (저장 실패도 무시)
+    monkeypatch.setattr(sources, "get_source_cache", broken)
+    monkeypatch.setattr(sources, "fetch_metadata", lambda url: {"title": "t"})
+    assert sources._lookup("http://cache-error.example/").result(timeout=5) == {"title": "t"}
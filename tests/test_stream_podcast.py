@@ -0,0 +1,50 @@
+"""
+/stream_podcast 테스트: 스트리밍 도중 클라이언트가 연결을 끊어도 같은 입력의 동시 요청 병합(artifact_flight)이
+해제되어, 다음 요청이 기다리지 않고 새로 생성하는지 확인합니다. 믹싱/인코딩에 ffmpeg가 필요합니다.
+"""
+import shutil
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg가 필요합니다")
+
+
+def test_stream_podcast_disconnect_releases_flight(app_module, monkeypatch):
+    import services.tts as tts
+    synthesize_part = tts.synthesize_part
+    calls = []
+    waiting = threading.Event()
+    resume = threading.Event()
+
+    def gated_synthesize_part(voice, text):
+        # 처음 몇 조각(첫 MP3 출력에 필요한 만큼) 이후의 합성을 붙잡아, 연결이 끊길 때 인코딩 feeder 스레드가 다음 세그먼트를 기다리는 중이도록 함
+        calls.append(text)
+        if len(calls) > 3:
+            waiting.set()
+            resume.wait(10)
+        return synthesize_part(voice, text)
+
+    monkeypatch.setattr(tts, "synthesize_part", gated_synthesize_part)
+    query = "스트리밍 연결 종료"
+    client = app_module.app.test_client()
+    try:
+        response = client.get("/stream_podcast", query_string={"query": query}, buffered=False)
+        assert response.status_code == 200
+        assert next(iter(response.response))
+        assert waiting.wait(10)
+        time.sleep(0.2)
+        response.close()
+    finally:
+        resume.set()
+    assert app_module.artifact_flight.stats()["in_flight"] == 0
+
+    # 병합 항목이 남아 있으면 다음 요청은 마감 시간까지 기다리다 실패하므로, 바로 새로 생성되는지 확인
+    monkeypatch.setattr(tts, "synthesize_part", synthesize_part)
+    start = time.perf_counter()
+    response = client.get("/stream_podcast", query_string={"query": query}, buffered=False)
+    assert response.status_code == 200
+    assert next(iter(response.response))
+    response.close()
+    assert time.perf_counter() - start < 30
@@ -0,0 +1,168 @@
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.config import (SEARCH_CACHE_BACKEND, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL,
+                          SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_BYTES)
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (유니코드 NFC, 소문자, 연속 공백 축약)"""
+    return ' '.join(unicodedata.normalize('NFC', query).lower().split())
+
+
+class SearchCache:
+    """
+    검색 결과({"text": ..., "sources": [...]})를 저장하는 스레드 안전 메모리 캐시.
+
+    항목마다 TTL이 있으며, 항목 수(max_entries) 또는 직렬화된 크기(max_bytes)를 넘으면
+    가장 오래 사용되지 않은 항목부터 삭제합니다(LRU).
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._total_bytes = 0
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, query: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        key = normalize_query(query)
+        size = len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def __contains__(self, query: str) -> bool:
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries), "bytes": self._total_bytes}
+
+
+class SQLiteSearchCache(SearchCache):
+    """
+    여러 gunicorn 워커가 공유할 수 있는 SQLite 기반 검색 캐시.
+    SearchCache와 동일한 인터페이스와 TTL/LRU 정책을 사용합니다.
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int, max_bytes: int):
+        super().__init__(ttl, max_entries, max_bytes)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        key = normalize_query(query)
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM search_cache WHERE key = ? AND expires_at > ?",
+                           (key, now)).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, query: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        key = normalize_query(query)
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                         (key, data, size, expires_at, now))
+            conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            # 항목 수/크기 제한을 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache").fetchone()
+            rows = conn.execute("SELECT key, size FROM search_cache ORDER BY last_access").fetchall() \
+                if count > self.max_entries or total > self.max_bytes else []
+            for old_key, old_size in rows:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (old_key,))
+                count -= 1
+                total -= old_size
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def __contains__(self, query: str) -> bool:
+        row = self._connect().execute("SELECT 1 FROM search_cache WHERE key = ? AND expires_at > ?",
+                                      (normalize_query(query), time.time())).fetchone()
+        return row is not None
+
+    def stats(self) -> Dict[str, int]:
+        count, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache").fetchone()
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total}
+
+
+def create_search_cache() -> SearchCache:
+    """설정(SEARCH_CACHE_BACKEND)에 맞는 검색 캐시를 생성합니다."""
+    if SEARCH_CACHE_BACKEND == "sqlite":
+        return SQLiteSearchCache(SEARCH_CACHE_PATH, SEARCH_CACHE_TTL,
+                                 SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_BYTES)
+    return SearchCache(SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_BYTES)
@@ -0,0 +1,36 @@
+"""
+외부 LLM/TTS 클라이언트를 처음 사용할 때 한 번만 생성하는 지연 초기화 싱글턴.
+SDK 임포트와 클라이언트 생성을 모듈 임포트 시점에서 첫 요청(또는 warm-up) 시점으로 미룹니다.
+두 SDK 모두 utils.outbound의 공용 keep-alive 연결 풀을 사용하며, 재시도는 SDK가 아닌 utils.outbound가 담당합니다.
+"""
+from functools import lru_cache
+
+from utils.config import GEMINI_API_KEY, OPENAI_API_KEY
+from utils.outbound import http_client
+
+
+@lru_cache(maxsize=1)
+def get_genai_client():
+    """google.genai 클라이언트 (검색, 보고서 생성)"""
+    from google import genai
+    return genai.Client(api_key=GEMINI_API_KEY,
+                        http_options=get_genai_types().HttpOptions(httpx_client=http_client()))
+
+
+@lru_cache(maxsize=1)
+def get_genai_types():
+    """google.genai.types 모듈 (요청 설정 객체 생성용)"""
+    from google.genai import types
+    return types
+
+
+@lru_cache(maxsize=1)
+def get_openai():
+    """API 키가 설정된 openai 모듈 (스크립트 생성, TTS, 키워드 추출)"""
+    import openai
+    if openai.api_key is None:
+        openai.api_key = OPENAI_API_KEY
+    if openai.http_client is None:
+        openai.http_client = http_client()
+    openai.max_retries = 0
+    return openai
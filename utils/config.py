@@ -9,4 +9,93 @@ GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 NAVER_CLIENT_ID = os.getenv('NAVER_CLIENT_ID')
 NAVER_CLIENT_SECRET = os.getenv('NAVER_CLIENT_SECRET')
-YOUTUBE_API_KEY = os.getenv('GOOGLE_API_KEY')
\ No newline at end of file
+YOUTUBE_API_KEY = os.getenv('GOOGLE_API_KEY')
+
+# TTS 병렬 합성 설정
+TTS_MAX_WORKERS = int(os.getenv('TTS_MAX_WORKERS', '8'))
+
+# TTS 세그먼트 디스크 캐시 (빈 문자열이면 비활성화)
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join('cache', 'tts'))
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Gemini 검색 결과 캐시 (backend: memory | sqlite)
+SEARCH_CACHE_BACKEND = os.getenv('SEARCH_CACHE_BACKEND', 'memory')
+SEARCH_CACHE_PATH = os.getenv('SEARCH_CACHE_PATH', os.path.join('cache', 'search.sqlite3'))
+SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', '3600'))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '256'))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv('SEARCH_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# /stream_search에서 Gemini 스트리밍 API로 토큰을 바로 전달할지 여부
+SEARCH_STREAMING = os.getenv('SEARCH_STREAMING', '1') == '1'
+
+# 백그라운드 작업(팟캐스트/보고서 생성) 워커 수와 보관할 완료 작업 수
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_RETENTION = int(os.getenv('JOB_RETENTION', '200'))
+# 대기 중이거나 실행 중인 작업 상한. 가득 차면 POST /jobs가 503을 반환
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '32'))
+# /generate_all에서 보고서와 팟캐스트 파이프라인을 동시에 실행하는 워커 수
+FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', '8'))
+
+# 팟캐스트 스크립트를 스트리밍으로 받으면서 완성된 대사부터 TTS를 시작할지 여부
+SCRIPT_STREAMING = os.getenv('SCRIPT_STREAMING', '1') == '1'
+
+# 화자가 바뀌는 지점에 넣는 무음 길이(ms), 0이면 넣지 않음
+SPEAKER_GAP_MS = int(os.getenv('SPEAKER_GAP_MS', '0'))
+
+# process_query 결과를 메모이즈하는 최대 쿼리 수
+KEYWORD_CACHE_SIZE = int(os.getenv('KEYWORD_CACHE_SIZE', '1024'))
+
+# 로그 레벨 (DEBUG로 설정하면 스크립트 줄 단위 파싱 로그까지 출력)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+# 시작 시 warm-up 방식 (background: 별도 스레드, sync: 임포트 중 실행, off: 첫 요청 시 지연 초기화)
+WARMUP = os.getenv('WARMUP', 'background')
+
+# 검색/텍스트/TTS 제공자 (live: Gemini, OpenAI / fake: benchmarks/fake_server.py 로컬 대역 서버)
+PROVIDER_BACKEND = os.getenv('PROVIDER_BACKEND', 'live')
+FAKE_PROVIDER_URL = os.getenv('FAKE_PROVIDER_URL', 'http://127.0.0.1:8765')
+FAKE_PROVIDER_TIMEOUT = float(os.getenv('FAKE_PROVIDER_TIMEOUT', '30'))
+
+# ASGI 모드(asgi.py)에서 Flask 라우트를 실행하는 스레드 수 (/stream_search는 이벤트 루프에서 처리)
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '32'))
+
+# 생성 결과물(팟캐스트/보고서) 저장소: 디렉토리, 종류별 최대 크기, 마지막 사용 후 보관 기간(초, 0이면 무기한)
+ARTIFACT_DIR = os.getenv('ARTIFACT_DIR', 'artifacts')
+ARTIFACT_MAX_BYTES = int(os.getenv('ARTIFACT_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))
+ARTIFACT_MAX_AGE = float(os.getenv('ARTIFACT_MAX_AGE', str(7 * 24 * 3600)))
+
+# 외부 API 호출 공용 계층 (utils/outbound.py)
+# 제공자[:모델]=초당 요청 수[/버스트] 목록, 0이나 미지정이면 제한 없음 (fake 백엔드는 'fake')
+OUTBOUND_RATE_LIMITS = os.getenv('OUTBOUND_RATE_LIMITS', 'openai=10/20,gemini=5/10')
+# 429/5xx/연결 오류 재시도 횟수 (이전 설정 이름 TTS_MAX_RETRIES도 인식)
+OUTBOUND_MAX_RETRIES = int(os.getenv('OUTBOUND_MAX_RETRIES', os.getenv('TTS_MAX_RETRIES', '3')))
+# 요청 한 번의 타임아웃(초)과 공용 연결 풀 크기
+OUTBOUND_TIMEOUT = float(os.getenv('OUTBOUND_TIMEOUT', '60'))
+OUTBOUND_MAX_CONNECTIONS = int(os.getenv('OUTBOUND_MAX_CONNECTIONS', '64'))
+# 팟캐스트/보고서 생성 요청 하나가 외부 API 대기와 재시도에 쓸 수 있는 전체 시간(초, 0이면 무제한)
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', '600'))
+
+# 보고서를 목차 → 섹션 동시 작성 방식으로 생성할지 여부 (0이면 한 번의 프롬프트로 전체 보고서 생성)
+REPORT_SECTIONED = os.getenv('REPORT_SECTIONED', '1') == '1'
+# 목차의 최대 섹션 수와 섹션을 동시에 작성하는 워커 수 (요청 하나 기준)
+REPORT_MAX_SECTIONS = int(os.getenv('REPORT_MAX_SECTIONS', '6'))
+REPORT_SECTION_WORKERS = int(os.getenv('REPORT_SECTION_WORKERS', '6'))
+# 섹션 프롬프트 하나에 넣는 검색 결과의 최대 글자 수 (넘으면 섹션과 관련된 문장을 골라 넣음, 0이면 전체)
+REPORT_SECTION_CONTEXT_CHARS = int(os.getenv('REPORT_SECTION_CONTEXT_CHARS', '4000'))
+
+# 검색 출처 보강 (리다이렉트 해석, 페이지 제목/OpenGraph 썸네일): 사용 여부, URL별 결과 캐시 위치와 보관 기간(초)
+SOURCE_ENRICH = os.getenv('SOURCE_ENRICH', '1') == '1'
+SOURCE_CACHE_PATH = os.getenv('SOURCE_CACHE_PATH', os.path.join('cache', 'sources.sqlite3'))
+SOURCE_CACHE_TTL = float(os.getenv('SOURCE_CACHE_TTL', str(7 * 24 * 3600)))
+# 가져오기에 실패한 URL은 이 시간(초) 동안 다시 시도하지 않음
+SOURCE_FAILURE_TTL = float(os.getenv('SOURCE_FAILURE_TTL', '3600'))
+# 응답 시 보강 결과를 기다리는 최대 시간(초, 넘으면 원래 출처를 반환하고 가져오기는 백그라운드에서 계속)과
+# 페이지 하나를 가져오는 타임아웃(초), 동시에 가져오는 페이지 수
+SOURCE_ENRICH_TIMEOUT = float(os.getenv('SOURCE_ENRICH_TIMEOUT', '1.5'))
+SOURCE_FETCH_TIMEOUT = float(os.getenv('SOURCE_FETCH_TIMEOUT', '5'))
+SOURCE_FETCH_WORKERS = int(os.getenv('SOURCE_FETCH_WORKERS', '8'))
+# 사설/루프백/링크 로컬 주소로 해석되는 출처도 가져올지 (SSRF 방지를 위해 기본은 거부, fake 백엔드는 로컬 대역 서버를 쓰므로 허용)
+SOURCE_ALLOW_PRIVATE = os.getenv('SOURCE_ALLOW_PRIVATE', '1' if PROVIDER_BACKEND == 'fake' else '0') == '1'
+
+# 팟캐스트 출력 오디오 프리셋 (speech: 64kbps 24kHz 모노, stereo: 128kbps 44.1kHz 스테레오)
+AUDIO_PRESET = os.getenv('AUDIO_PRESET', 'speech')
@@ -0,0 +1,131 @@
+"""
+파이프라인 계측용 카운터/히스토그램과 Prometheus 텍스트 형식 출력.
+
+외부 의존성 없이 프로세스 내에서 값을 모으고, /metrics 라우트가 render()로 노출합니다.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_registry: List['Metric'] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(Metric):
+    """단조 증가 카운터"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value:g}" for key, value in items]
+
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램 (초 단위 소요 시간용)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}  # key -> [버킷별 개수, 합계, 개수]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 소요 시간을 기록합니다 (예외가 나도 기록)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {bucket_count}")
+            le = 'le="+Inf"'
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {count}")
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# 파이프라인 단계: search, script, tts, mix, report, pdf
+STAGE_SECONDS = Histogram("reportcast_stage_seconds", "파이프라인 단계별 소요 시간(초)", ["stage"])
+# 외부 API 요청 한 건의 소요 시간, 재시도와 속도 제한 대기 포함 (operation: search, script, report, keywords, tts)
+API_REQUEST_SECONDS = Histogram("reportcast_api_request_seconds", "외부 API 요청 소요 시간(초)", ["operation"])
+API_ERRORS = Counter("reportcast_api_errors_total", "외부 API 호출 오류 수", ["operation"])
+# cache: search, tts, keywords, artifact, sources / result: hit, miss
+CACHE_REQUESTS = Counter("reportcast_cache_requests_total", "캐시 조회 수", ["cache", "result"])
+# 외부 API 호출 공용 계층: 재시도 수와 속도 제한(토큰 버킷) 대기 시간
+OUTBOUND_RETRIES = Counter("reportcast_outbound_retries_total", "외부 API 호출 재시도 수", ["provider", "model"])
+OUTBOUND_THROTTLE_SECONDS = Histogram("reportcast_outbound_throttle_seconds", "속도 제한으로 대기한 시간(초)", ["provider"])
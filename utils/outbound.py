@@ -0,0 +1,350 @@
+"""
+외부 API 호출 공용 계층.
+
+- HTTP keep-alive 연결 풀: OpenAI SDK와 로컬 대역 서버 클라이언트가 하나의 httpx.Client를 공유합니다.
+- 속도 제한: 제공자/모델별 토큰 버킷 (OUTBOUND_RATE_LIMITS). 429 응답의 Retry-After 동안에는 같은 버킷을 쓰는
+  다른 요청도 함께 멈추므로, 동시 작업이 몰려도 429가 연쇄적으로 늘어나지 않습니다.
+- 재시도: 429/5xx/연결 오류를 지터를 섞은 지수 백오프로 재시도하며, 서버가 준 Retry-After를 우선합니다.
+- 마감 시간: with deadline(초)로 요청 단위 예산을 정하면 대기/재시도가 남은 시간을 넘지 않습니다.
+  예산은 contextvars로 전달되므로 워커 스레드에는 contextvars.copy_context().run으로 넘깁니다.
+"""
+import asyncio
+import contextvars
+import email.utils
+import logging
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from utils.config import (OUTBOUND_RATE_LIMITS, OUTBOUND_MAX_RETRIES, OUTBOUND_TIMEOUT,
+                          OUTBOUND_MAX_CONNECTIONS)
+from utils.metrics import OUTBOUND_RETRIES, OUTBOUND_THROTTLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+
+class DeadlineExceeded(Exception):
+    """요청의 마감 시간 안에 외부 API 호출을 끝낼 수 없는 경우"""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def cancel(self):
+        """남은 예산을 없앱니다. 이 예산을 쓰는 이후의 외부 API 호출은 바로 DeadlineExceeded로 끝납니다."""
+        self.expires_at = time.monotonic()
+
+
+_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("outbound_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """with 블록 안의 외부 API 호출에 마감 시간 예산을 적용합니다 (바깥 예산이 더 짧으면 그쪽을 유지, 0/None이면 무시)."""
+    current = _deadline.get()
+    if not seconds or (current is not None and current.remaining() <= seconds):
+        yield current
+        return
+    token = _deadline.set(Deadline(seconds))
+    try:
+        yield _deadline.get()
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def resume_deadline(budget: Optional[Deadline]):
+    """deadline()이 yield한 예산을 다른 실행 구간(예: 나중에 소비되는 스트리밍 응답 생성기)에서 이어서 적용합니다."""
+    if budget is None:
+        yield None
+        return
+    token = _deadline.set(budget)
+    try:
+        yield budget
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """현재 예산의 남은 시간(초). 예산이 없으면 None."""
+    current = _deadline.get()
+    return None if current is None else current.remaining()
+
+
+def attempt_timeout() -> float:
+    """한 번의 요청에 줄 타임아웃: OUTBOUND_TIMEOUT과 남은 예산 중 짧은 쪽"""
+    remaining = remaining_time()
+    return OUTBOUND_TIMEOUT if remaining is None else max(0.001, min(OUTBOUND_TIMEOUT, remaining))
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 모이는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """토큰을 얻으면 0을, 아니면 다시 시도할 때까지 기다릴 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """토큰 하나를 얻을 때까지 기다립니다. timeout 안에 얻지 못하면 False."""
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if give_up is not None and time.monotonic() + wait > give_up:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않고 기다림)"""
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if give_up is not None and time.monotonic() + wait > give_up:
+                return False
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Retry-After 동안 새 토큰 발급을 멈춥니다."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def parse_rate_limits(spec: str) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """
+    "openai:tts-1=5/10,openai=10,gemini=4/8" 형식을 {(제공자, 모델): (초당 요청 수, 버스트)}로 변환합니다.
+    모델을 생략하면 그 제공자의 기본값이며, 버스트를 생략하면 초당 요청 수와 같습니다.
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        target, _, value = item.partition("=")
+        provider, _, model = target.strip().partition(":")
+        rate, _, burst = value.partition("/")
+        limits[(provider, model)] = (float(rate), float(burst or rate))
+    return limits
+
+
+_limits = parse_rate_limits(OUTBOUND_RATE_LIMITS)
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def set_rate_limits(spec: str):
+    """속도 제한 설정을 바꾸고 버킷을 초기화합니다 (벤치마크/운영 중 조정용)."""
+    global _limits
+    with _buckets_lock:
+        _limits = parse_rate_limits(spec)
+        _buckets.clear()
+
+
+def limiter(provider: str, model: str = "") -> Optional[TokenBucket]:
+    """제공자/모델의 토큰 버킷 (모델별 설정이 없으면 제공자 공용 버킷, 둘 다 없으면 제한 없음)"""
+    key = (provider, model) if (provider, model) in _limits else (provider, "")
+    if key not in _limits or _limits[key][0] <= 0:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(*_limits[key])
+        return bucket
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """SDK/HTTP 예외에서 HTTP 상태 코드를 꺼냅니다 (openai, google-genai, httpx, 대역 서버 클라이언트)."""
+    for candidate in (getattr(error, "status_code", None), getattr(error, "code", None),
+                      getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """예외에 담긴 응답의 Retry-After(초 또는 HTTP 날짜, retry-after-ms)를 초로 반환합니다."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def transient_error_types() -> Tuple[type, ...]:
+    """
+    상태 코드 없이 재시도할 연결/타임아웃 예외 타입.
+    SDK 예외는 이미 임포트된 모듈에서만 가져옵니다 (임포트되지 않았다면 그 예외가 발생할 수도 없음).
+    """
+    types = [ConnectionError, TimeoutError, asyncio.TimeoutError, asyncio.IncompleteReadError]
+    if "httpx" in sys.modules:
+        types.append(sys.modules["httpx"].TransportError)  # 연결, 타임아웃, 프로토콜 오류
+    if "openai" in sys.modules:
+        types.append(sys.modules["openai"].APIConnectionError)  # APITimeoutError 포함
+    return tuple(types)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    429/5xx 등 RETRY_STATUSES 응답과 연결/타임아웃 오류만 재시도합니다.
+    그 밖의 예외(400, 401 응답이나 코드 오류)는 재시도해도 결과가 같으므로 바로 전달합니다.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    status = status_code(error)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(error, transient_error_types())
+
+
+def backoff_delay(attempt: int) -> float:
+    return min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+def _check_deadline(provider: str, model: str) -> Optional[float]:
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"{provider}/{model}: 요청 마감 시간 초과")
+    return remaining
+
+
+def _retry_delay(provider: str, model: str, bucket: Optional[TokenBucket], error: Exception,
+                 attempt: int, retries: int) -> float:
+    """실패한 시도 뒤 기다릴 시간을 반환합니다. 재시도하지 않을 오류면 그 오류를 다시 발생시킵니다."""
+    if attempt == retries or not is_retryable(error):
+        raise error
+    wait = retry_after(error)
+    if wait is not None and bucket is not None:
+        # 같은 제공자/모델을 쓰는 다른 요청도 Retry-After 동안 보내지 않도록 버킷을 멈춤
+        bucket.pause(wait)
+    delay = wait if wait is not None else backoff_delay(attempt)
+    remaining = remaining_time()
+    if remaining is not None and delay >= remaining:
+        raise DeadlineExceeded(f"{provider}/{model}: 재시도 대기({delay:.1f}초)가 마감 시간을 넘습니다: {error}") from error
+    OUTBOUND_RETRIES.inc(provider=provider, model=model)
+    logger.warning("%s/%s 호출 재시도 %d/%d (%.2f초 후): %s", provider, model, attempt + 1, retries, delay, error)
+    return delay
+
+
+def call(provider: str, model: str, fn: Callable[[], T], max_retries: Optional[int] = None) -> T:
+    """
+    속도 제한, 재시도, 마감 시간을 적용하여 fn()을 실행합니다.
+    재시도할 수 없는 오류나 마지막 시도의 오류는 그대로 전달하고, 예산 안에 끝낼 수 없으면 DeadlineExceeded를 발생시킵니다.
+    """
+    bucket = limiter(provider, model)
+    retries = OUTBOUND_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(retries + 1):
+        remaining = _check_deadline(provider, model)
+        if bucket is not None:
+            start = time.perf_counter()
+            if not bucket.acquire(timeout=remaining):
+                raise DeadlineExceeded(f"{provider}/{model}: 속도 제한 대기가 마감 시간을 넘습니다")
+            OUTBOUND_THROTTLE_SECONDS.observe(time.perf_counter() - start, provider=provider)
+        try:
+            return fn()
+        except Exception as e:
+            delay = _retry_delay(provider, model, bucket, e, attempt, retries)
+        time.sleep(delay)
+
+
+async def acall(provider: str, model: str, fn: Callable[[], Awaitable[T]], max_retries: Optional[int] = None) -> T:
+    """call의 비동기 버전. fn은 시도마다 새 코루틴을 반환해야 합니다."""
+    bucket = limiter(provider, model)
+    retries = OUTBOUND_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(retries + 1):
+        remaining = _check_deadline(provider, model)
+        if bucket is not None:
+            start = time.perf_counter()
+            if not await bucket.acquire_async(timeout=remaining):
+                raise DeadlineExceeded(f"{provider}/{model}: 속도 제한 대기가 마감 시간을 넘습니다")
+            OUTBOUND_THROTTLE_SECONDS.observe(time.perf_counter() - start, provider=provider)
+        try:
+            return await fn()
+        except Exception as e:
+            delay = _retry_delay(provider, model, bucket, e, attempt, retries)
+        await asyncio.sleep(delay)
+
+
+def stream(provider: str, model: str, open_stream: Callable[[], Iterable[T]],
+           max_retries: Optional[int] = None) -> Iterator[T]:
+    """
+    스트리밍 호출에 call()을 적용합니다. 이미 받은 조각을 되돌릴 수 없으므로
+    첫 조각을 받기 전까지의 실패만 재시도하고, 이후 조각은 그대로 전달합니다.
+    """
+    def open_first():
+        iterator = iter(open_stream())
+        for item in iterator:
+            return iterator, [item]
+        return iterator, []
+
+    iterator, head = call(provider, model, open_first, max_retries)
+    yield from head
+    yield from iterator
+
+
+async def astream(provider: str, model: str, open_stream: Callable[[], Awaitable[AsyncIterator[T]]],
+                  max_retries: Optional[int] = None) -> AsyncIterator[T]:
+    """stream의 비동기 버전. open_stream은 비동기 이터레이터를 돌려주는 코루틴 함수입니다."""
+    async def open_first():
+        iterator = (await open_stream()).__aiter__()
+        try:
+            return iterator, [await iterator.__anext__()]
+        except StopAsyncIteration:
+            return iterator, []
+
+    iterator, head = await acall(provider, model, open_first, max_retries)
+    for item in head:
+        yield item
+    async for item in iterator:
+        yield item
+
+
+@lru_cache(maxsize=1)
+def http_client():
+    """keep-alive 연결을 재사용하는 공용 httpx 클라이언트 (스레드 안전)"""
+    import httpx
+    return httpx.Client(
+        timeout=OUTBOUND_TIMEOUT,
+        limits=httpx.Limits(max_connections=OUTBOUND_MAX_CONNECTIONS,
+                            max_keepalive_connections=OUTBOUND_MAX_CONNECTIONS,
+                            keepalive_expiry=30),
+    )
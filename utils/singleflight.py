@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class Call:
+    """진행 중인 호출 하나. 리더가 결과를 채우면 대기 중인 호출자들이 같은 결과를 받습니다."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[['Call'], None]] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def resolve(self, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self.result = result
+            self.error = error
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback: Callable[['Call'], None]):
+        """호출이 끝나면 callback(call)을 실행합니다. 이미 끝났으면 바로 실행합니다."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _outcome(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        if not self._done.wait(timeout):
+            raise TimeoutError("진행 중인 호출을 기다리는 동안 시간이 초과되었습니다.")
+        return self._outcome()
+
+    async def wait_async(self, timeout: Optional[float] = None) -> Any:
+        """스레드를 점유하지 않고 이벤트 루프에서 결과를 기다립니다 (리더는 다른 스레드여도 됨)."""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def notify(_call):
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+        self.add_done_callback(notify)
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("진행 중인 호출을 기다리는 동안 시간이 초과되었습니다.") from None
+        return self._outcome()
+
+
+class SingleFlight:
+    """
+    같은 키에 대한 동시 호출을 하나로 합칩니다(request coalescing).
+
+    첫 호출자(리더)만 실제 함수를 실행하고, 그동안 들어온 같은 키의 호출자는
+    리더의 결과(또는 예외)를 공유합니다. 결과 자체는 보관하지 않으므로 캐시와 함께 사용합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def acquire(self, key: Hashable) -> Tuple[Call, bool]:
+        """키에 대한 Call과 리더 여부를 반환합니다. 리더는 반드시 release를 호출해야 합니다."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = Call()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+
+    def release(self, key: Hashable, call: Call, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.resolve(result, error)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        call, leader = self.acquire(key)
+        if not leader:
+            return call.wait(timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.release(key, call, error=e)
+            raise
+        self.release(key, call, result=result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._calls)}
@@ -1,19 +1,81 @@
-from konlpy.tag import Okt
-from stopwords import get_stopwords
-import openai
-import google.generativeai as genai
+import logging
+import threading
+from functools import lru_cache
 from datetime import datetime
-from utils.config import GEMINI_API_KEY
-genai.configure(api_key=GEMINI_API_KEY)
-gemini_model = genai.GenerativeModel('gemini-1.5-pro-002')
-okt = Okt()
-korean_stopwords = set(get_stopwords('ko'))
+from utils.config import KEYWORD_CACHE_SIZE
+from services.providers import get_text_provider
+from utils.metrics import API_ERRORS, CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# 로컬 키워드 추출에 사용하는 품사 (Okt)
+KEYWORD_POS = {'Noun', 'Alpha', 'Number', 'Foreign'}
+# 로컬 결과가 이보다 적으면 LLM으로 보완
+MIN_LOCAL_KEYWORDS = 2
+MAX_KEYWORDS = 5
+# 질문/요청 표현에서 명사로 분석되는 단어
+CONVERSATIONAL_NOUNS = {'추천', '정보', '방법', '내용', '관련', '정리', '소개', '설명', '질문', '요약', '뭐', '무엇', '어떤', '좀'}
+
+_tagger_lock = threading.Lock()
+_tagger = None
+# konlpy/JVM을 쓸 수 없을 때의 원인. 한 번 실패하면 이후 호출은 임포트와 JVM 시작을 다시 시도하지 않음
+_tagger_error = None
+# lru_cache는 적중 여부를 알려주지 않으므로, 캐시된 함수 본문이 실행되면(미스) 현재 스레드에 표시
+_keyword_cache_miss = threading.local()
+
+def get_tagger():
+    """
+    Okt 형태소 분석기를 처음 사용할 때 한 번만 생성합니다 (JVM 시작 비용이 큼). _tagger_lock을 잡고 호출해야 합니다.
+    생성에 실패하면 그 결과도 기억해 두고, 이후 호출은 바로 예외를 내어 LLM 대체 경로로 넘어갑니다.
+    """
+    global _tagger, _tagger_error
+    if _tagger is not None:
+        return _tagger
+    if _tagger_error is not None:
+        raise RuntimeError("형태소 분석기를 사용할 수 없습니다") from _tagger_error
+    try:
+        from konlpy.tag import Okt
+        _tagger = Okt()
+    except Exception as e:
+        _tagger_error = e
+        logger.warning("형태소 분석기 초기화 실패, 이후 키워드 추출은 LLM을 사용합니다: %s", e)
+        raise
+    return _tagger
+
+@lru_cache(maxsize=1)
+def get_korean_stopwords() -> frozenset:
+    from stopwords import get_stopwords
+    return frozenset(get_stopwords('ko'))
 
 def preprocess_text(text):
-    tokens = okt.morphs(text)
+    with _tagger_lock:
+        tokens = get_tagger().morphs(text)
+    korean_stopwords = get_korean_stopwords()
     processed_tokens = [token for token in tokens if token not in korean_stopwords and token.isalnum()]
     return ' '.join(processed_tokens)
 
+def extract_keywords_local(query):
+    """Okt 품사 태깅과 불용어 필터로 쿼리의 핵심 키워드를 추출합니다 (네트워크 호출 없음)."""
+    with _tagger_lock:
+        tagged = get_tagger().pos(query, norm=True)
+    korean_stopwords = get_korean_stopwords()
+    keywords = []
+    for token, pos in tagged:
+        if pos not in KEYWORD_POS or token in korean_stopwords or token in CONVERSATIONAL_NOUNS:
+            continue
+        if pos == 'Noun' and len(token) < 2:
+            continue
+        if token not in keywords:
+            keywords.append(token)
+    return keywords[:MAX_KEYWORDS]
+
+def is_weak_keywords(keywords, query):
+    """로컬 추출 결과가 제목으로 쓰기에 부족한지 판단합니다."""
+    if not keywords:
+        return True
+    # 짧은 쿼리는 키워드가 하나여도 충분
+    return len(keywords) < MIN_LOCAL_KEYWORDS and len(query.split()) > MIN_LOCAL_KEYWORDS
+
 # def extract_keywords_openai(query):
 #     current_year = datetime.now().year
 #     prompt = f"""
@@ -39,7 +101,8 @@ def preprocess_text(text):
 #         print(f"OpenAI Error: {e}")
 #         return ""
 
-def extract_keywords_openai(query,model="chatgpt"):
+def extract_keywords_openai(query,model="chatgpt",raise_errors=False):
+    """LLM으로 검색 키워드를 만듭니다. API 오류 시 원래 쿼리를 반환하며, raise_errors이면 예외를 그대로 전달합니다."""
     current_date = datetime.now().strftime("%Y-%m-%d")
     current_year = datetime.now().year
     
@@ -65,26 +128,32 @@ def extract_keywords_openai(query,model="chatgpt"):
     
     try:
         if model.lower() == "chatgpt":
-            response = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            response = get_text_provider("openai").complete(
+                [
                     {"role": "system", "content": "You are a precise query optimization AI."},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-4o-mini",
                 max_tokens=25,
                 temperature=0.8,
                 top_p=0.9,
                 frequency_penalty=0.2,
                 presence_penalty=0.2
             )
-            return response.choices[0].message.content.strip()
+            return response.strip()
         elif model.lower() == "gemini":
-            response = gemini_model.generate_content(prompt)
-            return response.text.strip()
+            response = get_text_provider("gemini").complete(
+                [{"role": "user", "content": prompt}],
+                model='gemini-1.5-pro-002',
+            )
+            return response.strip()
         else:
             raise ValueError("Invalid model specified. Choose 'chatgpt' or 'gemini'.")
     except Exception as e:
-        print(f"API Error ({model}): {e}")
+        API_ERRORS.inc(operation="keywords")
+        logger.warning("API Error (%s): %s", model, e)
+        if raise_errors:
+            raise
         return query
 
 def clean_keywords(keywords):
@@ -93,10 +162,37 @@ def clean_keywords(keywords):
     keyword_list = list(dict.fromkeys(keywords.split(',')))
     return [kw.strip() for kw in keyword_list if len(kw.strip()) > 1]
 
-def extract_keywords(query):
-    openai_keywords = extract_keywords_openai(query,model='chatgpt')
+def extract_keywords(query, raise_errors=False):
+    """
+    로컬 형태소 분석을 먼저 시도하고, 결과가 부족하거나 분석기를 쓸 수 없을 때만 LLM을 호출합니다.
+    raise_errors이면 LLM API 오류를 원래 쿼리로 대체하지 않고 예외로 전달합니다.
+    """
+    try:
+        local_keywords = extract_keywords_local(query)
+    except Exception as e:
+        logger.info("로컬 키워드 추출 실패, LLM 사용: %s", e)
+        local_keywords = []
+    if not is_weak_keywords(local_keywords, query):
+        return local_keywords
+    openai_keywords = extract_keywords_openai(query,model='chatgpt',raise_errors=raise_errors)
     return clean_keywords(openai_keywords)
 
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def _process_normalized_query(query):
+    _keyword_cache_miss.flag = True
+    # API 오류는 예외로 빠져나가므로 lru_cache에 남지 않음
+    return ' '.join(extract_keywords(query, raise_errors=True))
+
 def process_query(query):
-    openai_keywords = extract_keywords(query)
-    return ' '.join(openai_keywords)
\ No newline at end of file
+    """
+    보고서 제목용으로 최적화한 쿼리를 반환합니다. 같은 쿼리는 메모이즈된 결과를 재사용하되,
+    API 오류로 원래 쿼리를 사용한 경우는 캐시하지 않아 다음 요청에서 다시 시도합니다.
+    """
+    normalized = ' '.join(query.split())
+    _keyword_cache_miss.flag = False
+    try:
+        return _process_normalized_query(normalized)
+    except Exception:
+        return ' '.join(clean_keywords(normalized))
+    finally:
+        CACHE_REQUESTS.inc(cache="keywords", result="miss" if _keyword_cache_miss.flag else "hit")
\ No newline at end of file